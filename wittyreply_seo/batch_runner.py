@@ -0,0 +1,286 @@
+"""
+Batch job mode: refresh many keyword projects in one invocation.
+Jobs from a JSON manifest run across a worker process pool that shares one
+response cache and one global request budget.
+
+Usage:
+    python main.py batch jobs.json --workers 3 --summary batch_summary.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import multiprocessing
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from rate_limiter import SharedRateLimiter, install_rate_limiter
+from run_metrics import RunMetrics, install_metrics
+from response_cache import (
+    ResponseCache,
+    install_response_cache,
+    get_response_cache,
+    DEFAULT_CACHE_PATH,
+    DEFAULT_TTL
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Global request budget shared by all workers (minimum seconds between requests)
+DEFAULT_BATCH_INTERVALS = {
+    'autocomplete': 0.5,
+    'trends': 3.0,
+}
+
+# KeywordTool instances kept warm per worker, keyed by locale and API key
+_worker_tools: Dict[tuple, object] = {}
+
+
+class BatchError(Exception):
+    """Custom exception for batch manifest errors."""
+    pass
+
+
+def load_manifest(manifest_path: str) -> Dict:
+    """
+    Load and validate a batch manifest.
+
+    The manifest is a JSON object with a "jobs" list. Each job has a "name",
+    either "seeds" (list or comma-separated string) or "file", an "output"
+    path and optional "options" using the CLI option names. Top-level
+    "defaults", "workers", "cache", "cache_ttl" and "rate_limits" are optional.
+
+    Args:
+        manifest_path (str): Path to the JSON manifest
+
+    Returns:
+        Dict: Parsed manifest with relative paths resolved against its directory
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise BatchError(f"Could not read manifest {manifest_path}: {e}")
+
+    jobs = manifest.get('jobs')
+    if not isinstance(jobs, list) or not jobs:
+        raise BatchError("Manifest must contain a non-empty 'jobs' list")
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    names = set()
+
+    for index, job in enumerate(jobs):
+        job.setdefault('name', f"job-{index + 1}")
+        if job['name'] in names:
+            raise BatchError(f"Duplicate job name: {job['name']}")
+        names.add(job['name'])
+
+        if not job.get('seeds') and not job.get('file'):
+            raise BatchError(f"Job '{job['name']}' needs 'seeds' or 'file'")
+        if not job.get('output'):
+            raise BatchError(f"Job '{job['name']}' needs an 'output' path")
+
+        for key in ('file', 'output'):
+            if job.get(key) and not os.path.isabs(job[key]):
+                job[key] = os.path.join(base_dir, job[key])
+
+    cache_path = manifest.get('cache', DEFAULT_CACHE_PATH)
+    if cache_path and not os.path.isabs(cache_path):
+        manifest['cache'] = os.path.join(base_dir, cache_path)
+
+    return manifest
+
+
+def _init_worker(cache: Optional[ResponseCache], limiter: SharedRateLimiter, verbose: bool):
+    """Install the shared cache and rate limiter in a worker process."""
+    install_response_cache(cache)
+    install_rate_limiter(limiter)
+    if verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+
+def _get_tool(args):
+    """Return a warm KeywordTool for the job's locale, creating it on first use."""
+    from main import KeywordTool
+
+    key = (args.language, args.country, args.geo, args.google_api_key)
+    if key not in _worker_tools:
+        _worker_tools[key] = KeywordTool(
+            language=args.language,
+            country=args.country,
+            geo=args.geo,
+            google_api_key=args.google_api_key
+        )
+    return _worker_tools[key]
+
+
+def run_job(job: Dict, defaults: Optional[Dict] = None) -> Dict:
+    """
+    Run a single manifest job and report its status.
+
+    Args:
+        job (Dict): Job definition from the manifest
+        defaults (Optional[Dict]): Options applied to every job before its own
+
+    Returns:
+        Dict: Status record (name, status, counts, output, duration, error)
+    """
+    from main import default_args, run_pipeline
+
+    started = time.time()
+    metrics = RunMetrics()
+    install_metrics(metrics)
+    cache = get_response_cache()
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    status = {
+        'name': job['name'],
+        'status': 'failed',
+        'pid': os.getpid(),
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'seeds': 0,
+        'keywords': 0,
+        'output': job['output'],
+        'error': None,
+    }
+
+    try:
+        options = dict(defaults or {})
+        options.update(job.get('options', {}))
+
+        seeds = job.get('seeds')
+        if isinstance(seeds, list):
+            seeds = ', '.join(seeds)
+
+        args = default_args(**options)
+        args.seeds = seeds
+        args.file = job.get('file') if not seeds else None
+        args.output = job['output']
+
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        result = run_pipeline(args, analyzer=_get_tool(args))
+
+        status.update({
+            'status': 'ok',
+            'seeds': result['seeds'],
+            'keywords': result['keywords'],
+            'enhanced_output': result.get('enhanced_output'),
+        })
+
+    except Exception as e:
+        logger.error(f"Batch job '{job['name']}' failed: {e}")
+        status['error'] = str(e)
+
+    status['duration_seconds'] = round(time.time() - started, 2)
+    if cache is not None:
+        # Counters are per worker process; report only this job's lookups
+        status['cache_hits'] = cache.hits - hits
+        status['cache_misses'] = cache.misses - misses
+    status['metrics'] = metrics.summary()
+    return status
+
+
+def run_batch(manifest: Dict, workers: Optional[int] = None,
+              verbose: bool = False) -> List[Dict]:
+    """
+    Run every job in a manifest across a worker process pool.
+
+    Args:
+        manifest (Dict): Manifest loaded with load_manifest()
+        workers (Optional[int]): Pool size (default: manifest 'workers', else min(jobs, CPUs))
+        verbose (bool): Enable debug logging in workers
+
+    Returns:
+        List[Dict]: Per-job status records, in manifest order
+    """
+    jobs = manifest['jobs']
+    workers = workers or manifest.get('workers') or min(len(jobs), os.cpu_count() or 1)
+
+    intervals = dict(DEFAULT_BATCH_INTERVALS)
+    intervals.update(manifest.get('rate_limits', {}))
+    limiter = SharedRateLimiter(intervals)
+
+    cache = None
+    if manifest.get('cache'):
+        cache = ResponseCache(manifest['cache'], ttl=manifest.get('cache_ttl', DEFAULT_TTL))
+
+    defaults = manifest.get('defaults', {})
+    logger.info(f"Running {len(jobs)} batch jobs on {workers} workers "
+                f"(budget: {intervals}, cache: {manifest.get('cache')})")
+
+    if workers == 1:
+        _init_worker(cache, limiter, verbose)
+        return [run_job(job, defaults) for job in jobs]
+
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(cache, limiter, verbose)) as pool:
+        pending = [pool.apply_async(run_job, (job, defaults)) for job in jobs]
+        return [result.get() for result in pending]
+
+
+def write_summary(statuses: List[Dict], summary_file: str):
+    """
+    Write the per-job status summary as JSON.
+
+    Args:
+        statuses (List[Dict]): Status records from run_batch()
+        summary_file (str): Output JSON path
+    """
+    summary = {
+        'finished_at': datetime.now().isoformat(timespec='seconds'),
+        'jobs_total': len(statuses),
+        'jobs_ok': sum(1 for s in statuses if s['status'] == 'ok'),
+        'jobs_failed': sum(1 for s in statuses if s['status'] != 'ok'),
+        'jobs': statuses,
+    }
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    logger.info(f"Batch summary written to {summary_file}")
+
+
+def batch_main(argv: List[str]) -> int:
+    """
+    CLI entry point for `python main.py batch`.
+
+    Args:
+        argv (List[str]): Arguments after the subcommand name
+
+    Returns:
+        int: Process exit code (non-zero if any job failed)
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py batch',
+        description='Run many keyword jobs from a JSON manifest in one process pool'
+    )
+    parser.add_argument('manifest', help='Path to the JSON job manifest')
+    parser.add_argument('--workers', '-w', type=int, help='Number of worker processes')
+    parser.add_argument('--summary', type=str, default='batch_summary.json',
+                        help='Per-job status summary output (default: batch_summary.json)')
+    parser.add_argument('--verbose', '-V', action='store_true', help='Enable verbose logging')
+    args = parser.parse_args(argv)
+
+    try:
+        manifest = load_manifest(args.manifest)
+    except BatchError as e:
+        logger.error(str(e))
+        return 2
+
+    statuses = run_batch(manifest, workers=args.workers, verbose=args.verbose)
+    write_summary(statuses, args.summary)
+
+    print(f"\n📦 Batch Summary:")
+    for status in statuses:
+        icon = '✅' if status['status'] == 'ok' else '❌'
+        detail = f"{status['keywords']} keywords" if status['status'] == 'ok' else status['error']
+        print(f"{icon} {status['name']}: {detail} ({status['duration_seconds']}s)")
+    print(f"Summary file: {args.summary}")
+
+    return 0 if all(s['status'] == 'ok' for s in statuses) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(batch_main(sys.argv[1:]))
@@ -0,0 +1,6 @@
+"""
+Offline benchmark suite for the keyword pipeline.
+
+Usage (from the wittyreply_seo directory):
+    python -m benchmarks.run_benchmarks --sizes 1000,10000 --output bench.json
+"""
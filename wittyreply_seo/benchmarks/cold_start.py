@@ -0,0 +1,107 @@
+"""
+Cold-start check for the CLI: wall time of pure invocations and which heavy
+modules they import. Fails when a command exceeds the target or imports
+pandas, numpy, pytrends or requests.
+
+Usage (from the wittyreply_seo directory):
+    python -m benchmarks.cold_start --target 0.3 --output cold_start.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+from typing import Dict, List, Optional
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['pandas', 'numpy', 'pytrends', 'requests', 'sklearn', 'pyarrow']
+
+# Pure invocations that must start fast and stay offline
+COMMANDS = {
+    'help': ['--help'],
+    'dry_run': ['--seeds', 'whatsapp automation, crm software', '--dry-run',
+                '--recursive', '--max-length', '40'],
+}
+
+# Runs main.py and reports the heavy modules it imported when the process exits
+_PROBE = """
+import atexit, json, runpy, sys
+heavy, report = {heavy!r}, {report!r}
+def _dump():
+    with open(report, 'w') as f:
+        json.dump([m for m in heavy if m in sys.modules], f)
+atexit.register(_dump)
+sys.argv = ['main.py'] + {argv!r}
+sys.path.insert(0, {package!r})
+runpy.run_path({main!r}, run_name='__main__')
+"""
+
+
+def measure(argv: List[str], runs: int = 5) -> Dict:
+    """
+    Time a CLI invocation in fresh interpreters.
+
+    Args:
+        argv (List[str]): Arguments passed to main.py
+        runs (int): Number of cold starts
+
+    Returns:
+        Dict: Median/min seconds and the heavy modules imported
+    """
+    timings = []
+    fd, report = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    code = _PROBE.format(heavy=HEAVY_MODULES, report=report, argv=argv,
+                         package=PACKAGE_DIR, main=os.path.join(PACKAGE_DIR, 'main.py'))
+    try:
+        for _ in range(runs):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, '-c', code], cwd=PACKAGE_DIR,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - started)
+        with open(report, 'r') as f:
+            imported = json.load(f)
+    finally:
+        os.remove(report)
+
+    return {
+        'median_seconds': round(statistics.median(timings), 4),
+        'min_seconds': round(min(timings), 4),
+        'heavy_imports': imported,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point; returns non-zero if a command misses the target."""
+    parser = argparse.ArgumentParser(description='CLI cold-start check')
+    parser.add_argument('--target', type=float, default=0.3,
+                        help='Maximum median seconds per command (default: 0.3)')
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts per command')
+    parser.add_argument('--output', type=str, help='Write results as JSON')
+    args = parser.parse_args(argv)
+
+    results = {}
+    failed = False
+    for name, command in COMMANDS.items():
+        result = measure(command, runs=args.runs)
+        result['ok'] = result['median_seconds'] <= args.target and not result['heavy_imports']
+        results[name] = result
+        failed = failed or not result['ok']
+        print(f"{name:>8}: {result['median_seconds']:.3f}s median "
+              f"(target {args.target}s), heavy imports: {result['heavy_imports'] or 'none'}"
+              f"{'' if result['ok'] else '  FAIL'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'target_seconds': args.target, 'commands': results}, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Fake autocomplete and trends clients so benchmarks run offline and deterministically.
+Responses recorded in a ResponseCache can be replayed instead of faked.
+"""
+
+import time
+import zlib
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import fetch_autocomplete
+from rate_limiter import RateLimiter, install_rate_limiter, get_rate_limiter
+from response_cache import ResponseCache, install_response_cache, get_response_cache
+
+logger = logging.getLogger(__name__)
+
+SUGGESTION_MODIFIERS = [
+    'free', 'app', 'api', 'bot', 'tool', 'tools', 'online', 'pricing', 'review',
+    'alternative', 'for business', 'template', 'tutorial', 'download', 'login',
+]
+
+_real_sleep = time.sleep
+
+
+def _stable_seed(text: str) -> int:
+    return zlib.crc32(text.encode('utf-8'))
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response from the autocomplete endpoint."""
+
+    def __init__(self, query: str, suggestions: int):
+        self.query = query
+        self.suggestions = suggestions
+
+    def raise_for_status(self):
+        pass
+
+    def json(self) -> List:
+        offset = _stable_seed(self.query) % len(SUGGESTION_MODIFIERS)
+        modifiers = (SUGGESTION_MODIFIERS * 2)[offset:offset + self.suggestions]
+        return [self.query, [f"{self.query} {modifier}" for modifier in modifiers]]
+
+
+class FakeSession:
+    """Autocomplete HTTP session returning deterministic suggestions."""
+
+    def __init__(self, latency: float = 0.0, suggestions: int = 10):
+        self.latency = latency
+        self.suggestions = suggestions
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> FakeResponse:
+        if self.latency:
+            _real_sleep(self.latency)
+        return FakeResponse(params['q'], self.suggestions)
+
+
+class FakeTrendReq:
+    """pytrends.TrendReq stand-in with deterministic interest data."""
+
+    latency = 0.0
+
+    def __init__(self, *args, **kwargs):
+        self.kw_list: List[str] = []
+        self.timeframe = 'today 1-m'
+        self.geo = ''
+
+    def build_payload(self, kw_list: List[str], timeframe: str = 'today 1-m', geo: str = '', **kwargs):
+        if self.latency:
+            _real_sleep(self.latency)
+        self.kw_list = list(kw_list)
+        self.timeframe = timeframe
+        self.geo = geo
+
+    def interest_over_time(self) -> pd.DataFrame:
+        periods = 52 if '12-m' in self.timeframe else 30
+        index = pd.date_range('2025-01-05', periods=periods, freq='W' if periods == 52 else 'D')
+        rng = np.random.default_rng(_stable_seed('|'.join(self.kw_list)))
+        values = rng.integers(0, 100, size=(periods, len(self.kw_list)))
+        frame = pd.DataFrame(values, index=index, columns=self.kw_list)
+        frame['isPartial'] = False
+        return frame
+
+    def interest_by_region(self, resolution: str = 'COUNTRY', inc_low_vol: bool = True,
+                           inc_geo_code: bool = False) -> pd.DataFrame:
+        regions = ['United States', 'France', 'Morocco', 'United Arab Emirates']
+        rng = np.random.default_rng(_stable_seed('|'.join(self.kw_list)))
+        frame = pd.DataFrame(rng.integers(0, 100, size=(len(regions), len(self.kw_list))),
+                             index=pd.Index(regions, name='geoName'), columns=self.kw_list)
+        if inc_geo_code:
+            frame['geoCode'] = ['US', 'FR', 'MA', 'AE']
+        return frame
+
+    def related_queries(self) -> Dict:
+        related = {}
+        for keyword in self.kw_list:
+            top = pd.DataFrame({'query': [f"{keyword} {m}" for m in SUGGESTION_MODIFIERS[:5]],
+                                'value': [100, 80, 60, 40, 20]})
+            related[keyword] = {'top': top, 'rising': None}
+        return related
+
+
+@contextmanager
+def fake_clients(latency: float = 0.0, replay_cache: Optional[str] = None):
+    """
+    Route autocomplete and trends traffic to fakes for the duration of the block.
+
+    Politeness sleeps and rate limits are disabled so only pipeline work is
+    measured; `latency` adds a fixed simulated round trip per request instead.
+
+    Args:
+        latency (float): Simulated seconds per fake request
+        replay_cache (Optional[str]): ResponseCache file to replay recorded responses from
+    """
+    import pytrends.request
+
+    session = FakeSession(latency=latency)
+    FakeTrendReq.latency = latency
+
+    saved = {
+        'get_session': fetch_autocomplete._get_session,
+        'pytrends_trendreq': pytrends.request.TrendReq,
+        'sleep': time.sleep,
+        'limiter': get_rate_limiter(),
+        'cache': get_response_cache(),
+    }
+
+    fetch_autocomplete._get_session = lambda: session
+    pytrends.request.TrendReq = FakeTrendReq
+    time.sleep = lambda seconds: None
+    install_rate_limiter(RateLimiter({'autocomplete': 0.0, 'trends': 0.0}))
+    install_response_cache(ResponseCache(replay_cache, ttl=None) if replay_cache else None)
+
+    try:
+        yield
+    finally:
+        fetch_autocomplete._get_session = saved['get_session']
+        pytrends.request.TrendReq = saved['pytrends_trendreq']
+        time.sleep = saved['sleep']
+        install_rate_limiter(saved['limiter'])
+        install_response_cache(saved['cache'])
@@ -0,0 +1,266 @@
+"""
+Run the keyword pipeline benchmarks and write machine-readable results.
+
+Every (stage, size) case runs in its own forked process against fake clients,
+so peak memory is attributable to that case and no network access is needed.
+
+Usage (from the wittyreply_seo directory):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --stages dedup,export --sizes 1000,100000
+    python -m benchmarks.run_benchmarks --output new.json --compare baseline.json
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PACKAGE_DIR not in sys.path:
+    sys.path.insert(0, PACKAGE_DIR)
+
+from benchmarks.fakes import fake_clients
+from benchmarks.workloads import WORKLOADS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+RESULTS_VERSION = 1
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _run_case(stage: str, size: int, repeat: int, latency: float,
+              replay_cache: Optional[str], connection):
+    """Child process body: set up one case, time it and send the result back."""
+    logging.disable(logging.WARNING)
+    scratch = tempfile.mkdtemp(prefix='keyword_bench_')
+    result = {'stage': stage, 'size': size, 'status': 'ok'}
+
+    try:
+        with fake_clients(latency=latency, replay_cache=replay_cache):
+            run, items = WORKLOADS[stage](size, scratch)
+            gc.collect()
+            baseline_rss = _peak_rss_mb()
+
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append(time.perf_counter() - started)
+
+        best = min(timings)
+        peak_rss = _peak_rss_mb()
+        result.update({
+            'items': items,
+            'seconds': round(best, 4),
+            'seconds_all': [round(t, 4) for t in timings],
+            'items_per_second': round(items / best, 1) if best > 0 else None,
+            'peak_rss_mb': peak_rss,
+            'setup_rss_mb': baseline_rss,
+            'stage_rss_mb': round(peak_rss - baseline_rss, 1)
+            if peak_rss is not None and baseline_rss is not None else None,
+        })
+    except ImportError as e:
+        result.update({'status': 'skipped', 'error': str(e)})
+    except Exception as e:
+        result.update({'status': 'failed', 'error': f"{type(e).__name__}: {e}"})
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    connection.send(result)
+    connection.close()
+
+
+def run_case(stage: str, size: int, repeat: int = 1, latency: float = 0.0,
+             replay_cache: Optional[str] = None, timeout: Optional[float] = None) -> Dict:
+    """
+    Run one benchmark case in a fresh process.
+
+    Args:
+        stage (str): Workload name from WORKLOADS
+        size (int): Number of keywords
+        repeat (int): Timed repetitions (the fastest is reported)
+        latency (float): Simulated seconds per fake request
+        replay_cache (Optional[str]): ResponseCache file to replay
+        timeout (Optional[float]): Seconds before the case is abandoned
+
+    Returns:
+        Dict: Case result
+    """
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods()
+                                          else 'spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case,
+                              args=(stage, size, repeat, latency, replay_cache, sender))
+    process.start()
+    sender.close()
+
+    if receiver.poll(timeout):
+        result = receiver.recv()
+    else:
+        process.terminate()
+        result = {'stage': stage, 'size': size, 'status': 'timeout',
+                  'error': f"No result after {timeout}s"}
+    process.join()
+
+    if process.exitcode not in (0, None) and result.get('status') == 'ok':
+        result.update({'status': 'failed', 'error': f"Exit code {process.exitcode}"})
+    return result
+
+
+def environment_info() -> Dict:
+    """Interpreter, platform, library and git version details stored with the results."""
+    info = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+    for module in ('numpy', 'pandas', 'sklearn', 'pyarrow'):
+        try:
+            info[module] = __import__(module).__version__
+        except ImportError:
+            info[module] = None
+    try:
+        info['git_commit'] = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=PACKAGE_DIR, capture_output=True,
+            text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        info['git_commit'] = None
+    return info
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float = 0.2) -> List[Dict]:
+    """
+    Compare two result files case by case.
+
+    Args:
+        current (Dict): Results from this run
+        baseline (Dict): Results from an earlier version
+        threshold (float): Relative slowdown or memory growth counted as a regression
+
+    Returns:
+        List[Dict]: One comparison row per case present in both runs
+    """
+    previous = {(r['stage'], r['size']): r for r in baseline.get('results', [])
+                if r.get('status') == 'ok'}
+    rows = []
+
+    for result in current.get('results', []):
+        before = previous.get((result['stage'], result['size']))
+        if before is None or result.get('status') != 'ok':
+            continue
+
+        time_ratio = result['seconds'] / before['seconds'] if before['seconds'] else None
+        memory_ratio = None
+        if result.get('peak_rss_mb') and before.get('peak_rss_mb'):
+            memory_ratio = result['peak_rss_mb'] / before['peak_rss_mb']
+
+        rows.append({
+            'stage': result['stage'],
+            'size': result['size'],
+            'seconds_before': before['seconds'],
+            'seconds_after': result['seconds'],
+            'time_ratio': round(time_ratio, 3) if time_ratio else None,
+            'memory_ratio': round(memory_ratio, 3) if memory_ratio else None,
+            'regression': bool((time_ratio and time_ratio > 1 + threshold) or
+                               (memory_ratio and memory_ratio > 1 + threshold)),
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point; returns non-zero on failed cases or regressions."""
+    parser = argparse.ArgumentParser(description='Keyword pipeline benchmarks (offline)')
+    parser.add_argument('--stages', type=str, default=','.join(WORKLOADS),
+                        help=f"Comma-separated stages (default: {','.join(WORKLOADS)})")
+    parser.add_argument('--sizes', type=str, default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated keyword counts (default: 1k,10k,100k,1M)')
+    parser.add_argument('--repeat', type=int, default=1, help='Timed repetitions per case')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Simulated seconds per fake request (default: 0)')
+    parser.add_argument('--replay-cache', type=str,
+                        help='Replay responses recorded in a --cache SQLite file before faking')
+    parser.add_argument('--timeout', type=float, help='Seconds allowed per case')
+    parser.add_argument('--output', type=str, default='benchmark_results.json',
+                        help='Results file (default: benchmark_results.json)')
+    parser.add_argument('--compare', type=str, help='Baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown counted as a regression (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in WORKLOADS]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    results = []
+    for stage in stages:
+        for size in sizes:
+            result = run_case(stage, size, repeat=args.repeat, latency=args.latency,
+                              replay_cache=args.replay_cache, timeout=args.timeout)
+            results.append(result)
+            if result['status'] == 'ok':
+                print(f"{stage:>12} {size:>9,}  {result['seconds']:>9.3f}s  "
+                      f"{result['items_per_second'] or 0:>12,.0f} kw/s  "
+                      f"peak {result['peak_rss_mb']} MB")
+            else:
+                print(f"{stage:>12} {size:>9,}  {result['status']}: {result.get('error')}")
+
+    report = {
+        'version': RESULTS_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment_info(),
+        'config': {'repeat': args.repeat, 'latency': args.latency,
+                   'replay_cache': args.replay_cache},
+        'results': results,
+    }
+
+    exit_code = 1 if any(r['status'] in ('failed', 'timeout') for r in results) else 0
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare_results(report, baseline, args.threshold)
+        report['comparison'] = {'baseline': args.compare, 'threshold': args.threshold,
+                                'cases': comparison}
+        print(f"\nCompared with {args.compare}:")
+        for row in comparison:
+            flag = 'REGRESSION' if row['regression'] else 'ok'
+            print(f"{row['stage']:>12} {row['size']:>9,}  time x{row['time_ratio']}  "
+                  f"memory x{row['memory_ratio']}  {flag}")
+        if any(row['regression'] for row in comparison):
+            exit_code = 1
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
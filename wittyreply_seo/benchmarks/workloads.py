@@ -0,0 +1,193 @@
+"""
+Benchmark workloads: synthetic keyword corpora and one setup function per pipeline stage.
+
+Each setup function receives the target keyword count and a scratch directory
+and returns (run, items): `run` is the timed callable, `items` the number of
+keywords it processes. Setup work (corpus generation, client creation) is not timed.
+"""
+
+import os
+import math
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+VOCABULARY = (
+    'whatsapp automation chatbot ai reply assistant business marketing crm sales '
+    'customer support message template auto responder bot api integration free '
+    'best tool software app platform service small team remote startup ecommerce '
+    'shopify instagram telegram email sms campaign lead generation booking order '
+    'tracking analytics dashboard pricing review tutorial guide course jobs salary '
+    'career developer blockchain crypto web3 defi wallet exchange trading course '
+    'france morocco dubai arabic french english translation voice note schedule'
+).split()
+
+Workload = Callable[[int, str], Tuple[Callable[[], object], int]]
+
+
+def make_keywords(count: int, seed: int = 0, duplicate_rate: float = 0.1) -> List[str]:
+    """
+    Generate a deterministic keyword corpus of 2-5 word phrases.
+
+    A share of the corpus are reordered or re-cased variants of earlier
+    keywords, so dedup stages have realistic work to do.
+
+    Args:
+        count (int): Number of keywords
+        seed (int): RNG seed
+        duplicate_rate (float): Share of near-duplicate variants
+
+    Returns:
+        List[str]: Keywords
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(VOCABULARY)
+    lengths = rng.integers(2, 6, size=count)
+    words = vocabulary[rng.integers(0, len(vocabulary), size=(count, 5))]
+
+    keywords = [' '.join(words[i, :lengths[i]]) for i in range(count)]
+
+    variants = np.flatnonzero(rng.random(count) < duplicate_rate)
+    for i in variants[variants > 0]:
+        source = keywords[rng.integers(0, i)].split()
+        rng.shuffle(source)
+        keywords[i] = ' '.join(source).title() if i % 2 else ' '.join(source)
+    return keywords
+
+
+def _autocomplete(size: int, scratch: str):
+    from main import KeywordTool
+    tool = KeywordTool()
+    # Each fake autocomplete request returns 10 suggestions
+    seeds = [f"{keyword} {i}" for i, keyword in enumerate(make_keywords(math.ceil(size / 10), seed=1))]
+    return (lambda: tool.collect_autocomplete_keywords(seeds)), size
+
+
+def _crawl(size: int, scratch: str):
+    from fetch_autocomplete import fetch_autocomplete_recursive
+    from keyword_filters import KeywordFilter
+    # Full fan-out of 10 down to depth 4 expands 1,111 keywords per seed. No result
+    # passes the filter, so peak memory is the crawl's frontier and seen set alone
+    seeds = [f"{keyword} {i}" for i, keyword in enumerate(make_keywords(math.ceil(size / 1111), seed=8))]
+    keyword_filter = KeywordFilter(min_length=1000)
+    return (lambda: fetch_autocomplete_recursive(seeds, max_depth=4, max_keywords_per_seed=10,
+                                                 keyword_filter=keyword_filter)), len(seeds) * 1111
+
+
+def _trends(size: int, scratch: str):
+    from fetch_trends import TrendsClient
+    client = TrendsClient()
+    keywords = list(dict.fromkeys(make_keywords(size, seed=2, duplicate_rate=0.0)))
+    return (lambda: client.get_batch_trends(keywords)), len(keywords)
+
+
+def _filter(size: int, scratch: str):
+    from main import KeywordTool
+    from keyword_filters import KeywordFilter
+    rng = np.random.default_rng(7)
+    vocabulary = np.array(VOCABULARY)
+    # 500 phrases: one- and two-word terms plus made-up brand names
+    phrases = [' '.join(vocabulary[rng.integers(0, len(vocabulary), size=rng.integers(1, 3))])
+               for _ in range(400)] + [f"brand{i}" for i in range(100)]
+    keyword_filter = KeywordFilter(include_phrases=phrases[:250], exclude_phrases=phrases[250:])
+    keyword_data = _keyword_data(size, seed=7)
+    tool = KeywordTool()
+    return (lambda: tool.filter_keywords(keyword_data, keyword_filter=keyword_filter)), size
+
+
+def _scoring(size: int, scratch: str):
+    from fetch_trends_api import GoogleTrendsAPI, KeywordAnalyzer, KeywordMetrics
+    from seasonality import apply_seasonality
+    analyzer = KeywordAnalyzer(GoogleTrendsAPI())
+    rng = np.random.default_rng(3)
+    seasonal = rng.integers(0, 100, size=(size, 12)).astype(float)
+    volumes = rng.integers(0, 60000, size=size)
+    competition = rng.random(size)
+    metrics = [
+        KeywordMetrics(keyword=keyword, search_volume=int(volumes[i]),
+                       competition_score=float(competition[i]),
+                       seasonal_trend=seasonal[i].tolist())
+        for i, keyword in enumerate(make_keywords(size, seed=3))
+    ]
+
+    def run():
+        # Intents and seasonality are computed per column, as analyze_keywords does
+        apply_seasonality(metrics)
+        intents = analyzer.intent_tagger.tag_many([metric.keyword for metric in metrics])
+        for metric, tags in zip(metrics, intents):
+            metric.intents = list(tags)
+            metric.opportunity_score = analyzer._calculate_opportunity_score(metric)
+            metric.difficulty_score = analyzer._calculate_difficulty_score(metric)
+            metric.recommendation = analyzer._generate_recommendation(metric)
+        return metrics
+
+    return run, size
+
+
+def _seasonal_series(size: int, seed: int) -> List[List[float]]:
+    rng = np.random.default_rng(seed)
+    months = np.arange(13)
+    # Seasonal curves with random phase, trend and noise, some months missing
+    phase = rng.integers(0, 12, (size, 1))
+    curves = (50 + rng.uniform(0, 40, (size, 1)) * np.cos(2 * np.pi * (months - phase) / 12)
+              + rng.normal(0, 1, (size, 1)) * months + rng.normal(0, 8, (size, 13)))
+    curves[rng.random((size, 13)) < 0.02] = np.nan
+    return np.clip(curves, 0, 100).tolist()
+
+
+def _seasonality(size: int, scratch: str):
+    from seasonality import seasonality_profiles
+    series = _seasonal_series(size, seed=11)
+    return (lambda: seasonality_profiles(series)), size
+
+
+def _forecast(size: int, scratch: str):
+    from forecasting import forecast_series
+    series = _seasonal_series(size, seed=13)
+    return (lambda: forecast_series(series, weeks=(4, 8, 12))), size
+
+
+def _keyword_data(size: int, seed: int) -> Dict[str, Dict]:
+    scores = np.random.default_rng(seed).random(size) * 100
+    return {
+        keyword: {'keyword': keyword, 'source': 'autocomplete',
+                  'trend_score': float(scores[i]), 'error': None}
+        for i, keyword in enumerate(make_keywords(size, seed=seed))
+    }
+
+
+def _dedup(size: int, scratch: str):
+    from main import KeywordTool
+    tool = KeywordTool()
+    keyword_data = _keyword_data(size, seed=4)
+    return (lambda: tool.deduplicate_keywords(keyword_data)), len(keyword_data)
+
+
+def _near_dedup(size: int, scratch: str):
+    from keyword_dedup import NearDuplicateDetector
+    keywords = make_keywords(size, seed=5)
+    return (lambda: NearDuplicateDetector().cluster(keywords)), size
+
+
+def _export(size: int, scratch: str):
+    from main import BASIC_COLUMNS
+    from keyword_export import export_rows
+    keyword_data = _keyword_data(size, seed=6)
+    output = os.path.join(scratch, 'export.csv')
+    return (lambda: export_rows(keyword_data.values(), output, BASIC_COLUMNS,
+                                sort_by='trend_score')), len(keyword_data)
+
+
+# Benchmarked stages, in pipeline order
+WORKLOADS: Dict[str, Workload] = {
+    'autocomplete': _autocomplete,
+    'crawl': _crawl,
+    'trends': _trends,
+    'filter': _filter,
+    'scoring': _scoring,
+    'seasonality': _seasonality,
+    'forecast': _forecast,
+    'dedup': _dedup,
+    'near_dedup': _near_dedup,
+    'export': _export,
+}
@@ -0,0 +1,260 @@
+"""
+Coverage index of the topics existing posts already cover.
+
+The title, h1-h3 headings and meta keywords of every `posts/*.html` file are
+tokenized into an inverted index kept in SQLite; only files whose size or
+modification time changed are parsed again. A keyword's coverage score is the
+share of its (IDF-weighted) tokens found in the headings of its best matching
+post, so the pipeline can tag or skip keywords existing content already covers
+before they consume trends requests.
+"""
+
+import os
+import math
+import glob
+import sqlite3
+import logging
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from seed_reader import keyword_tokens
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = '.coverage_index.sqlite'
+DEFAULT_COVERAGE_THRESHOLD = 0.8
+
+# How much a token found in each part of a post counts towards coverage
+FIELD_WEIGHTS = {'title': 1.0, 'h1': 1.0, 'keywords': 1.0, 'h2': 0.8, 'h3': 0.6}
+
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS documents ('
+    ' name TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL,'
+    ' language TEXT NOT NULL, title TEXT)',
+    'CREATE TABLE IF NOT EXISTS postings ('
+    ' token TEXT NOT NULL, name TEXT NOT NULL, weight REAL NOT NULL,'
+    ' PRIMARY KEY (token, name))',
+    'CREATE INDEX IF NOT EXISTS idx_postings_name ON postings (name)',
+]
+
+
+class CoverageError(Exception):
+    """Custom exception for content coverage index errors."""
+    pass
+
+
+class _HeadingParser(HTMLParser):
+    """Collects the text of title and h1-h3 elements, and the meta keywords."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.fields: List[Tuple[str, str]] = []
+        self._open: Optional[str] = None
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in FIELD_WEIGHTS and self._open is None:
+            self._open, self._text = tag, []
+        elif tag == 'meta':
+            attributes = dict(attrs)
+            if (attributes.get('name') or '').lower() == 'keywords' and attributes.get('content'):
+                self.fields.append(('keywords', attributes['content']))
+
+    def handle_endtag(self, tag):
+        if tag == self._open:
+            text = ' '.join(''.join(self._text).split())
+            if text:
+                self.fields.append((tag, text))
+            self._open = None
+
+    def handle_data(self, data):
+        if self._open is not None:
+            self._text.append(data)
+
+
+def extract_headings(html: str) -> List[Tuple[str, str]]:
+    """
+    Indexed parts of a post.
+
+    Args:
+        html (str): Post HTML
+
+    Returns:
+        List[Tuple[str, str]]: (field, text) pairs, field being a FIELD_WEIGHTS key
+    """
+    parser = _HeadingParser()
+    parser.feed(html)
+    parser.close()
+    return parser.fields
+
+
+class CoverageIndex:
+    """Incrementally maintained inverted index of post headings, scored per keyword."""
+
+    def __init__(self, posts_dir: str, path: str = DEFAULT_INDEX_PATH, language: str = 'en'):
+        """
+        Open (and create if needed) the coverage index.
+
+        Args:
+            posts_dir (str): Directory of the posts (its *.html files are indexed)
+            path (str): SQLite database path
+            language (str): Language code used to pick the stopword list
+
+        Raises:
+            CoverageError: If the directory is missing or the database cannot be opened
+        """
+        if not os.path.isdir(posts_dir):
+            raise CoverageError(f"Posts directory not found: {posts_dir}")
+        self.posts_dir = posts_dir
+        self.path = path
+        self.language = language
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(path, timeout=30)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+            self._connection.commit()
+        except sqlite3.Error as e:
+            raise CoverageError(f"Could not open coverage index at {path}: {e}")
+
+        self._postings: Optional[Dict[str, Dict[str, float]]] = None
+        self._titles: Dict[str, str] = {}
+        self._memo: Dict[str, Tuple[float, Optional[str]]] = {}
+
+    def refresh(self) -> Dict[str, int]:
+        """
+        Bring the index up to date with the posts directory.
+
+        Only new or changed files (size, modification time or language differ)
+        are parsed; deleted files are dropped.
+
+        Returns:
+            Dict[str, int]: Counts of 'indexed', 'unchanged' and 'removed' posts
+
+        Raises:
+            CoverageError: If a post cannot be read or the index cannot be written
+        """
+        counts = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+        try:
+            known = {name: (mtime_ns, size, language) for name, mtime_ns, size, language in
+                     self._connection.execute('SELECT name, mtime_ns, size, language FROM documents')}
+            seen = set()
+            for file_path in sorted(glob.glob(os.path.join(self.posts_dir, '*.html'))):
+                name = os.path.basename(file_path)
+                seen.add(name)
+                stat = os.stat(file_path)
+                if known.get(name) == (stat.st_mtime_ns, stat.st_size, self.language):
+                    counts['unchanged'] += 1
+                    continue
+                self._index_file(file_path, name, stat)
+                counts['indexed'] += 1
+
+            for name in set(known) - seen:
+                self._connection.execute('DELETE FROM postings WHERE name = ?', (name,))
+                self._connection.execute('DELETE FROM documents WHERE name = ?', (name,))
+                counts['removed'] += 1
+            self._connection.commit()
+        except (OSError, sqlite3.Error) as e:
+            self._connection.rollback()
+            raise CoverageError(f"Could not index posts in {self.posts_dir}: {e}")
+
+        if counts['indexed'] or counts['removed']:
+            self._postings = None
+            self._memo.clear()
+        logger.info(f"Coverage index: {counts['indexed']} posts indexed, {counts['unchanged']} unchanged, "
+                    f"{counts['removed']} removed")
+        return counts
+
+    def _index_file(self, file_path: str, name: str, stat: os.stat_result):
+        """Replace one post's postings with those of its current content."""
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            fields = extract_headings(f.read())
+
+        weights: Dict[str, float] = {}
+        for field, text in fields:
+            for token in keyword_tokens(text, self.language):
+                weights[token] = max(weights.get(token, 0.0), FIELD_WEIGHTS[field])
+        title = next((text for field, text in fields if field == 'title'), None)
+
+        self._connection.execute('DELETE FROM postings WHERE name = ?', (name,))
+        self._connection.executemany('INSERT INTO postings (token, name, weight) VALUES (?, ?, ?)',
+                                     [(token, name, weight) for token, weight in weights.items()])
+        self._connection.execute(
+            'INSERT OR REPLACE INTO documents (name, mtime_ns, size, language, title) VALUES (?, ?, ?, ?, ?)',
+            (name, stat.st_mtime_ns, stat.st_size, self.language, title)
+        )
+
+    def _load(self):
+        """Read the postings into memory for scoring."""
+        self._postings = {}
+        for token, name, weight in self._connection.execute('SELECT token, name, weight FROM postings'):
+            self._postings.setdefault(token, {})[name] = weight
+        self._titles = dict(self._connection.execute('SELECT name, title FROM documents'))
+
+    def score(self, keyword: str) -> Tuple[float, Optional[str]]:
+        """
+        How well existing posts cover a keyword.
+
+        Each token counts with its IDF (tokens in every post, like the brand
+        name, count least) times its best field weight in the post.
+
+        Args:
+            keyword (str): Keyword
+
+        Returns:
+            Tuple[float, Optional[str]]: Coverage (0-1) by the best matching post,
+            and that post's file name (None without any overlap)
+        """
+        if keyword in self._memo:
+            return self._memo[keyword]
+        if self._postings is None:
+            self._load()
+
+        tokens = keyword_tokens(keyword, self.language)
+        documents = len(self._titles)
+        idf = {token: math.log((documents + 1) / (len(self._postings.get(token, ())) + 1)) + 1
+               for token in tokens}
+        total = sum(idf.values())
+
+        covered: Dict[str, float] = {}
+        for token in tokens:
+            for name, weight in self._postings.get(token, {}).items():
+                covered[name] = covered.get(name, 0.0) + idf[token] * weight
+
+        result = (0.0, None)
+        if covered and total:
+            # Ties go to the alphabetically first post, so runs are reproducible
+            name = min(covered, key=lambda name: (-covered[name], name))
+            result = (round(covered[name] / total, 3), name)
+        self._memo[keyword] = result
+        return result
+
+    def is_covered(self, keyword: str, threshold: float = DEFAULT_COVERAGE_THRESHOLD) -> bool:
+        """Whether a post covers a keyword at least `threshold`."""
+        return self.score(keyword)[0] >= threshold
+
+    def columns(self, keywords: Sequence[str]) -> List[Dict[str, Optional[object]]]:
+        """
+        Export columns per keyword: 'coverage_score' and 'covered_by' (post file name).
+
+        Args:
+            keywords (Sequence[str]): Keywords
+
+        Returns:
+            List[Dict[str, Optional[object]]]: One dict per keyword
+        """
+        columns = []
+        for keyword in keywords:
+            score, name = self.score(keyword)
+            columns.append({'coverage_score': score, 'covered_by': name})
+        return columns
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
@@ -0,0 +1,161 @@
+"""
+Bounded-memory frontier for breadth-first autocomplete crawls.
+
+Keywords waiting to be expanded and keywords already queued are held in memory
+up to a ceiling. Past it, the queue spills to a temporary SQLite table that is
+read back in FIFO pages, and the seen set switches to the seed reader's Bloom
+filter in front of an on-disk set. Deep crawls with full fan-out then use
+constant memory however many nodes they visit.
+"""
+
+import os
+import shutil
+import sqlite3
+import logging
+import tempfile
+from collections import deque
+from typing import List, Optional, Tuple
+
+from seed_reader import SeedDeduplicator, DISK_BATCH_SIZE
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_FRONTIER_MEMORY = 200000  # Keywords held in memory (queue + seen set) before spilling
+
+
+class CrawlFrontier:
+    """
+    FIFO queue of (keyword, depth) pairs that admits each keyword once.
+
+    Queue order is: in-memory head, then rows on disk, then an in-memory tail
+    batch waiting to be written. Once the head is full, new keywords go to the
+    tail, and the head is refilled a page at a time from disk, so the
+    breadth-first order is kept exactly.
+    """
+
+    def __init__(self, memory_items: int = DEFAULT_FRONTIER_MEMORY, directory: Optional[str] = None,
+                 capacity: int = 0):
+        """
+        Initialize the frontier.
+
+        Args:
+            memory_items (int): Keywords held in memory, split between the queue and
+                the seen set (the Bloom filter and the current page come on top)
+            directory (Optional[str]): Parent directory for the temporary databases
+            capacity (int): Expected number of distinct keywords (sizes the Bloom filter)
+        """
+        self.memory_items = max(memory_items, 2)
+        self.directory = directory
+        self._queue_limit = self.memory_items // 2
+        self._page_size = min(DISK_BATCH_SIZE, self._queue_limit)
+        self._seen = SeedDeduplicator(capacity, directory, memory_keys=self.memory_items // 2)
+
+        self._head = deque()
+        self._tail: List[Tuple[str, int]] = []
+        self._connection: Optional[sqlite3.Connection] = None
+        self._directory: Optional[str] = None
+        self._written = 0     # Rows written to disk so far
+        self._read_id = 0     # Last row id moved back into memory
+        self.queued = 0       # Distinct keywords admitted
+
+    @property
+    def capacity(self) -> int:
+        return self._seen.capacity
+
+    @capacity.setter
+    def capacity(self, value: int):
+        # Read when the seen set spills, so it can be set once the seeds are counted
+        self._seen.capacity = value
+
+    def push(self, keyword: str, depth: int) -> bool:
+        """
+        Queue a keyword unless it was queued before.
+
+        Args:
+            keyword (str): Keyword to expand
+            depth (int): Its depth in the crawl
+
+        Returns:
+            bool: True if the keyword was new and is now queued
+        """
+        if not self._seen.add(keyword):
+            return False
+        self.queued += 1
+        if self._read_id == self._written and not self._tail and len(self._head) < self._queue_limit:
+            self._head.append((keyword, depth))
+        else:
+            self._tail.append((keyword, depth))
+            if len(self._tail) >= self._page_size:
+                self._flush()
+        return True
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """
+        Take the next keyword to expand.
+
+        Returns:
+            Optional[Tuple[str, int]]: (keyword, depth), or None once the frontier is empty
+        """
+        if not self._head:
+            self._refill()
+        return self._head.popleft() if self._head else None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._directory = tempfile.mkdtemp(prefix='crawl_frontier_', dir=self.directory)
+            self._connection = sqlite3.connect(os.path.join(self._directory, 'queue.sqlite'))
+            self._connection.execute('PRAGMA journal_mode=OFF')
+            self._connection.execute('PRAGMA synchronous=OFF')
+            self._connection.execute(
+                'CREATE TABLE queue (id INTEGER PRIMARY KEY, keyword TEXT NOT NULL, depth INTEGER NOT NULL)'
+            )
+            logger.info(f"Crawl frontier above {self._queue_limit} keywords; queueing on disk")
+        return self._connection
+
+    def _flush(self):
+        """Append the tail batch to the on-disk queue."""
+        connection = self._connect()
+        connection.executemany('INSERT INTO queue (id, keyword, depth) VALUES (?, ?, ?)',
+                               ((self._written + offset + 1, keyword, depth)
+                                for offset, (keyword, depth) in enumerate(self._tail)))
+        connection.commit()
+        self._written += len(self._tail)
+        self._tail = []
+
+    def _refill(self):
+        """Move the next page from disk (or else the tail batch) into memory."""
+        if self._read_id < self._written:
+            rows = self._connection.execute(
+                'SELECT keyword, depth FROM queue WHERE id > ? ORDER BY id LIMIT ?',
+                (self._read_id, self._page_size)
+            ).fetchall()
+            self._read_id += len(rows)
+            self._head.extend(rows)
+        elif self._tail:
+            self._head.extend(self._tail)
+            self._tail = []
+
+    @property
+    def spilled(self) -> int:
+        """Keywords that went through the on-disk queue."""
+        return self._written
+
+    def __len__(self) -> int:
+        return len(self._head) + (self._written - self._read_id) + len(self._tail)
+
+    def close(self):
+        """Delete the temporary databases."""
+        self._seen.close()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+            shutil.rmtree(self._directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -3,22 +3,49 @@ Google Autocomplete API handler for keyword suggestions.
 Fetches keyword suggestions using Google's autocomplete service.
 """
 
-import requests
 import json
-import time
-from typing import List, Set
+import threading
+from typing import Iterable, List, Set, Optional, TYPE_CHECKING
 import logging
 
+from crawl_frontier import CrawlFrontier, DEFAULT_FRONTIER_MEMORY
+from rate_limiter import throttle, spend_request, BudgetExhaustedError
+from run_metrics import timed_request
+from response_cache import get_response_cache
+
+if TYPE_CHECKING:
+    from keyword_filters import KeywordFilter
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default modifiers tried by fetch_autocomplete_variations
+DEFAULT_PREFIXES = ['what is', 'how to', 'best', 'top', 'free', 'cheap', 'online']
+DEFAULT_SUFFIXES = ['jobs', 'career', 'salary', 'course', 'training', 'certification',
+                    'skills', 'tools', 'software', 'companies', 'remote', '2024', '2025']
+
+
+# One pooled HTTP session per thread (requests.Session is not thread-safe)
+_local = threading.local()
+
 
 class AutocompleteError(Exception):
     """Custom exception for autocomplete API errors."""
     pass
 
 
+def _get_session():
+    """Return this thread's keep-alive requests.Session, creating it on first use."""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        # Imported here so dry runs and cached runs never load requests
+        import requests
+        session = requests.Session()
+        _local.session = session
+    return session
+
+
 def fetch_google_autocomplete(seed_keyword: str, language: str = 'en', country: str = 'US') -> List[str]:
     """
     Fetch keyword suggestions from Google Autocomplete API.
@@ -33,7 +60,21 @@ def fetch_google_autocomplete(seed_keyword: str, language: str = 'en', country:
     
     Raises:
         AutocompleteError: If API request fails or returns invalid data
+        BudgetExhaustedError: If the response is not cached and the request budget is spent
     """
+    cache = get_response_cache()
+    cache_key = f"{language}|{country}|{seed_keyword}"
+    if cache is not None:
+        cached = cache.get('autocomplete', cache_key)
+        if cached is not None:
+            logger.debug(f"Autocomplete cache hit for '{seed_keyword}'")
+            return cached
+    
+    if not spend_request('autocomplete'):
+        raise BudgetExhaustedError(f"No request budget left for '{seed_keyword}'")
+    
+    import requests
+    
     try:
         # Google Autocomplete API endpoint
         url = "http://suggestqueries.google.com/complete/search"
@@ -49,13 +90,17 @@ def fetch_google_autocomplete(seed_keyword: str, language: str = 'en', country:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        logger.info(f"Fetching autocomplete suggestions for: '{seed_keyword}'")
+        # Respect the request budget (shared across workers in batch mode)
+        throttle('autocomplete')
         
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
+        logger.info(f"Fetching autocomplete suggestions for: '{seed_keyword}'")
         
-        # Parse JSON response
-        data = response.json()
+        with timed_request('autocomplete'):
+            response = _get_session().get(url, params=params, headers=headers, timeout=10)
+            response.raise_for_status()
+            
+            # Parse JSON response
+            data = response.json()
         
         if not data or len(data) < 2:
             logger.warning(f"No suggestions found for '{seed_keyword}'")
@@ -70,6 +115,8 @@ def fetch_google_autocomplete(seed_keyword: str, language: str = 'en', country:
         ]
         
         logger.info(f"Found {len(filtered_suggestions)} suggestions for '{seed_keyword}'")
+        if cache is not None:
+            cache.set('autocomplete', cache_key, filtered_suggestions)
         return filtered_suggestions
         
     except requests.exceptions.RequestException as e:
@@ -85,64 +132,82 @@ def fetch_google_autocomplete(seed_keyword: str, language: str = 'en', country:
         raise AutocompleteError(f"Unexpected error: {e}")
 
 
-def fetch_autocomplete_recursive(seed_keywords: List[str], max_depth: int = 2, 
+def fetch_autocomplete_recursive(seed_keywords: Iterable[str], max_depth: int = 2, 
                                 max_keywords_per_seed: int = 5, 
-                                language: str = 'en', country: str = 'US') -> Set[str]:
+                                language: str = 'en', country: str = 'US',
+                                keyword_filter: Optional['KeywordFilter'] = None,
+                                frontier_memory: int = DEFAULT_FRONTIER_MEMORY) -> Set[str]:
     """
     Recursively fetch keyword suggestions.
     
     Args:
-        seed_keywords (List[str]): Initial seed keywords
+        seed_keywords (Iterable[str]): Initial seed keywords
         max_depth (int): Maximum recursion depth (default: 2)
         max_keywords_per_seed (int): Max suggestions per keyword (default: 5)
         language (str): Language code (default: 'en')
         country (str): Country code (default: 'US')
+        keyword_filter (Optional[KeywordFilter]): Predicate applied as keywords are
+            discovered; branches it cannot match are not expanded
+        frontier_memory (int): Keywords the crawl queue and seen set hold in memory
+            before spilling to disk; it does not bound the returned keywords
     
     Returns:
-        Set[str]: Unique set of all discovered keywords
+        Set[str]: Unique set of all discovered keywords that pass the filter
+            (held in memory, so filters are what bound it)
     """
     all_keywords = set()
-    processed_keywords = set()
     
-    # Queue for BFS-style processing
-    queue = [(keyword.strip(), 0) for keyword in seed_keywords]
-    
-    while queue:
-        current_keyword, depth = queue.pop(0)
-        
-        if current_keyword in processed_keywords or depth >= max_depth:
-            continue
-            
-        processed_keywords.add(current_keyword)
-        all_keywords.add(current_keyword)
+    # Breadth-first; the frontier admits each keyword once and spills to disk past
+    # `frontier_memory` keywords, so deep full fan-out crawls stay bounded
+    with CrawlFrontier(memory_items=frontier_memory) as frontier:
+        seeds = 0
+        for keyword in seed_keywords:
+            seeds += 1
+            if max_depth > 0:
+                frontier.push(keyword.strip(), 0)
+        # Sizes the Bloom filter, should the seen set outgrow memory
+        frontier.capacity = seeds * sum(max_keywords_per_seed ** depth for depth in range(max_depth))
         
-        try:
-            # Add small delay to be respectful to the API
-            time.sleep(0.5)
-            
-            suggestions = fetch_google_autocomplete(current_keyword, language, country)
-            
-            # Limit suggestions per keyword to avoid explosion
-            limited_suggestions = suggestions[:max_keywords_per_seed]
+        while True:
+            item = frontier.pop()
+            if item is None:
+                break
+            current_keyword, depth = item
+            if keyword_filter is None or keyword_filter.matches(current_keyword):
+                all_keywords.add(current_keyword)
             
-            for suggestion in limited_suggestions:
-                if suggestion not in processed_keywords:
-                    all_keywords.add(suggestion)
+            try:
+                # Requests are spaced by the rate limiter inside fetch_google_autocomplete
+                suggestions = fetch_google_autocomplete(current_keyword, language, country)
+                
+                # Limit suggestions per keyword to avoid explosion
+                limited_suggestions = suggestions[:max_keywords_per_seed]
+                
+                for suggestion in limited_suggestions:
+                    if keyword_filter is None or keyword_filter.matches(suggestion):
+                        all_keywords.add(suggestion)
                     # Add to queue for next level processing
-                    if depth + 1 < max_depth:
-                        queue.append((suggestion, depth + 1))
-                        
-        except AutocompleteError as e:
-            logger.warning(f"Failed to fetch suggestions for '{current_keyword}': {e}")
-            continue
-    
-    logger.info(f"Recursive search completed. Found {len(all_keywords)} unique keywords.")
+                    if depth + 1 < max_depth and (keyword_filter is None or
+                                                  keyword_filter.can_expand(suggestion)):
+                        frontier.push(suggestion, depth + 1)
+                            
+            except AutocompleteError as e:
+                logger.warning(f"Failed to fetch suggestions for '{current_keyword}': {e}")
+                continue
+            except BudgetExhaustedError:
+                # Cached branches further down the queue are still free
+                continue
+        
+        spilled = f" ({frontier.spilled} queued on disk)" if frontier.spilled else ""
+        logger.info(f"Recursive search completed. Expanded {frontier.queued} keywords{spilled}, "
+                    f"found {len(all_keywords)} unique keywords.")
     return all_keywords
 
 
 def fetch_autocomplete_variations(seed_keyword: str, prefixes: List[str] = None, 
                                  suffixes: List[str] = None, language: str = 'en', 
-                                 country: str = 'US') -> Set[str]:
+                                 country: str = 'US',
+                                 keyword_filter: Optional['KeywordFilter'] = None) -> Set[str]:
     """
     Fetch autocomplete suggestions with various prefixes and suffixes.
     
@@ -152,16 +217,21 @@ def fetch_autocomplete_variations(seed_keyword: str, prefixes: List[str] = None,
         suffixes (List[str]): List of suffixes to try (default: common modifiers)
         language (str): Language code
         country (str): Country code
+        keyword_filter (Optional[KeywordFilter]): Predicate applied to suggestions;
+            variation queries whose completions cannot match are skipped
     
     Returns:
         Set[str]: Unique set of keyword variations
     """
     if prefixes is None:
-        prefixes = ['what is', 'how to', 'best', 'top', 'free', 'cheap', 'online']
+        prefixes = DEFAULT_PREFIXES
     
     if suffixes is None:
-        suffixes = ['jobs', 'career', 'salary', 'course', 'training', 'certification', 
-                   'skills', 'tools', 'software', 'companies', 'remote', '2024', '2025']
+        suffixes = DEFAULT_SUFFIXES
+    
+    if keyword_filter is not None:
+        prefixes = [p for p in prefixes if keyword_filter.can_expand(f"{p} {seed_keyword}")]
+        suffixes = [s for s in suffixes if keyword_filter.can_expand(f"{seed_keyword} {s}")]
     
     all_variations = set()
     
@@ -169,8 +239,7 @@ def fetch_autocomplete_variations(seed_keyword: str, prefixes: List[str] = None,
     try:
         original_suggestions = fetch_google_autocomplete(seed_keyword, language, country)
         all_variations.update(original_suggestions)
-        time.sleep(0.5)
-    except AutocompleteError:
+    except (AutocompleteError, BudgetExhaustedError):
         pass
     
     # Try with prefixes
@@ -179,8 +248,7 @@ def fetch_autocomplete_variations(seed_keyword: str, prefixes: List[str] = None,
             variation = f"{prefix} {seed_keyword}"
             suggestions = fetch_google_autocomplete(variation, language, country)
             all_variations.update(suggestions)
-            time.sleep(0.5)
-        except AutocompleteError:
+        except (AutocompleteError, BudgetExhaustedError):
             continue
     
     # Try with suffixes
@@ -189,10 +257,12 @@ def fetch_autocomplete_variations(seed_keyword: str, prefixes: List[str] = None,
             variation = f"{seed_keyword} {suffix}"
             suggestions = fetch_google_autocomplete(variation, language, country)
             all_variations.update(suggestions)
-            time.sleep(0.5)
-        except AutocompleteError:
+        except (AutocompleteError, BudgetExhaustedError):
             continue
     
+    if keyword_filter is not None:
+        all_variations = {k for k in all_variations if keyword_filter.matches(k)}
+    
     logger.info(f"Found {len(all_variations)} variations for '{seed_keyword}'")
     return all_variations
 
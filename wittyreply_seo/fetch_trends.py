@@ -3,13 +3,15 @@ Google Trends data handler using pytrends.
 Fetches trend scores and interest data for keywords.
 """
 
-import pandas as pd
-from pytrends.request import TrendReq
-import time
+import math
 import logging
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import random
 
+from rate_limiter import throttle, spend_request, can_spend
+from run_metrics import stage, timed_request, metered_sleep, record_retry
+from response_cache import get_response_cache
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,23 +35,52 @@ class TrendsClient:
         """
         self.language = language
         self.timezone = timezone
-        self.pytrends = None
-        self._initialize_client()
+        # The pytrends session (pandas import + cookie handshake) is created on
+        # first use, so runs served entirely from the response cache skip it
+        self._pytrends = None
+        self._init_error: Optional[TrendsError] = None
+    
+    @property
+    def pytrends(self):
+        """The pytrends client, initialized on first access."""
+        if self._pytrends is None:
+            if self._init_error is not None:
+                # Don't repeat a failed handshake on every call; _initialize_client() retries explicitly
+                raise self._init_error
+            self._initialize_client()
+        return self._pytrends
+    
+    @pytrends.setter
+    def pytrends(self, client):
+        self._pytrends = client
+    
+    def ensure_client(self):
+        """Initialize the pytrends client now (e.g. to warm up a long-running service)."""
+        return self.pytrends
     
     def _initialize_client(self):
         """Initialize pytrends client with retry logic."""
+        from pytrends.request import TrendReq
+        
         max_retries = 3
         for attempt in range(max_retries):
+            if attempt > 0:
+                record_retry('trends_client_init')
             try:
-                self.pytrends = TrendReq(hl=self.language, tz=self.timezone)
+                with stage('trends_client_init'):
+                    self._pytrends = TrendReq(hl=self.language, tz=self.timezone)
+                self._init_error = None
                 logger.info("Successfully initialized Google Trends client")
                 return
             except Exception as e:
                 logger.warning(f"Failed to initialize trends client (attempt {attempt + 1}): {e}")
                 if attempt < max_retries - 1:
-                    time.sleep(random.uniform(2, 5))
+                    metered_sleep('trends_client_init', random.uniform(2, 5))
                 else:
-                    raise TrendsError(f"Failed to initialize trends client after {max_retries} attempts: {e}")
+                    self._init_error = TrendsError(
+                        f"Failed to initialize trends client after {max_retries} attempts: {e}"
+                    )
+                    raise self._init_error
     
     def get_trend_score(self, keyword: str, timeframe: str = 'today 1-m', 
                        geo: str = 'US') -> Optional[float]:
@@ -64,15 +95,27 @@ class TrendsClient:
         Returns:
             Optional[float]: Trend score (0-100) or None if no data
         """
+        cache = get_response_cache()
+        cache_key = f"{geo}|{timeframe}|{keyword}"
+        if cache is not None:
+            cached = cache.get_many('trend_score', [cache_key])
+            if cache_key in cached:
+                return cached[cache_key]
+        
+        if not spend_request('trends'):
+            return None
+        
         try:
             # Add random delay to avoid rate limiting
-            time.sleep(random.uniform(1, 3))
+            metered_sleep('trends_delay', random.uniform(1, 3))
+            throttle('trends')
             
             logger.info(f"Fetching trend data for: '{keyword}'")
             
             # Build payload and get interest over time
-            self.pytrends.build_payload([keyword], timeframe=timeframe, geo=geo)
-            interest_df = self.pytrends.interest_over_time()
+            with timed_request('trends'):
+                self.pytrends.build_payload([keyword], timeframe=timeframe, geo=geo)
+                interest_df = self.pytrends.interest_over_time()
             
             if interest_df.empty or keyword not in interest_df.columns:
                 logger.warning(f"No trend data found for '{keyword}'")
@@ -88,11 +131,14 @@ class TrendsClient:
             trend_score = max(latest_score, avg_score)
             
             logger.info(f"Trend score for '{keyword}': {trend_score:.1f}")
+            if cache is not None:
+                cache.set('trend_score', cache_key, float(trend_score))
             return float(trend_score)
             
         except Exception as e:
             logger.error(f"Error fetching trend data for '{keyword}': {e}")
             # Reinitialize client on error
+            record_retry('trends')
             try:
                 self._initialize_client()
             except:
@@ -100,7 +146,9 @@ class TrendsClient:
             return None
     
     def get_batch_trends(self, keywords: List[str], batch_size: int = 5, 
-                        timeframe: str = 'today 1-m', geo: str = 'US') -> Dict[str, Optional[float]]:
+                        timeframe: str = 'today 1-m', geo: str = 'US',
+                        on_batch: Optional[Callable[[Dict[str, Optional[float]]], None]] = None
+                        ) -> Dict[str, Optional[float]]:
         """
         Get trend scores for multiple keywords in batches.
         
@@ -109,39 +157,77 @@ class TrendsClient:
             batch_size (int): Number of keywords per batch (max 5 for pytrends)
             timeframe (str): Time period
             geo (str): Geographic region
+            on_batch (Optional[Callable]): Called with each batch's scores as they
+                arrive (and once with the cached ones), e.g. to persist partial results
         
         Returns:
             Dict[str, Optional[float]]: Mapping of keywords to trend scores
         """
         results = {}
         
+        # Serve what we can from the response cache; only fetch the misses
+        cache = get_response_cache()
+        cache_keys = {keyword: f"{geo}|{timeframe}|{keyword}" for keyword in keywords}
+        if cache is not None:
+            cached = cache.get_many('trends', cache_keys.values())
+            for keyword, cache_key in cache_keys.items():
+                if cache_key in cached:
+                    results[keyword] = cached[cache_key]
+            if results:
+                logger.info(f"Served {len(results)} trend scores from cache")
+                if on_batch is not None:
+                    on_batch(dict(results))
+        pending = [keyword for keyword in keywords if keyword not in results]
+        
+        if pending and not can_spend('trends'):
+            # Budget spent (or --offline): don't pay for a handshake no request can use
+            results.update({keyword: None for keyword in pending})
+            return results
+        if pending:
+            try:
+                self.ensure_client()
+            except TrendsError as e:
+                logger.error(f"Trends client not available: {e}")
+                results.update({keyword: None for keyword in pending})
+                return results
+        
         # Process keywords in batches
-        for i in range(0, len(keywords), batch_size):
-            batch = keywords[i:i + batch_size]
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            if not spend_request('trends'):
+                results.update({keyword: None for keyword in pending[i:]})
+                break
             
             try:
                 # Add delay between batches
                 if i > 0:
-                    time.sleep(random.uniform(3, 6))
+                    metered_sleep('trends_delay', random.uniform(3, 6))
+                throttle('trends')
                 
                 logger.info(f"Processing batch {i//batch_size + 1}: {batch}")
                 
                 # Build payload for batch
-                self.pytrends.build_payload(batch, timeframe=timeframe, geo=geo)
-                interest_df = self.pytrends.interest_over_time()
+                with timed_request('trends'):
+                    self.pytrends.build_payload(batch, timeframe=timeframe, geo=geo)
+                    interest_df = self.pytrends.interest_over_time()
                 
                 if not interest_df.empty:
                     for keyword in batch:
                         if keyword in interest_df.columns:
                             # Get average score for the period
                             avg_score = interest_df[keyword].mean()
-                            results[keyword] = float(avg_score) if pd.notna(avg_score) else 0.0
+                            results[keyword] = 0.0 if math.isnan(avg_score) else float(avg_score)
                         else:
                             results[keyword] = None
                 else:
                     # No data for any keyword in batch
                     for keyword in batch:
                         results[keyword] = None
+                
+                if cache is not None:
+                    cache.set_many('trends', {cache_keys[k]: results[k] for k in batch})
+                if on_batch is not None:
+                    on_batch({k: results[k] for k in batch})
                         
             except Exception as e:
                 logger.error(f"Error processing batch {batch}: {e}")
@@ -150,6 +236,7 @@ class TrendsClient:
                     results[keyword] = None
                 
                 # Reinitialize client and continue
+                record_retry('trends')
                 try:
                     self._initialize_client()
                 except:
@@ -158,6 +245,117 @@ class TrendsClient:
         logger.info(f"Completed trend analysis for {len(keywords)} keywords")
         return results
     
+    def get_regional_interest(self, keywords: List[str], geos: List[str], batch_size: int = 5,
+                              timeframe: str = 'today 1-m') -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Get interest per region for many keywords, one request per keyword batch.
+        
+        A worldwide payload read with interest_by_region covers every country at
+        once, so comparing several geos costs the same as a single-geo run.
+        Subregions such as 'US-CA' are read from a payload scoped to their country.
+        With several keywords per payload, Google scales each region's values
+        across the batch, so they rank keywords within a region.
+        
+        Args:
+            keywords (List[str]): Keywords to analyze
+            geos (List[str]): Country or subregion codes (e.g. ['US', 'FR', 'MA'])
+            batch_size (int): Number of keywords per batch (max 5 for pytrends)
+            timeframe (str): Time period
+        
+        Returns:
+            Dict[str, Dict[str, Optional[float]]]: Interest per keyword and geo (None if unavailable)
+        """
+        results = {keyword: {geo: None for geo in geos} for keyword in keywords}
+        
+        # '' is the worldwide payload (countries); 'US' covers US subregions
+        scopes = {}
+        for geo in geos:
+            scopes.setdefault(geo.split('-')[0] if '-' in geo else '', []).append(geo)
+        
+        for scope, scope_geos in scopes.items():
+            by_keyword = self._get_interest_by_region(keywords, scope, batch_size, timeframe)
+            for keyword, by_geo in by_keyword.items():
+                if by_geo is None:
+                    continue
+                # Only regions with interest are stored; a missing one means zero
+                for geo in scope_geos:
+                    results[keyword][geo] = by_geo.get(geo, 0.0)
+        
+        return results
+    
+    def _get_interest_by_region(self, keywords: List[str], scope: str, batch_size: int,
+                                timeframe: str) -> Dict[str, Optional[Dict[str, float]]]:
+        """Interest per region code for each keyword within one payload scope."""
+        results = {}
+        resolution = 'REGION' if scope else 'COUNTRY'
+        
+        cache = get_response_cache()
+        cache_keys = {keyword: f"{scope or 'world'}|{timeframe}|{keyword}" for keyword in keywords}
+        if cache is not None:
+            cached = cache.get_many('regional', cache_keys.values())
+            for keyword, cache_key in cache_keys.items():
+                if cache_key in cached:
+                    results[keyword] = cached[cache_key]
+        pending = [keyword for keyword in keywords if keyword not in results]
+        
+        if pending and not can_spend('trends_regional'):
+            # Budget spent (or --offline): don't pay for a handshake no request can use
+            results.update({keyword: None for keyword in pending})
+            return results
+        if pending:
+            try:
+                self.ensure_client()
+            except TrendsError as e:
+                logger.error(f"Trends client not available: {e}")
+                results.update({keyword: None for keyword in pending})
+                return results
+        
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            if not spend_request('trends_regional'):
+                results.update({keyword: None for keyword in pending[i:]})
+                break
+            
+            try:
+                if i > 0:
+                    metered_sleep('trends_delay', random.uniform(3, 6))
+                throttle('trends')
+                
+                logger.info(f"Fetching {resolution.lower()} interest for batch {i//batch_size + 1}: {batch}")
+                
+                with timed_request('trends_regional'):
+                    self.pytrends.build_payload(batch, timeframe=timeframe, geo=scope)
+                    region_df = self.pytrends.interest_by_region(
+                        resolution=resolution, inc_low_vol=True, inc_geo_code=True
+                    )
+                
+                codes = region_df['geoCode'].tolist() if 'geoCode' in region_df.columns else []
+                for keyword in batch:
+                    if keyword not in region_df.columns:
+                        results[keyword] = {}
+                        continue
+                    results[keyword] = {
+                        code: float(value)
+                        for code, value in zip(codes, region_df[keyword].tolist())
+                        if code and not math.isnan(value) and value > 0
+                    }
+                
+                if cache is not None:
+                    cache.set_many('regional', {cache_keys[k]: results[k] for k in batch})
+            
+            except Exception as e:
+                logger.error(f"Error fetching regional interest for {batch}: {e}")
+                for keyword in batch:
+                    results[keyword] = None
+                
+                record_retry('trends')
+                try:
+                    self._initialize_client()
+                except:
+                    pass
+        
+        return results
+    
     def get_related_queries(self, keyword: str, timeframe: str = 'today 1-m', 
                            geo: str = 'US') -> List[str]:
         """
@@ -171,13 +369,25 @@ class TrendsClient:
         Returns:
             List[str]: List of related queries
         """
+        cache = get_response_cache()
+        cache_key = f"{geo}|{timeframe}|{keyword}"
+        if cache is not None:
+            cached = cache.get('related', cache_key)
+            if cached is not None:
+                return cached
+        
+        if not spend_request('trends_related'):
+            return []
+        
         try:
-            time.sleep(random.uniform(2, 4))
+            metered_sleep('trends_delay', random.uniform(2, 4))
+            throttle('trends')
             
             logger.info(f"Fetching related queries for: '{keyword}'")
             
-            self.pytrends.build_payload([keyword], timeframe=timeframe, geo=geo)
-            related_queries = self.pytrends.related_queries()
+            with timed_request('trends_related'):
+                self.pytrends.build_payload([keyword], timeframe=timeframe, geo=geo)
+                related_queries = self.pytrends.related_queries()
             
             if not related_queries or keyword not in related_queries:
                 return []
@@ -204,6 +414,8 @@ class TrendsClient:
                     seen.add(query)
             
             logger.info(f"Found {len(unique_related)} related queries for '{keyword}'")
+            if cache is not None:
+                cache.set('related', cache_key, unique_related)
             return unique_related
             
         except Exception as e:
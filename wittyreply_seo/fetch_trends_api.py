@@ -4,19 +4,26 @@ Provides enhanced trend data, competition analysis, and keyword scoring.
 """
 
 import requests
-import pandas as pd
 import time
 import logging
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 import json
 from datetime import datetime, timedelta
 import numpy as np
 from dataclasses import dataclass
 
+from rate_limiter import throttle, spend_request, can_spend
+from run_metrics import timed_request, metered_sleep
+from response_cache import get_response_cache
+from intent_tagger import IntentTagger
+from seasonality import apply_seasonality, MIN_POINTS
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+STRONG_SEASONALITY = 0.6  # seasonality_strength above which the peak month drives timing
+
 
 @dataclass
 class KeywordMetrics:
@@ -33,6 +40,62 @@ class KeywordMetrics:
     opportunity_score: Optional[float] = None
     difficulty_score: Optional[float] = None
     recommendation: Optional[str] = None
+    propagated_from: Optional[str] = None  # Cluster centroid whose metrics were copied
+    intent: Optional[str] = None  # Primary search intent (see intent_tagger.INTENTS)
+    intents: Optional[List[str]] = None  # All matching search intents
+    trend_slope: Optional[float] = None  # Monthly trend as a fraction of mean interest
+    seasonality_strength: Optional[float] = None  # Share of variation in the yearly cycle (0-1)
+    peak_month: Optional[int] = None  # Calendar month (1-12) of the seasonal peak
+    volatility: Optional[float] = None  # Unexplained variation as a fraction of mean interest
+
+
+def monthly_means(interest) -> List[float]:
+    """
+    Average a weekly interest_over_time column per calendar month.
+    
+    Months are labelled by their start ('MS'): the month-end alias 'M' was
+    removed in pandas 3, and failed there for every keyword.
+    
+    Args:
+        interest (pd.Series): Interest values indexed by date
+    
+    Returns:
+        List[float]: One mean per month, oldest first
+    """
+    return interest.resample('MS').mean().tolist()
+
+
+def estimate_competition(keyword: str) -> Dict:
+    """
+    Competition estimate from the keyword alone, used without paid API data.
+    
+    Args:
+        keyword (str): Keyword
+    
+    Returns:
+        Dict: competition, competition_score, cpc_low and cpc_high (None)
+    """
+    # Simple heuristic: longer, more specific keywords = lower competition
+    word_count = len(keyword.split())
+    char_count = len(keyword)
+    
+    # Estimate competition based on keyword characteristics
+    if word_count >= 4 or char_count >= 25:
+        competition = "LOW"
+        competition_score = 0.3
+    elif word_count >= 3 or char_count >= 15:
+        competition = "MEDIUM"
+        competition_score = 0.5
+    else:
+        competition = "HIGH"
+        competition_score = 0.8
+    
+    return {
+        'competition': competition,
+        'competition_score': competition_score,
+        'cpc_low': None,
+        'cpc_high': None
+    }
 
 
 class GoogleTrendsAPI:
@@ -59,17 +122,29 @@ class GoogleTrendsAPI:
         self.last_request_time = 0
         self.min_request_interval = 1.0  # seconds
         
+        # The pytrends fallback (cookie handshake) is created on first use, so
+        # cached and --offline runs never contact Google
+        self._pytrends = None
+        self._pytrends_ready = self.use_paid_api
+        
         if self.use_paid_api:
             logger.info("Initialized Google Trends API with paid access")
         else:
             logger.info("Initialized Google Trends API with free access (pytrends)")
-            # Fallback to pytrends for free access
+    
+    @property
+    def pytrends(self):
+        """The pytrends fallback for free access, initialized on first access (None if unavailable)."""
+        if not self._pytrends_ready:
+            self._pytrends_ready = True
             try:
                 from pytrends.request import TrendReq
-                self.pytrends = TrendReq(hl='en-US', tz=360)
+                self._pytrends = TrendReq(hl='en-US', tz=360)
             except ImportError:
                 logger.error("pytrends not available. Install with: pip install pytrends")
-                self.pytrends = None
+            except Exception as e:
+                logger.error(f"Could not initialize pytrends: {e}")
+        return self._pytrends
     
     def _rate_limit(self):
         """Implement rate limiting for API requests."""
@@ -78,7 +153,7 @@ class GoogleTrendsAPI:
         
         if time_since_last < self.min_request_interval:
             sleep_time = self.min_request_interval - time_since_last
-            time.sleep(sleep_time)
+            metered_sleep('trends_api', sleep_time)
         
         self.last_request_time = time.time()
     
@@ -97,15 +172,19 @@ class GoogleTrendsAPI:
             logger.warning("Paid API not configured. Using free fallback.")
             return None
         
+        if not spend_request('trends_api'):
+            return None
+        
         self._rate_limit()
         
         url = f"{self.base_url}/{endpoint}"
         params['key'] = self.api_key
         
         try:
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            with timed_request('trends_api'):
+                response = requests.get(url, params=params, timeout=30)
+                response.raise_for_status()
+                return response.json()
         
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed: {e}")
@@ -137,8 +216,8 @@ class GoogleTrendsAPI:
                 return {item['keyword']: item.get('search_volume') 
                        for item in data['keywords']}
         
-        # Fallback to pytrends (relative data)
-        if self.pytrends:
+        # Fallback to pytrends (relative data); cached volumes need no client
+        if not self.use_paid_api:
             return self._get_volume_from_pytrends(keywords, geo, timeframe)
         
         return {keyword: None for keyword in keywords}
@@ -151,12 +230,28 @@ class GoogleTrendsAPI:
             pytrends_timeframe = self._convert_timeframe(timeframe)
             
             results = {}
+            cache = get_response_cache()
+            if cache is not None:
+                cached = cache.get_many('volume', [f"{geo}|{pytrends_timeframe}|{k}" for k in keywords])
+                for keyword in keywords:
+                    cache_key = f"{geo}|{pytrends_timeframe}|{keyword}"
+                    if cache_key in cached:
+                        results[keyword] = cached[cache_key]
+            
             for keyword in keywords:
+                if keyword in results:
+                    continue
+                # The client is only set up once a request can actually be sent
+                if not can_spend('volume') or not self.pytrends or not spend_request('volume'):
+                    results[keyword] = None
+                    continue
                 try:
-                    self.pytrends.build_payload([keyword], 
-                                              timeframe=pytrends_timeframe, 
-                                              geo=geo)
-                    interest_df = self.pytrends.interest_over_time()
+                    throttle('trends')
+                    with timed_request('trends'):
+                        self.pytrends.build_payload([keyword], 
+                                                  timeframe=pytrends_timeframe, 
+                                                  geo=geo)
+                        interest_df = self.pytrends.interest_over_time()
                     
                     if not interest_df.empty and keyword in interest_df.columns:
                         # Use average as proxy for search volume
@@ -167,7 +262,10 @@ class GoogleTrendsAPI:
                     else:
                         results[keyword] = 0
                     
-                    time.sleep(2)  # Rate limiting for pytrends
+                    if cache is not None:
+                        cache.set('volume', f"{geo}|{pytrends_timeframe}|{keyword}", results[keyword])
+                    
+                    metered_sleep('trends_delay', 2)  # Rate limiting for pytrends
                     
                 except Exception as e:
                     logger.warning(f"Error getting volume for '{keyword}': {e}")
@@ -221,32 +319,7 @@ class GoogleTrendsAPI:
     
     def _estimate_competition(self, keywords: List[str], geo: str) -> Dict[str, Dict]:
         """Estimate competition using available data."""
-        results = {}
-        
-        for keyword in keywords:
-            # Simple heuristic: longer, more specific keywords = lower competition
-            word_count = len(keyword.split())
-            char_count = len(keyword)
-            
-            # Estimate competition based on keyword characteristics
-            if word_count >= 4 or char_count >= 25:
-                competition = "LOW"
-                competition_score = 0.3
-            elif word_count >= 3 or char_count >= 15:
-                competition = "MEDIUM"
-                competition_score = 0.5
-            else:
-                competition = "HIGH"
-                competition_score = 0.8
-            
-            results[keyword] = {
-                'competition': competition,
-                'competition_score': competition_score,
-                'cpc_low': None,
-                'cpc_high': None
-            }
-        
-        return results
+        return {keyword: estimate_competition(keyword) for keyword in keywords}
     
     def get_seasonal_trends(self, keyword: str, geo: str = 'US') -> Optional[List[float]]:
         """
@@ -259,17 +332,28 @@ class GoogleTrendsAPI:
 Returns:
             Optional[List[float]]: Monthly trend data for the past year
         """
+        cache = get_response_cache()
+        cache_key = f"{geo}|{keyword}"
+        if cache is not None:
+            cached = cache.get('seasonal', cache_key)
+            if cached is not None:
+                return cached
+        
         try:
-            if self.pytrends:
-                self.pytrends.build_payload([keyword], 
-                                          timeframe='today 12-m', 
-                                          geo=geo)
-                interest_df = self.pytrends.interest_over_time()
+            if can_spend('seasonal') and self.pytrends and spend_request('seasonal'):
+                throttle('trends')
+                with timed_request('trends'):
+                    self.pytrends.build_payload([keyword], 
+                                              timeframe='today 12-m', 
+                                              geo=geo)
+                    interest_df = self.pytrends.interest_over_time()
                 
                 if not interest_df.empty and keyword in interest_df.columns:
                     # Resample to monthly data
-                    monthly_data = interest_df[keyword].resample('M').mean()
-                    return monthly_data.tolist()
+                    monthly_data = monthly_means(interest_df[keyword])
+                    if cache is not None:
+                        cache.set('seasonal', cache_key, monthly_data)
+                    return monthly_data
             
             return None
             
@@ -281,40 +365,64 @@ Returns:
 class KeywordAnalyzer:
     """Advanced keyword analysis and recommendation engine."""
     
-    def __init__(self, trends_api: GoogleTrendsAPI):
+    def __init__(self, trends_api: GoogleTrendsAPI, language: str = 'en',
+                 intent_tagger: Optional[IntentTagger] = None):
         """
         Initialize the keyword analyzer.
         
         Args:
             trends_api (GoogleTrendsAPI): Trends API client
+            language (str): Keyword language, selects the intent lexicons
+            intent_tagger (Optional[IntentTagger]): Shared tagger (built for `language` if None)
         """
         self.trends_api = trends_api
+        self.intent_tagger = intent_tagger or IntentTagger(language)
     
-    def analyze_keywords(self, keywords: List[str], geo: str = 'US') -> List[KeywordMetrics]:
+    def analyze_keywords(self, keywords: List[str], geo: str = 'US',
+                         known: Optional[Dict[str, KeywordMetrics]] = None,
+                         on_progress: Optional[Callable[[KeywordMetrics], None]] = None
+                         ) -> List[KeywordMetrics]:
         """
         Perform comprehensive analysis of keywords.
         
         Args:
             keywords (List[str]): Keywords to analyze
             geo (str): Geographic region
+            known (Optional[Dict[str, KeywordMetrics]]): Already fetched metrics (e.g. from a
+                resumed run's partial results); these keywords are only re-scored
+            on_progress (Optional[Callable]): Called with each keyword's metrics once its
+                data is fetched, before scoring, e.g. to persist partial results
         
         Returns:
             List[KeywordMetrics]: Analyzed keyword metrics
         """
         logger.info(f"Analyzing {len(keywords)} keywords...")
+        known = known or {}
+        fetch = [keyword for keyword in keywords if keyword not in known]
         
         # Get search volume data
         logger.info("Fetching search volume data...")
-        search_volumes = self.trends_api.get_search_volume(keywords, geo)
+        search_volumes = self.trends_api.get_search_volume(fetch, geo) if fetch else {}
         
         # Get competition data
         logger.info("Fetching competition data...")
-        competition_data = self.trends_api.get_competition_data(keywords, geo)
+        competition_data = self.trends_api.get_competition_data(fetch, geo) if fetch else {}
+        
+        # Tag search intent for the whole keyword column at once
+        intents = self.intent_tagger.tag_many(keywords)
         
         # Analyze each keyword
         results = []
-        for keyword in keywords:
-            metrics = KeywordMetrics(keyword=keyword)
+        for keyword, tags in zip(keywords, intents):
+            if keyword in known:
+                metrics = known[keyword]
+                metrics.intents = list(tags)
+                metrics.intent = IntentTagger.primary(tags)
+                results.append(metrics)
+                continue
+            
+            metrics = KeywordMetrics(keyword=keyword, intents=list(tags),
+                                     intent=IntentTagger.primary(tags))
             
             # Basic metrics
             metrics.search_volume = search_volumes.get(keyword)
@@ -327,15 +435,22 @@ class KeywordAnalyzer:
             # Get seasonal trends
             metrics.seasonal_trend = self.trends_api.get_seasonal_trends(keyword, geo)
             
-            # Calculate derived metrics
+            results.append(metrics)
+            if on_progress is not None:
+                on_progress(metrics)
+            
+            # Small delay between keywords (none once no request can be sent, e.g. --offline)
+            if can_spend('seasonal'):
+                metered_sleep('analyzer_delay', 0.5)
+        
+        # Decompose every keyword's seasonal series in one vectorized pass
+        apply_seasonality(results)
+        
+        # Calculate derived metrics
+        for metrics in results:
             metrics.opportunity_score = self._calculate_opportunity_score(metrics)
             metrics.difficulty_score = self._calculate_difficulty_score(metrics)
             metrics.recommendation = self._generate_recommendation(metrics)
-            
-            results.append(metrics)
-            
-            # Small delay between keywords
-            time.sleep(0.5)
         
         # Sort by opportunity score (descending)
         results.sort(key=lambda x: x.opportunity_score or 0, reverse=True)
@@ -343,6 +458,27 @@ class KeywordAnalyzer:
         logger.info("Keyword analysis completed")
         return results
     
+    def rescore(self, metrics: List[KeywordMetrics]) -> List[KeywordMetrics]:
+        """
+        Re-tag intents and recompute the derived scores of already fetched metrics.
+        
+        No request is sent: volume, competition and trend fields are used as they are.
+        
+        Args:
+            metrics (List[KeywordMetrics]): Metrics to re-score in place
+        
+        Returns:
+            List[KeywordMetrics]: The same metrics
+        """
+        intents = self.intent_tagger.tag_many([metric.keyword for metric in metrics])
+        for metric, tags in zip(metrics, intents):
+            metric.intents = list(tags)
+            metric.intent = IntentTagger.primary(tags)
+            metric.opportunity_score = self._calculate_opportunity_score(metric)
+            metric.difficulty_score = self._calculate_difficulty_score(metric)
+            metric.recommendation = self._generate_recommendation(metric)
+        return metrics
+    
     def _calculate_opportunity_score(self, metrics: KeywordMetrics) -> float:
         """
         Calculate opportunity score (0-100) for a keyword.
@@ -376,10 +512,14 @@ class KeywordAnalyzer:
             competition_bonus = (1 - metrics.competition_score) * 25
             score += competition_bonus
         
-        # Trend direction factor (0-20 points)
-        if metrics.seasonal_trend:
-            recent_trend = self._calculate_trend_direction(metrics.seasonal_trend)
-            score += recent_trend * 20
+        # Trend direction factor (-20 to +20 points)
+        score += self._calculate_trend_direction(metrics) * 20
+        
+        # Seasonal timing factor (0-5 points): content published now is indexed by the peak
+        if (metrics.seasonality_strength or 0) >= STRONG_SEASONALITY and metrics.peak_month:
+            months_to_peak = (metrics.peak_month - datetime.now().month) % 12
+            if 1 <= months_to_peak <= 3:
+                score += 5
         
         # Keyword specificity factor (0-15 points)
         word_count = len(metrics.keyword.split())
@@ -390,14 +530,25 @@ class KeywordAnalyzer:
         elif word_count == 2:
             score += 5
         
-        # Commercial intent factor (0-10 points)
-        commercial_keywords = ['buy', 'price', 'cost', 'cheap', 'best', 'review', 
-                             'tool', 'software', 'service', 'solution']
-        if any(word in metrics.keyword.lower() for word in commercial_keywords):
+        # Search intent factor (-10 to +15 points)
+        intents = self._intents(metrics)
+        if 'commercial' in intents:
             score += 10
+        if 'question' in intents:
+            score += 5  # Questions map directly to blog posts
+        if 'navigational' in intents:
+            score -= 10  # Searchers want a specific site, not an article
         
         return min(100.0, max(0.0, score))
     
+    def _intents(self, metrics: KeywordMetrics) -> List[str]:
+        """Search intents of a keyword, tagged on first use."""
+        if metrics.intents is None:
+            tags = self.intent_tagger.tag(metrics.keyword)
+            metrics.intents = list(tags)
+            metrics.intent = IntentTagger.primary(tags)
+        return metrics.intents
+    
     def _calculate_difficulty_score(self, metrics: KeywordMetrics) -> float:
         """
         Calculate difficulty score (0-100) for ranking for a keyword.
@@ -429,24 +580,24 @@ class KeywordAnalyzer:
         elif word_count >= 4:
             score -= 10  # Long-tail easier to rank
         
+        # Navigational queries are dominated by the destination site
+        if 'navigational' in self._intents(metrics):
+            score += 10
+        
         return min(100.0, max(0.0, score))
     
-    def _calculate_trend_direction(self, seasonal_data: List[float]) -> float:
+    def _calculate_trend_direction(self, metrics: KeywordMetrics) -> float:
         """
-        Calculate trend direction from seasonal data.
-        Returns value between -1 (declining) and 1 (growing).
+        Calculate trend direction from the fitted trend slope.
+        Returns value between -1 (declining) and 1 (growing): the slope
+        projected over a year, as a fraction of the keyword's mean interest.
         """
-        if len(seasonal_data) < 3:
-            return 0.0
-        
-        # Compare recent months to earlier months
-        recent = np.mean(seasonal_data[-3:])  # Last 3 months
-        earlier = np.mean(seasonal_data[:3])   # First 3 months
-        
-        if earlier == 0:
+        if metrics.trend_slope is None and len(metrics.seasonal_trend or []) >= MIN_POINTS:
+            apply_seasonality([metrics])  # Scored outside analyze_keywords
+        if metrics.trend_slope is None:
             return 0.0
         
-        change = (recent - earlier) / earlier
+        change = metrics.trend_slope * 12
         return min(1.0, max(-1.0, change))
     
     def _generate_recommendation(self, metrics: KeywordMetrics) -> str:
@@ -481,7 +632,9 @@ class KeywordAnalyzer:
             return "AVOID"  # Low opportunity
     
     def get_top_recommendations(self, keywords: List[str], geo: str = 'US', 
-                              top_n: int = 10) -> List[KeywordMetrics]:
+                              top_n: int = 10, known: Optional[Dict[str, KeywordMetrics]] = None,
+                              on_progress: Optional[Callable[[KeywordMetrics], None]] = None
+                              ) -> List[KeywordMetrics]:
         """
         Get top keyword recommendations with full analysis.
         
@@ -489,11 +642,13 @@ class KeywordAnalyzer:
             keywords (List[str]): Keywords to analyze
             geo (str): Geographic region
             top_n (int): Number of top recommendations to return
+            known (Optional[Dict[str, KeywordMetrics]]): Already fetched metrics (see analyze_keywords)
+            on_progress (Optional[Callable]): Per-keyword callback (see analyze_keywords)
         
         Returns:
             List[KeywordMetrics]: Top recommended keywords
         """
-        all_metrics = self.analyze_keywords(keywords, geo)
+        all_metrics = self.analyze_keywords(keywords, geo, known=known, on_progress=on_progress)
         
         # Filter for actionable recommendations
         actionable = [m for m in all_metrics 
@@ -0,0 +1,313 @@
+"""
+Short-term interest forecasts for content planning, from already fetched series.
+
+Monthly series cached by earlier runs (keyword store or response cache) are
+stacked into one array and projected a few weeks ahead in a single batched
+NumPy pass, so posts can be scheduled for keywords that will be rising when
+they are published. No requests are made.
+"""
+
+import sys
+import json
+import time
+import argparse
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from keyword_export import export_rows, ExportError
+from seasonality import (
+    SEASONALITY_FIELDS, SEASONAL_MIN_POINTS, MIN_POINTS,
+    stack_series, fit, design, decompose, to_records
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FORECAST_METHODS = ('harmonic', 'snaive')
+DEFAULT_WEEKS = (4, 8, 12)
+DAYS_PER_MONTH = 365.25 / 12
+SECONDS_PER_MONTH = DAYS_PER_MONTH * 86400
+DEFAULT_PLAN_CONFIG = '../config/automation.json'
+
+
+class ForecastError(Exception):
+    """Custom exception for forecasting errors."""
+    pass
+
+
+def forecast_columns(weeks: Sequence[int]) -> List[str]:
+    """Forecast output columns for a set of horizons."""
+    return [f'forecast_{w}w' for w in weeks] + ['forecast_change']
+
+
+def forecast_matrix(matrix: np.ndarray, weeks: Sequence[int] = DEFAULT_WEEKS,
+                    method: str = 'harmonic', offsets: Optional[np.ndarray] = None,
+                    model: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """
+    Project every row of a stacked monthly series array a few weeks ahead.
+
+    Methods:
+
+    - harmonic: the trend line and yearly cycle fitted by seasonality.fit,
+      extended past the last month
+    - snaive: seasonal naive with drift, i.e. the value one year before the
+      target date plus a year of fitted trend; rows without a usable value a
+      year back fall back to harmonic
+
+    Rows with fewer than SEASONAL_MIN_POINTS months are projected along their
+    trend line only. Forecasts are clipped at 0 but not at 100: a keyword can
+    be projected above its peak of the fetched window.
+
+    Args:
+        matrix (np.ndarray): Array from seasonality.stack_series
+        weeks (Sequence[int]): Horizons in weeks from now
+        method (str): 'harmonic' or 'snaive'
+        offsets (Optional[np.ndarray]): Months elapsed since each row's last
+            month was fetched (0 if None)
+        model (Optional[Dict[str, np.ndarray]]): seasonality.fit(matrix), if already computed
+
+    Returns:
+        Dict[str, np.ndarray]: 'forecast' (rows x horizons), 'now' (model
+        value today) and 'change' (last horizon minus now, as a fraction of
+        the mean level); NaN where a row cannot be forecast
+
+    Raises:
+        ForecastError: If the method or horizons are invalid
+    """
+    if method not in FORECAST_METHODS:
+        raise ForecastError(f"Unknown forecast method '{method}' (use {', '.join(FORECAST_METHODS)})")
+    if not weeks or any(w <= 0 for w in weeks):
+        raise ForecastError("Forecast horizons must be positive numbers of weeks")
+
+    model = model or fit(matrix)
+    rows, width = matrix.shape
+    coefficients = model['coefficients']
+    offsets = np.zeros(rows) if offsets is None else np.maximum(np.asarray(offsets, dtype=float), 0)
+
+    # Months ahead of each row's last column: column 0 is "now", then each horizon
+    steps = np.concatenate([[0.0], np.asarray(weeks, dtype=float) * 7 / DAYS_PER_MONTH])
+    ahead = offsets[:, None] + steps[None, :]
+    projected = np.einsum('rhk,rk->rh', design(width - 1 + ahead, width), coefficients)
+
+    if method == 'snaive' and width >= SEASONAL_MIN_POINTS:
+        # Same date one (or more) years back, interpolated between months
+        years = np.maximum(np.ceil(ahead / 12 - 1e-9), 1)
+        source = width - 1 + ahead - 12 * years
+        low = np.floor(source).astype(int)
+        high = np.minimum(low + 1, width - 1)
+        inside = low >= 0
+        low, high = np.clip(low, 0, width - 1), np.clip(high, 0, width - 1)
+        fraction = source - np.floor(source)
+
+        index = np.arange(rows)[:, None]
+        valid = model['valid']
+        usable = inside & valid[index, low] & valid[index, high] & model['full_year'][:, None]
+        values = model['values']
+        naive = values[index, low] * (1 - fraction) + values[index, high] * fraction
+        naive += coefficients[:, 1:2] * 12 * years
+        projected = np.where(usable, naive, projected)
+
+    projected = np.maximum(projected, 0.0)
+    level = model['level']
+    known = (model['count'] >= MIN_POINTS) & (level > 0)
+    now, forecast = projected[:, 0], projected[:, 1:]
+    change = np.divide(forecast[:, -1] - now, level, out=np.zeros(rows), where=level > 0)
+    return {
+        'forecast': np.where(known[:, None], forecast, np.nan),
+        'now': np.where(known, now, np.nan),
+        'change': np.where(known, change, np.nan),
+    }
+
+
+def forecast_series(series: Sequence[Optional[Sequence[float]]],
+                    weeks: Sequence[int] = DEFAULT_WEEKS, method: str = 'harmonic',
+                    fetched_at: Optional[Sequence[float]] = None,
+                    now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Forecasts and seasonality profile per series, as plain Python values.
+
+    Args:
+        series (Sequence[Optional[Sequence[float]]]): Monthly values per keyword
+        weeks (Sequence[int]): Horizons in weeks from now
+        method (str): 'harmonic' or 'snaive'
+        fetched_at (Optional[Sequence[float]]): Fetch time of each series
+            (epoch seconds); older series are projected further (now if None)
+        now (Optional[float]): Reference time (current time if None)
+
+    Returns:
+        List[Dict[str, Any]]: forecast_columns(weeks) and SEASONALITY_FIELDS per series
+    """
+    if not series:
+        return []
+    now = time.time() if now is None else now
+    matrix = stack_series(series)
+    model = fit(matrix)
+
+    if fetched_at is None:
+        offsets = None
+        end_month = datetime.fromtimestamp(now).month
+    else:
+        fetched = np.asarray(fetched_at, dtype=float)
+        offsets = (now - fetched) / SECONDS_PER_MONTH
+        end_month = np.array([datetime.fromtimestamp(t).month for t in fetched_at])
+
+    result = forecast_matrix(matrix, weeks, method=method, offsets=offsets, model=model)
+    profile = decompose(matrix, end_month=end_month, model=model)
+
+    columns = {}
+    for i, w in enumerate(weeks):
+        columns[f'forecast_{w}w'] = result['forecast'][:, i].round(1)
+    columns['forecast_change'] = result['change'].round(4)
+    columns.update((field, profile[field].round(4)) for field in SEASONALITY_FIELDS)
+    return to_records(columns)
+
+
+def load_cached_series(store_path: Optional[str] = None, cache_path: Optional[str] = None,
+                       geo: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Read the latest monthly series of every keyword from a store or response cache.
+
+    With both, a keyword (per region) is read once: the store's series wins and
+    the cache only adds keywords the store lacks.
+
+    Args:
+        store_path (Optional[str]): Keyword store ('seasonal' series)
+        cache_path (Optional[str]): Response cache ('seasonal' entries, any age)
+        geo (Optional[str]): Restrict to one region
+
+    Returns:
+        List[Dict[str, Any]]: keyword, geo, fetched_at and points per series
+
+    Raises:
+        ForecastError: If neither source is given or a source cannot be read
+    """
+    entries = []
+    if store_path:
+        from keyword_store import KeywordStore, KeywordStoreError
+        try:
+            with KeywordStore(store_path) as store:
+                entries.extend(store.latest_series('seasonal', geo=geo))
+        except KeywordStoreError as e:
+            raise ForecastError(str(e))
+    if cache_path:
+        from response_cache import ResponseCache, CacheError
+        cache = ResponseCache(cache_path, ttl=None)
+        stored = {(entry['keyword'].casefold(), entry['geo']) for entry in entries}
+        try:
+            for key, points, fetched_at in cache.scan('seasonal'):
+                entry_geo, _, keyword = key.partition('|')
+                if points and (geo is None or entry_geo == geo) and \
+                        (keyword.casefold(), entry_geo) not in stored:
+                    entries.append({'keyword': keyword, 'geo': entry_geo,
+                                    'fetched_at': fetched_at, 'points': points})
+        except CacheError as e:
+            raise ForecastError(str(e))
+        finally:
+            cache.close()
+    if not store_path and not cache_path:
+        raise ForecastError("Give a keyword store or response cache to read series from")
+    return entries
+
+
+def plan_weeks(config_path: str) -> List[int]:
+    """
+    Forecast horizons for the blog planner: every 4 weeks up to planning.planWeeks.
+
+    Args:
+        config_path (str): Automation config (e.g. config/automation.json)
+
+    Returns:
+        List[int]: Horizons in weeks
+
+    Raises:
+        ForecastError: If the config cannot be read
+    """
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            weeks = int(json.load(f).get('planning', {}).get('planWeeks', 4))
+    except (OSError, ValueError, AttributeError) as e:
+        raise ForecastError(f"Could not read planning horizon from {config_path}: {e}")
+    if weeks < 1:
+        raise ForecastError(f"planning.planWeeks must be at least 1 in {config_path}")
+    return sorted(set(range(4, weeks, 4)) | {weeks})
+
+
+def forecast_main(argv: List[str]) -> int:
+    """
+    CLI entry point for `python main.py forecast`.
+
+    Args:
+        argv (List[str]): Arguments after the subcommand name
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py forecast',
+        description='Forecast keyword interest a few weeks ahead from cached series (no requests)',
+        epilog='Example: python main.py forecast --store keywords.sqlite '
+               f'--plan-config {DEFAULT_PLAN_CONFIG} --output forecast.csv'
+    )
+    parser.add_argument('--store', type=str, help='Keyword store to read seasonal series from')
+    parser.add_argument('--cache', type=str, help='Response cache to read seasonal series from')
+    parser.add_argument('--geo', type=str, help='Only series fetched for this region')
+    parser.add_argument('--weeks', type=int, nargs='+',
+                        help=f"Horizons in weeks (default: {' '.join(map(str, DEFAULT_WEEKS))})")
+    parser.add_argument('--plan-config', type=str,
+                        help=f'Use every 4 weeks up to planning.planWeeks of this config '
+                             f'(e.g. {DEFAULT_PLAN_CONFIG})')
+    parser.add_argument('--method', choices=FORECAST_METHODS, default='harmonic',
+                        help='Trend + yearly cycle (harmonic, default) or seasonal naive with drift')
+    parser.add_argument('--top', type=int, default=20,
+                        help='Fastest rising keywords to print (default: 20)')
+    parser.add_argument('--output', '-o', type=str, help='Write every forecast to a CSV/JSONL/Parquet file')
+    args = parser.parse_args(argv)
+
+    try:
+        weeks = args.weeks or (plan_weeks(args.plan_config) if args.plan_config else list(DEFAULT_WEEKS))
+        weeks = sorted(set(weeks))
+        started = time.perf_counter()
+        entries = load_cached_series(args.store, args.cache, geo=args.geo)
+        loaded = time.perf_counter()
+        forecasts = forecast_series([entry['points'] for entry in entries], weeks, method=args.method,
+                                    fetched_at=[entry['fetched_at'] for entry in entries])
+    except ForecastError as e:
+        logger.error(str(e))
+        return 2
+    elapsed = time.perf_counter() - loaded
+
+    rows = []
+    for entry, forecast in zip(entries, forecasts):
+        rows.append({'keyword': entry['keyword'], 'geo': entry['geo'],
+                     'fetched': datetime.fromtimestamp(entry['fetched_at']).strftime('%Y-%m-%d'),
+                     **forecast})
+    print(f"🔮 Forecast {len(rows)} series {', '.join(f'{w}w' for w in weeks)} ahead in {elapsed:.2f}s "
+          f"(loaded in {loaded - started:.2f}s)")
+
+    if args.output:
+        columns = ['keyword', 'geo', 'fetched'] + forecast_columns(weeks) + SEASONALITY_FIELDS
+        try:
+            export_rows(rows, args.output, columns, sort_by='forecast_change')
+        except ExportError as e:
+            logger.error(str(e))
+            return 2
+        print(f"💾 Wrote {len(rows)} forecasts to {args.output}")
+
+    rising = sorted((row for row in rows if row['forecast_change'] is not None),
+                    key=lambda row: row['forecast_change'], reverse=True)[:args.top]
+    if rising:
+        last = f'forecast_{weeks[-1]}w'
+        print(f"\n📈 Fastest rising in the next {weeks[-1]} weeks:")
+        for i, row in enumerate(rising, 1):
+            peak = f", peaks in month {row['peak_month']}" if row['peak_month'] else ''
+            print(f"{i:>3}. {row['keyword']} ({row['geo']}): {row[last]:.1f} "
+                  f"({row['forecast_change']:+.0%}{peak})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(forecast_main(sys.argv[1:]))
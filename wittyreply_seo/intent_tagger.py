@@ -0,0 +1,241 @@
+"""
+Search intent tagging with per-locale lexicons (en, fr, ar).
+
+Lexicon phrases are matched as whole words, so "tool" does not match "toolkit".
+Each intent's lexicon is compiled once into a single matcher and applied to the
+whole keyword column at a time; the tags feed keyword scoring and export.
+"""
+
+import json
+import logging
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from keyword_filters import compile_phrases
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Intents, in the priority order used to pick a keyword's primary intent
+INTENTS = ('navigational', 'commercial', 'local', 'question', 'informational')
+
+# Question words only count at the start of a keyword ("how to ...", not "know how")
+LEADING_INTENTS = {'question'}
+
+LEXICONS: Dict[str, Dict[str, List[str]]] = {
+    'en': {
+        'commercial': [
+            'buy', 'purchase', 'order', 'price', 'prices', 'pricing', 'cost', 'costs', 'cheap',
+            'cheapest', 'affordable', 'discount', 'deal', 'deals', 'coupon', 'best', 'top', 'review',
+            'reviews', 'vs', 'versus', 'compare', 'comparison', 'alternative', 'alternatives',
+            'tool', 'tools', 'software', 'service', 'services', 'solution', 'solutions', 'platform',
+            'platforms', 'app', 'apps', 'provider', 'providers', 'agency', 'plan', 'plans',
+            'subscription', 'free trial', 'for sale', 'hire',
+        ],
+        'informational': [
+            'how to', 'guide', 'tutorial', 'tutorials', 'tips', 'ideas', 'examples', 'example',
+            'meaning', 'definition', 'explained', 'learn', 'course', 'benefits', 'strategy',
+            'strategies', 'step by step', 'checklist', 'what is', 'what are', 'why',
+        ],
+        'navigational': [
+            'login', 'log in', 'sign in', 'sign up', 'signup', 'download', 'official', 'website',
+            'web', 'apk', 'customer care', 'contact', 'phone number', 'support number',
+        ],
+        'local': [
+            'near me', 'nearby', 'near', 'local', 'in my area', 'dubai', 'abu dhabi', 'riyadh',
+            'casablanca', 'rabat', 'marrakech', 'paris', 'london', 'new york', 'cairo',
+        ],
+        'question': [
+            'how', 'what', 'why', 'when', 'where', 'who', 'which', 'can', 'does', 'do', 'is', 'are',
+            'should', 'will', 'could',
+        ],
+    },
+    'fr': {
+        'commercial': [
+            'acheter', 'achat', 'commander', 'prix', 'tarif', 'tarifs', 'cout', 'pas cher',
+            'meilleur', 'meilleure', 'meilleurs', 'meilleures', 'avis', 'comparatif', 'comparaison',
+            'alternative', 'alternatives', 'outil', 'outils', 'logiciel', 'logiciels', 'service',
+            'services', 'solution', 'solutions', 'plateforme', 'application', 'abonnement',
+            'essai gratuit', 'agence', 'promo', 'devis',
+        ],
+        'informational': [
+            'comment', 'guide', 'tutoriel', 'astuces', 'conseils', 'idees', 'exemple', 'exemples',
+            'definition', 'signification', 'apprendre', 'formation', 'avantages', 'strategie',
+            'etape par etape', "c'est quoi", "qu'est-ce que", 'pourquoi',
+        ],
+        'navigational': [
+            'connexion', 'se connecter', 'inscription', 'telecharger', 'telechargement',
+            'site officiel', 'officiel', 'web', 'apk', 'contact', 'service client', 'numero',
+        ],
+        'local': [
+            'pres de chez moi', 'a proximite', 'proche', 'local', 'paris', 'lyon', 'marseille',
+            'casablanca', 'rabat', 'marrakech', 'tanger', 'montreal', 'bruxelles', 'dubai',
+        ],
+        'question': [
+            'comment', 'pourquoi', 'quand', 'ou', 'qui', 'quel', 'quelle', 'quels', 'quelles',
+            'combien', 'est-ce', 'peut-on', 'faut-il',
+        ],
+    },
+    'ar': {
+        'commercial': [
+            'شراء', 'اشتري', 'سعر', 'اسعار', 'السعر', 'الاسعار', 'تكلفة', 'رخيص', 'ارخص', 'افضل',
+            'أفضل', 'مراجعة', 'تقييم', 'مقارنة', 'بديل', 'اداة', 'ادوات', 'برنامج', 'برامج',
+            'خدمة', 'خدمات', 'حلول', 'منصة', 'تطبيق', 'اشتراك', 'عرض', 'عروض', 'خصم',
+        ],
+        'informational': [
+            'كيفية', 'طريقة', 'شرح', 'دليل', 'نصائح', 'افكار', 'امثلة', 'مثال', 'تعريف', 'معنى',
+            'تعلم', 'دورة', 'فوائد', 'استراتيجية', 'خطوات', 'ما هو', 'ما هي', 'لماذا',
+        ],
+        'navigational': [
+            'تسجيل الدخول', 'دخول', 'تحميل', 'تنزيل', 'الموقع الرسمي', 'رسمي', 'ويب', 'رقم',
+            'خدمة العملاء', 'اتصال',
+        ],
+        'local': [
+            'قريب مني', 'بالقرب مني', 'قريب', 'دبي', 'ابوظبي', 'ابو ظبي', 'الرياض', 'جدة',
+            'القاهرة', 'الدار البيضاء', 'الرباط', 'مراكش', 'الدوحة', 'الكويت',
+        ],
+        'question': [
+            'كيف', 'ماذا', 'لماذا', 'متى', 'اين', 'أين', 'من', 'هل', 'ما', 'كم', 'اي', 'أي',
+        ],
+    },
+}
+
+
+class IntentError(Exception):
+    """Custom exception for intent lexicon errors."""
+    pass
+
+
+def fold_text(text: str) -> str:
+    """
+    Fold text for lexicon matching: casefolded, accents and Arabic marks removed.
+
+    NFKD splits 'é' into 'e' + accent and 'أ' into 'ا' + hamza, so dropping
+    combining marks also unifies alef variants and strips tashkeel.
+    """
+    text = text.casefold()
+    if text.isascii():
+        return text
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def load_lexicon_file(path: str) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Load extra lexicon phrases from JSON.
+
+    Either {"en": {"commercial": [...]}, "fr": {...}} or, for every locale,
+    {"commercial": [...], "navigational": [...]}.
+
+    Args:
+        path (str): JSON file path
+
+    Returns:
+        Dict[str, Dict[str, List[str]]]: Phrases per locale (key '*' = all locales) and intent
+
+    Raises:
+        IntentError: If the file is unreadable or names unknown intents
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise IntentError(f"Could not read intent lexicon from {path}: {e}")
+    if not isinstance(data, dict):
+        raise IntentError(f"{path} must contain a JSON object")
+
+    if data and all(key in INTENTS for key in data):
+        data = {'*': data}
+    for locale, lexicon in data.items():
+        unknown = set(lexicon) - set(INTENTS)
+        if unknown:
+            raise IntentError(f"Unknown intents in {path}: {', '.join(sorted(unknown))}")
+    return data
+
+
+class IntentTagger:
+    """Tags keywords with search intents from compiled per-locale lexicons."""
+
+    def __init__(self, language: str = 'en',
+                 extra_lexicons: Optional[Dict[str, Dict[str, List[str]]]] = None):
+        """
+        Compile the lexicons for a language.
+
+        English phrases are always included, since brand and product terms in
+        French and Arabic queries are often English ("meilleur whatsapp api").
+
+        Args:
+            language (str): Language code ('en', 'fr', 'ar'; others use English only)
+            extra_lexicons (Optional[Dict]): Additional phrases, as from load_lexicon_file
+        """
+        self.language = language if language in LEXICONS else 'en'
+        locales = [self.language] + (['en'] if self.language != 'en' else [])
+        extra_lexicons = extra_lexicons or {}
+
+        self._matchers = {}
+        for intent in INTENTS:
+            phrases = set()
+            for locale in locales + ['*']:
+                phrases.update(LEXICONS.get(locale, {}).get(intent, []))
+                phrases.update(extra_lexicons.get(locale, {}).get(intent, []))
+            phrases = tuple(sorted({fold_text(p) for p in phrases if p.strip()}))
+            if phrases:
+                self._matchers[intent] = compile_phrases(phrases, anchored=intent in LEADING_INTENTS)
+
+    def tag(self, keyword: str) -> Tuple[str, ...]:
+        """
+        Intents of one keyword.
+
+        Args:
+            keyword (str): Keyword
+
+        Returns:
+            Tuple[str, ...]: Matching intents in INTENTS order
+        """
+        return self.tag_many([keyword])[0]
+
+    def tag_many(self, keywords: Sequence[str]) -> List[Tuple[str, ...]]:
+        """
+        Intents of a keyword column.
+
+        The column is folded once, then each intent's compiled matcher runs over
+        the whole column in one pass.
+
+        Args:
+            keywords (Sequence[str]): Keywords
+
+        Returns:
+            List[Tuple[str, ...]]: Intents per keyword, in INTENTS order
+        """
+        texts = [fold_text(keyword) for keyword in keywords]
+        columns = []
+        for intent, matcher in self._matchers.items():
+            hits = list(map(matcher.search, texts))
+            if intent == 'question':
+                hits = [hit or '?' in text for hit, text in zip(hits, texts)]
+            columns.append((intent, hits))
+
+        tags = []
+        for i in range(len(texts)):
+            tags.append(tuple(intent for intent, hits in columns if hits[i]))
+        return tags
+
+    @staticmethod
+    def primary(tags: Iterable[str]) -> Optional[str]:
+        """Highest-priority intent of a tag set (None if untagged)."""
+        tags = set(tags)
+        return next((intent for intent in INTENTS if intent in tags), None)
+
+    def columns(self, keywords: Sequence[str]) -> List[Dict[str, Optional[str]]]:
+        """
+        Export columns per keyword: 'intent' (primary) and 'intents' ('|'-joined).
+
+        Args:
+            keywords (Sequence[str]): Keywords
+
+        Returns:
+            List[Dict[str, Optional[str]]]: One dict per keyword
+        """
+        return [{'intent': self.primary(tags), 'intents': '|'.join(tags) or None}
+                for tags in self.tag_many(keywords)]
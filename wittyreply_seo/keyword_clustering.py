@@ -0,0 +1,285 @@
+"""
+Keyword clustering so trends and volume are fetched only for cluster representatives.
+Uses a hashing TF-IDF vectorizer with mini-batch k-means (scikit-learn).
+"""
+
+import math
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# KeywordMetrics fields a member shares with its centroid: what was fetched for it,
+# and the seasonal profile derived from that curve
+PROPAGATED_FIELDS = (
+    'search_volume', 'trend_score', 'competition', 'competition_score', 'cpc_low', 'cpc_high',
+    'seasonal_trend', 'trend_slope', 'seasonality_strength', 'peak_month', 'volatility',
+)
+
+
+class ClusteringError(Exception):
+    """Custom exception for keyword clustering errors."""
+    pass
+
+
+@dataclass
+class KeywordCluster:
+    """Data class for a cluster of near-synonymous keywords."""
+    cluster_id: int
+    centroid: str
+    members: List[str] = field(default_factory=list)
+    cohesion: Optional[float] = None  # Mean cosine similarity of members to the centroid
+
+
+class KeywordClusterer:
+    """
+    Groups keywords with hashing TF-IDF vectors and mini-batch k-means.
+
+    Large inputs are recursively split into coarse partitions (a few dozen
+    centers at a time) so k-means cost stays linear in the number of keywords;
+    each leaf partition is then clustered to the target size.
+    """
+
+    def __init__(self, avg_cluster_size: int = 5, n_features: int = 2 ** 14,
+                 max_partition_size: int = 500, branching: int = 32,
+                 batch_size: int = 2048, max_iter: int = 20, random_state: int = 42):
+        """
+        Initialize the clusterer.
+
+        Args:
+            avg_cluster_size (int): Target average number of keywords per cluster
+            n_features (int): Hashing space size for the vectorizer
+            max_partition_size (int): Keywords per leaf partition before refinement
+            branching (int): Coarse partitions created per split
+            batch_size (int): Mini-batch size for k-means
+            max_iter (int): Maximum passes over each partition
+            random_state (int): Seed for reproducible clusters
+        """
+        if avg_cluster_size < 1:
+            raise ClusteringError(f"Average cluster size must be >= 1, got {avg_cluster_size}")
+
+        self.avg_cluster_size = avg_cluster_size
+        self.n_features = n_features
+        self.max_partition_size = max_partition_size
+        self.branching = branching
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.random_state = random_state
+
+    def _vectorize(self, keywords: List[str]):
+        """Build L2-normalized sparse TF-IDF vectors of word unigrams and bigrams."""
+        try:
+            from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+        except ImportError:
+            raise ClusteringError("scikit-learn not available. Install with: pip install scikit-learn")
+
+        hashing = HashingVectorizer(n_features=self.n_features, ngram_range=(1, 2),
+                                    alternate_sign=False, norm=None)
+        counts = hashing.transform(keywords)
+        return TfidfTransformer(sublinear_tf=True).fit_transform(counts)
+
+    def _kmeans(self, vectors, n_clusters: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Run mini-batch k-means and return (labels, centers)."""
+        from sklearn.cluster import MiniBatchKMeans
+
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=self.batch_size,
+                                 random_state=self.random_state, n_init=1,
+                                 max_iter=self.max_iter, max_no_improvement=3)
+        labels = kmeans.fit_predict(vectors)
+        return labels, kmeans.cluster_centers_
+
+    def _partitions(self, vectors) -> List[np.ndarray]:
+        """Recursively split rows into leaf partitions of at most max_partition_size."""
+        leaves = []
+        pending = [np.arange(vectors.shape[0])]
+
+        while pending:
+            indices = pending.pop()
+            if len(indices) <= self.max_partition_size:
+                leaves.append(indices)
+                continue
+
+            n_partitions = min(self.branching, math.ceil(len(indices) / self.max_partition_size))
+            labels, _ = self._kmeans(vectors[indices], max(n_partitions, 2))
+            order = np.argsort(labels, kind='stable')
+            splits = np.split(indices[order], np.flatnonzero(np.diff(labels[order])) + 1)
+
+            if len(splits) == 1:
+                # Identical vectors cannot be split further
+                leaves.append(indices)
+            else:
+                pending.extend(splits)
+
+        return leaves
+
+    @staticmethod
+    def _center_similarity(vectors, labels: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of each sparse row to its own center.
+
+        Only the non-zero entries of each row are touched, so no dense
+        (rows x features) matrix is ever materialized.
+        """
+        vectors = vectors.tocsr()
+        rows = np.repeat(np.arange(vectors.shape[0]), np.diff(vectors.indptr))
+        products = vectors.data * centers[labels[rows], vectors.indices]
+        dots = np.bincount(rows, weights=products, minlength=vectors.shape[0])
+
+        norms = np.linalg.norm(centers, axis=1)
+        norms[norms == 0] = 1.0
+        return dots / norms[labels]
+
+    def fit(self, keywords: List[str]) -> List[KeywordCluster]:
+        """
+        Cluster keywords and pick the member closest to each cluster center.
+
+        Args:
+            keywords (List[str]): Keywords to cluster
+
+        Returns:
+            List[KeywordCluster]: Clusters, largest first
+        """
+        unique_keywords = list(dict.fromkeys(keywords))
+        if math.ceil(len(unique_keywords) / self.avg_cluster_size) <= 1:
+            # Nothing to gain: every keyword is its own representative
+            return [KeywordCluster(cluster_id=i, centroid=k, members=[k], cohesion=1.0)
+                    for i, k in enumerate(unique_keywords)]
+
+        vectors = self._vectorize(unique_keywords)
+        clusters = []
+
+        for indices in self._partitions(vectors):
+            subset = vectors[indices]
+            n_clusters = math.ceil(len(indices) / self.avg_cluster_size)
+
+            if n_clusters >= len(indices) or n_clusters <= 1:
+                labels = np.zeros(len(indices), dtype=int) if n_clusters <= 1 \
+                    else np.arange(len(indices))
+                centers = np.vstack([
+                    np.asarray(subset[labels == label].mean(axis=0))
+                    for label in range(labels.max() + 1)
+                ])
+            else:
+                labels, centers = self._kmeans(subset, n_clusters)
+
+            similarity = self._center_similarity(subset, labels, centers)
+
+            order = np.argsort(labels, kind='stable')
+            for local in np.split(order, np.flatnonzero(np.diff(labels[order])) + 1):
+                best = indices[local[np.argmax(similarity[local])]]
+                clusters.append(KeywordCluster(
+                    cluster_id=len(clusters),
+                    centroid=unique_keywords[best],
+                    members=[unique_keywords[i] for i in indices[local]],
+                    cohesion=float(similarity[local].mean())
+                ))
+
+        clusters.sort(key=lambda c: len(c.members), reverse=True)
+        for cluster_id, cluster in enumerate(clusters):
+            cluster.cluster_id = cluster_id
+
+        logger.info(f"Clustered {len(unique_keywords)} keywords into {len(clusters)} clusters")
+        return clusters
+
+
+def propagate_keyword_data(keyword_data: Dict[str, Dict],
+                           clusters: List[KeywordCluster]) -> Dict[str, Dict]:
+    """
+    Copy each centroid's trend data to the other members of its cluster.
+
+    Args:
+        keyword_data (Dict[str, Dict]): Trend data keyed by centroid keyword
+        clusters (List[KeywordCluster]): Keyword clusters
+
+    Returns:
+        Dict[str, Dict]: Trend data for every member, with cluster columns added
+    """
+    expanded = {}
+
+    for cluster in clusters:
+        centroid_data = keyword_data.get(cluster.centroid)
+        if centroid_data is None:
+            continue
+
+        for member in cluster.members:
+            data = dict(centroid_data)
+            data['keyword'] = member
+            data['cluster_id'] = cluster.cluster_id
+            data['cluster_centroid'] = cluster.centroid
+            data['cluster_size'] = len(cluster.members)
+            data['propagated'] = member != cluster.centroid
+            expanded[member] = data
+
+    # Keep anything the trends stage added on its own (e.g. related queries)
+    for keyword, data in keyword_data.items():
+        expanded.setdefault(keyword, data)
+
+    return expanded
+
+
+def propagate_metrics(metrics: List, clusters: List[KeywordCluster], analyzer) -> List:
+    """
+    Copy each analyzed centroid's fetched metrics to the other members of its cluster.
+
+    Only PROPAGATED_FIELDS are copied; intents and scores depend on the keyword
+    text, so each member is re-tagged and re-scored by the analyzer.
+
+    Args:
+        metrics (List[KeywordMetrics]): Metrics computed for centroid keywords
+        clusters (List[KeywordCluster]): Keyword clusters
+        analyzer (KeywordAnalyzer): Analyzer that re-scores the members (no requests)
+
+    Returns:
+        List[KeywordMetrics]: Metrics for centroids followed by their members
+    """
+    by_centroid = {cluster.centroid: cluster for cluster in clusters}
+    expanded = []
+    members = []
+
+    for metric in metrics:
+        expanded.append(metric)
+        cluster = by_centroid.get(metric.keyword)
+        if cluster is None:
+            continue
+        fetched = {name: getattr(metric, name) for name in PROPAGATED_FIELDS}
+        for member in cluster.members:
+            if member != cluster.centroid:
+                members.append(type(metric)(keyword=member, propagated_from=cluster.centroid,
+                                            **fetched))
+                expanded.append(members[-1])
+
+    analyzer.rescore(members)
+    return expanded
+
+
+def summarize_clusters(keyword_data: Dict[str, Dict],
+                       clusters: List[KeywordCluster]) -> List[Dict]:
+    """
+    Build per-cluster aggregate rows for export.
+
+    Args:
+        keyword_data (Dict[str, Dict]): Trend data keyed by keyword
+        clusters (List[KeywordCluster]): Keyword clusters
+
+    Returns:
+        List[Dict]: One row per cluster
+    """
+    rows = []
+    for cluster in clusters:
+        centroid_data = keyword_data.get(cluster.centroid, {})
+        rows.append({
+            'cluster_id': cluster.cluster_id,
+            'centroid': cluster.centroid,
+            'cluster_size': len(cluster.members),
+            'cohesion': round(cluster.cohesion, 3) if cluster.cohesion is not None else None,
+            'trend_score': centroid_data.get('trend_score'),
+            'avg_keyword_length': round(float(np.mean([len(m) for m in cluster.members])), 1),
+            'members': ' | '.join(cluster.members),
+        })
+    return rows
@@ -0,0 +1,283 @@
+"""
+Near-duplicate keyword detection using MinHash signatures and LSH banding.
+Collapses token-equivalent keywords before any network calls are made.
+"""
+
+import re
+import zlib
+import unicodedata
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used for the universal hash family (h(x) = (a*x + b) mod p).
+# Token hashes are 31-bit, so a*x + b always fits in an unsigned 64-bit int.
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_MAX_HASH = (1 << 31) - 1
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Filler words that do not change the meaning of a search phrase
+STOPWORDS = {
+    'en': {'a', 'an', 'the', 'for', 'of', 'to', 'in', 'on', 'and', 'with'},
+    'fr': {'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'pour', 'et', 'en'},
+    'ar': set(),
+}
+
+
+class DedupError(Exception):
+    """Custom exception for near-duplicate detection errors."""
+    pass
+
+
+@lru_cache(maxsize=65536)
+def _stem_token(token: str) -> str:
+    """Strip simple plural endings so 'tools' and 'tool' compare equal."""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def normalize_tokens(keyword: str, language: str = 'en') -> Set[str]:
+    """
+    Normalize a keyword into an order-independent set of tokens.
+
+    Args:
+        keyword (str): Raw keyword
+        language (str): Language code used to pick the stopword list
+
+    Returns:
+        Set[str]: Lowercased, accent-folded, stemmed tokens
+    """
+    text = keyword.casefold()
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+    tokens = [_stem_token(token) for token in _TOKEN_PATTERN.findall(text)]
+    stopwords = STOPWORDS.get(language, set())
+    meaningful = {token for token in tokens if token not in stopwords}
+
+    # Keep stopwords when a keyword is made only of them
+    return meaningful or set(tokens)
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    """Exact Jaccard similarity between two token sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Pick the (bands, rows) split whose S-curve inflection is closest to the threshold.
+
+    Args:
+        threshold (float): Target Jaccard similarity
+        num_perm (int): Signature length
+
+    Returns:
+        Tuple[int, int]: Number of bands and rows per band
+    """
+    best = (num_perm, 1)
+    best_error = float('inf')
+
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        inflection = (1.0 / bands) ** (1.0 / rows)
+        error = abs(inflection - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+
+    return best
+
+
+class NearDuplicateDetector:
+    """MinHash/LSH near-duplicate detector with a tunable similarity threshold."""
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64,
+                 language: str = 'en', chunk_size: int = 50000, seed: int = 1):
+        """
+        Initialize the detector.
+
+        Args:
+            threshold (float): Minimum Jaccard similarity to treat keywords as duplicates
+            num_perm (int): Number of MinHash permutations (signature length)
+            language (str): Language code for token normalization
+            chunk_size (int): Keywords hashed per vectorized chunk (bounds memory)
+            seed (int): Seed for the hash family, for reproducible clusters
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise DedupError(f"Similarity threshold must be in (0, 1], got {threshold}")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.language = language
+        self.chunk_size = chunk_size
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+
+        rng = np.random.RandomState(seed)
+        self._perm_a = rng.randint(1, _MAX_HASH, size=num_perm).astype(np.uint64)
+        self._perm_b = rng.randint(0, _MAX_HASH, size=num_perm).astype(np.uint64)
+        self._band_mix = rng.randint(1, _MAX_HASH, size=self.rows).astype(np.uint64)
+
+    def _signatures(self, token_sets: List[Set[str]]) -> np.ndarray:
+        """
+        Compute MinHash signatures for token sets in vectorized chunks.
+
+        Args:
+            token_sets (List[Set[str]]): Normalized token sets
+
+        Returns:
+            np.ndarray: Signature matrix of shape (len(token_sets), num_perm)
+        """
+        signatures = np.empty((len(token_sets), self.num_perm), dtype=np.uint64)
+
+        for start in range(0, len(token_sets), self.chunk_size):
+            chunk = token_sets[start:start + self.chunk_size]
+
+            # Flatten tokens, remembering where each keyword's tokens begin
+            lengths = np.fromiter((max(len(tokens), 1) for tokens in chunk),
+                                  dtype=np.int64, count=len(chunk))
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            token_hashes = np.fromiter(
+                (zlib.crc32(token.encode('utf-8')) & _MAX_HASH
+                 for tokens in chunk for token in (tokens or {''})),
+                dtype=np.uint64, count=int(lengths.sum())
+            )
+
+            permuted = (np.outer(token_hashes, self._perm_a) + self._perm_b) % _MERSENNE_PRIME
+            signatures[start:start + len(chunk)] = np.minimum.reduceat(permuted, offsets, axis=0)
+
+        return signatures
+
+    def _buckets(self, signatures: np.ndarray) -> Iterable[np.ndarray]:
+        """
+        Yield the LSH buckets (item indices sharing a band) that hold more than one item.
+
+        Each band is collapsed to a single hash and sorted, so bucketing stays
+        near-linear; most buckets are singletons and are skipped.
+        """
+        for band in range(self.bands):
+            columns = signatures[:, band * self.rows:(band + 1) * self.rows]
+            band_hashes = columns @ self._band_mix  # wraps modulo 2**64, fine for bucketing
+
+            order = np.argsort(band_hashes, kind='stable')
+            sorted_hashes = band_hashes[order]
+            bucket_starts = np.flatnonzero(
+                np.concatenate(([True], sorted_hashes[1:] != sorted_hashes[:-1], [True]))
+            )
+            for start, end in zip(bucket_starts[:-1], bucket_starts[1:]):
+                if end - start > 1:
+                    yield order[start:end]
+
+    def cluster(self, keywords: Iterable[str],
+                prefer: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        Group near-duplicate keywords and choose one representative per cluster.
+
+        Args:
+            keywords (Iterable[str]): Keywords to cluster
+            prefer (Optional[Iterable[str]]): Keywords to favor as representatives (e.g. seeds);
+                read once, one at a time
+
+        Returns:
+            Dict[str, List[str]]: Representative keyword mapped to all cluster members
+        """
+        unique_keywords = list(dict.fromkeys(k for k in keywords if k and k.strip()))
+        if not unique_keywords:
+            return {}
+
+        token_sets = [normalize_tokens(k, self.language) for k in unique_keywords]
+        signatures = self._signatures(token_sets)
+
+        # Union-find over verified candidate pairs
+        parent = list(range(len(unique_keywords)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        verified = 0
+        for bucket in self._buckets(signatures):
+            members = bucket.tolist()
+            # Every item is checked against each earlier member it is not merged with yet,
+            # so an LSH false positive in the bucket cannot hide duplicates behind it
+            for position, b in enumerate(members[1:], 1):
+                for a in members[:position]:
+                    root_a, root_b = find(a), find(b)
+                    if root_a == root_b:
+                        continue
+                    # Drop LSH false positives with an exact check
+                    if _jaccard(token_sets[a], token_sets[b]) >= self.threshold:
+                        parent[root_b] = root_a
+                        verified += 1
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(unique_keywords)):
+            groups.setdefault(find(i), []).append(i)
+
+        # Only preferred keywords that are being clustered are kept, so `prefer` can be a
+        # long stream (e.g. every seed of a file) without being held in memory
+        candidates = {k.lower().strip() for k in unique_keywords}
+        preferred = {k for k in (p.lower().strip() for p in (prefer or ())) if k in candidates}
+        clusters = {}
+        for members in groups.values():
+            names = [unique_keywords[i] for i in members]
+            representative = min(
+                names, key=lambda k: (k.lower().strip() not in preferred, len(k), k)
+            )
+            clusters[representative] = names
+
+        logger.info(f"Near-duplicate detection: {len(unique_keywords)} keywords -> "
+                    f"{len(clusters)} clusters ({verified} merges, "
+                    f"{self.bands} bands x {self.rows} rows)")
+        return clusters
+
+
+def deduplicate_near_duplicates(keywords: Iterable[str], threshold: float = 0.8,
+                                prefer: Optional[Iterable[str]] = None,
+                                language: str = 'en') -> Dict[str, List[str]]:
+    """
+    Convenience function to collapse near-duplicate keywords.
+
+    Args:
+        keywords (Iterable[str]): Keywords to deduplicate
+        threshold (float): Minimum Jaccard similarity of normalized token sets
+        prefer (Optional[Iterable[str]]): Keywords to favor as representatives
+        language (str): Language code for token normalization
+
+    Returns:
+        Dict[str, List[str]]: Representative keyword mapped to cluster members
+    """
+    detector = NearDuplicateDetector(threshold=threshold, language=language)
+    return detector.cluster(keywords, prefer=prefer)
+
+
+if __name__ == "__main__":
+    # Test the near-duplicate detection
+    test_keywords = [
+        "whatsapp automation tool",
+        "whatsapp automation tools",
+        "tools whatsapp automation",
+        "whatsapp automation for business",
+        "whatsapp automation business",
+        "crypto jobs remote",
+    ]
+
+    clusters = deduplicate_near_duplicates(test_keywords)
+    for representative, members in clusters.items():
+        print(f"{representative}: {members}")
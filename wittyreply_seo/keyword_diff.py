@@ -0,0 +1,295 @@
+"""
+Run-to-run keyword diffs. Newly discovered keywords are hash-joined against a
+previous output so trends and analysis run only for keywords that are new,
+previous results are carried forward, and a diff report lists what changed.
+"""
+
+import os
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+
+from keyword_export import export_rows, derive_output_path, read_rows, ExportError
+from seed_reader import normalize_seed, seed_key
+
+if TYPE_CHECKING:
+    from fetch_trends_api import KeywordMetrics
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DIFF_COLUMNS = ['keyword', 'change', 'field', 'before', 'after', 'delta']
+SCORE_FIELDS = ['trend_score', 'opportunity_score']
+DEFAULT_MOVE_THRESHOLD = 5.0  # Score points a keyword must move to be reported
+
+# KeywordMetrics fields read back from an enhanced output
+_METRIC_FIELDS = [
+    'search_volume', 'trend_score', 'competition', 'competition_score', 'cpc_low', 'cpc_high',
+    'opportunity_score', 'difficulty_score', 'recommendation', 'propagated_from',
+    'trend_slope', 'seasonality_strength', 'peak_month', 'volatility'
+]
+
+
+class BaselineError(Exception):
+    """Custom exception for baseline loading errors."""
+    pass
+
+
+def keyword_key(keyword: str) -> str:
+    """Join key of a keyword: normalized and case-insensitive."""
+    return seed_key(normalize_seed(keyword))
+
+
+class Baseline:
+    """
+    Results of a previous run, indexed by keyword key.
+
+    A basic output and its `_enhanced` sibling are loaded together; an enhanced
+    file (such as whatsapp_ai_ENHANCED.csv) can also be the baseline on its own.
+    """
+
+    def __init__(self, basic: Dict[str, Dict], enhanced: Dict[str, Dict], paths: List[str]):
+        """
+        Initialize the baseline.
+
+        Args:
+            basic (Dict[str, Dict]): Basic rows by keyword key
+            enhanced (Dict[str, Dict]): Enhanced rows by keyword key
+            paths (List[str]): Files the rows were read from
+        """
+        self.basic = basic
+        self.enhanced = enhanced
+        self.paths = paths
+
+    @classmethod
+    def load(cls, path: str) -> 'Baseline':
+        """
+        Load a previous output (and its `_enhanced` sibling if present).
+
+        Args:
+            path (str): Previous basic or enhanced output file
+
+        Returns:
+            Baseline: Loaded baseline
+
+        Raises:
+            BaselineError: If the file is missing or unreadable
+        """
+        if not os.path.exists(path):
+            raise BaselineError(f"Baseline file not found: {path}")
+
+        paths = [path]
+        sibling = derive_output_path(path, '_enhanced')
+        if sibling != path and os.path.exists(sibling):
+            paths.append(sibling)
+
+        basic: Dict[str, Dict] = {}
+        enhanced: Dict[str, Dict] = {}
+        for file_path in paths:
+            try:
+                for row in read_rows(file_path):
+                    if not row.get('keyword'):
+                        continue
+                    key = keyword_key(row['keyword'])
+                    if 'opportunity_score' in row or 'recommendation' in row:
+                        enhanced[key] = row
+                    else:
+                        basic[key] = row
+            except ExportError as e:
+                raise BaselineError(str(e))
+
+        logger.info(f"Loaded baseline of {len(basic)} basic and {len(enhanced)} enhanced "
+                    f"rows from {', '.join(paths)}")
+        return cls(basic, enhanced, paths)
+
+    def __len__(self) -> int:
+        return len(self.basic.keys() | self.enhanced.keys())
+
+    def is_scored(self, key: str) -> bool:
+        """Whether the baseline holds a usable result for a keyword key."""
+        if key in self.enhanced:
+            return True
+        row = self.basic.get(key)
+        return row is not None and row.get('trend_score') is not None and not row.get('error')
+
+    def split(self, keywords: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Hash-join keywords against the baseline.
+
+        Args:
+            keywords (Iterable[str]): Keywords discovered by this run
+
+        Returns:
+            Tuple[List[str], List[str]]: (new keywords, keywords carried forward);
+            baseline rows without a score count as new so they are retried
+        """
+        new, carried = [], []
+        for keyword in keywords:
+            (carried if self.is_scored(keyword_key(keyword)) else new).append(keyword)
+        return new, carried
+
+    def carried_data(self, keywords: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Basic rows for carried keywords, under this run's spelling.
+
+        Args:
+            keywords (Iterable[str]): Carried keywords
+
+        Returns:
+            Dict[str, Dict]: Keyword data in collect_trends_data format
+        """
+        keyword_data = {}
+        for keyword in keywords:
+            key = keyword_key(keyword)
+            row = self.basic.get(key) or self.enhanced.get(key)
+            data = {'keyword': keyword, 'source': row.get('source') or 'autocomplete',
+                    'trend_score': row.get('trend_score'), 'error': None}
+            # Regional interest is carried too; cluster columns belong to the old run
+            data.update((field, value) for field, value in row.items()
+                        if field.startswith('interest_'))
+            keyword_data[keyword] = data
+        return keyword_data
+
+    def related_data(self, exclude: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Baseline rows found through trends related queries.
+
+        Their parent keywords are not re-fetched, so they are carried forward too.
+
+        Args:
+            exclude (Iterable[str]): Keywords already in this run's data
+
+        Returns:
+            Dict[str, Dict]: Keyword data for the related queries
+        """
+        excluded = {keyword_key(keyword) for keyword in exclude}
+        related = [row['keyword'] for key, row in self.basic.items()
+                   if row.get('source') == 'trends_related' and key not in excluded]
+        return self.carried_data(related)
+
+    def carried_metrics(self, keywords: Iterable[str]) -> List['KeywordMetrics']:
+        """
+        Enhanced metrics for carried keywords that had them in the baseline.
+
+        Args:
+            keywords (Iterable[str]): Carried keywords
+
+        Returns:
+            List[KeywordMetrics]: Metrics under this run's spelling
+        """
+        from fetch_trends_api import KeywordMetrics
+
+        metrics = []
+        for keyword in keywords:
+            row = self.enhanced.get(keyword_key(keyword))
+            if row is None:
+                continue
+            values = {field: row.get(field) for field in _METRIC_FIELDS}
+            # Outputs keep only the seasonal average; a one-point curve exports the same value
+            average = row.get('seasonal_trend_avg')
+            intents = row.get('intents')
+            metrics.append(KeywordMetrics(keyword=keyword, **values,
+                                          seasonal_trend=[average] if average is not None else None,
+                                          intent=row.get('intent'),
+                                          intents=intents.split('|') if intents else None))
+        return metrics
+
+    def scores(self) -> Dict[str, Dict[str, Any]]:
+        """Baseline scores per keyword key, for diffing."""
+        view = {key: {'keyword': row['keyword'], 'trend_score': row.get('trend_score')}
+                for key, row in self.basic.items()}
+        for key, row in self.enhanced.items():
+            entry = view.setdefault(key, {'keyword': row['keyword'],
+                                          'trend_score': row.get('trend_score')})
+            entry['opportunity_score'] = row.get('opportunity_score')
+        return view
+
+
+def run_scores(keyword_data: Dict[str, Dict],
+               metrics: Optional[List['KeywordMetrics']] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Scores per keyword key of this run's results, for diffing.
+
+    Args:
+        keyword_data (Dict[str, Dict]): Basic keyword data
+        metrics (Optional[List[KeywordMetrics]]): Enhanced results
+
+    Returns:
+        Dict[str, Dict[str, Any]]: keyword, trend_score and opportunity_score per key
+    """
+    view = {keyword_key(keyword): {'keyword': keyword, 'trend_score': data.get('trend_score')}
+            for keyword, data in keyword_data.items()}
+    for metric in metrics or []:
+        entry = view.setdefault(keyword_key(metric.keyword),
+                                {'keyword': metric.keyword, 'trend_score': metric.trend_score})
+        entry['opportunity_score'] = metric.opportunity_score
+    return view
+
+
+def diff_results(before: Dict[str, Dict], after: Dict[str, Dict],
+                 threshold: float = DEFAULT_MOVE_THRESHOLD) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Compare two score views keyed by keyword key.
+
+    Args:
+        before (Dict[str, Dict]): Previous scores (Baseline.scores())
+        after (Dict[str, Dict]): Current scores (run_scores())
+        threshold (float): Minimum absolute change reported as moved
+
+    Returns:
+        Tuple[List[Dict], Dict[str, int]]: Diff rows (DIFF_COLUMNS) and counts per change
+    """
+    def best_score(entry: Dict) -> float:
+        for field in reversed(SCORE_FIELDS):
+            if entry.get(field) is not None:
+                return entry[field]
+        return float('-inf')
+
+    added = sorted((after[key] for key in after.keys() - before.keys()), key=best_score, reverse=True)
+    dropped = sorted((before[key] for key in before.keys() - after.keys()), key=best_score, reverse=True)
+
+    moved = []
+    for key in before.keys() & after.keys():
+        for field in SCORE_FIELDS:
+            old, new = before[key].get(field), after[key].get(field)
+            if old is not None and new is not None and abs(new - old) >= threshold:
+                moved.append({'keyword': after[key]['keyword'], 'change': 'moved', 'field': field,
+                              'before': old, 'after': new, 'delta': round(new - old, 2)})
+    moved.sort(key=lambda row: abs(row['delta']), reverse=True)
+
+    rows = []
+    for entry in added:
+        field = next((f for f in reversed(SCORE_FIELDS) if entry.get(f) is not None), None)
+        rows.append({'keyword': entry['keyword'], 'change': 'added', 'field': field,
+                     'before': None, 'after': entry.get(field) if field else None, 'delta': None})
+    for entry in dropped:
+        field = next((f for f in reversed(SCORE_FIELDS) if entry.get(f) is not None), None)
+        rows.append({'keyword': entry['keyword'], 'change': 'dropped', 'field': field,
+                     'before': entry.get(field) if field else None, 'after': None, 'delta': None})
+    rows.extend(moved)
+
+    counts = {
+        'added': len(added),
+        'dropped': len(dropped),
+        'moved': len({row['keyword'] for row in moved}),
+        'kept': len(before.keys() & after.keys()),
+    }
+    return rows, counts
+
+
+def write_diff_report(rows: List[Dict], output_file: str,
+                      output_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Write diff rows (added, then dropped, then moved) to a file.
+
+    Args:
+        rows (List[Dict]): Rows from diff_results
+        output_file (str): Report path
+        output_format (Optional[str]): 'csv', 'jsonl' or 'parquet' (inferred if None)
+
+    Returns:
+        Dict[str, Any]: Export statistics
+    """
+    summary = export_rows(rows, output_file, DIFF_COLUMNS, output_format=output_format)
+    logger.info(f"Wrote diff report with {summary['rows']} rows to {output_file}")
+    return summary
@@ -0,0 +1,464 @@
+"""
+Streaming keyword exporter for CSV, JSONL and Parquet output.
+Rows are written as they are produced; sorted output uses an external merge sort
+so memory stays bounded no matter how many rows are exported. Output goes to a
+temporary file that replaces the target only once it is complete, so a failed
+or killed export never leaves a truncated file behind.
+"""
+
+import os
+import csv
+import json
+import heapq
+import logging
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ('csv', 'jsonl', 'parquet')
+
+# Text columns whose value counts are kept for export summaries
+COUNTED_COLUMNS = {'recommendation', 'source', 'competition'}
+
+# Numeric columns, parsed back from text when CSV output is read
+NUMERIC_COLUMNS = {
+    'trend_score', 'search_volume', 'competition_score', 'cpc_low', 'cpc_high',
+    'opportunity_score', 'difficulty_score', 'seasonal_trend_avg', 'cluster_id', 'cluster_size',
+    'trend_slope', 'seasonality_strength', 'peak_month', 'volatility',
+}
+
+# Numeric columns that only ever hold whole numbers
+INTEGER_COLUMNS = {'search_volume', 'cluster_id', 'cluster_size', 'peak_month'}
+
+_BUILTIN_TYPES = {str, int, float, bool, type(None)}
+
+
+class ExportError(Exception):
+    """Custom exception for export errors."""
+    pass
+
+
+def infer_format(output_file: str) -> str:
+    """
+    Infer the export format from a file extension.
+
+    Args:
+        output_file (str): Output file path
+
+    Returns:
+        str: One of 'csv', 'jsonl' or 'parquet' (defaults to 'csv')
+    """
+    extension = os.path.splitext(output_file)[1].lower().lstrip('.')
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension in ('parquet', 'pq'):
+        return 'parquet'
+    return 'csv'
+
+
+def derive_output_path(output_file: str, suffix: str) -> str:
+    """
+    Build a sibling output path, e.g. ('out.csv', '_enhanced') -> 'out_enhanced.csv'.
+
+    Args:
+        output_file (str): Main output file path
+        suffix (str): Suffix inserted before the extension
+
+    Returns:
+        str: Derived file path
+    """
+    root, extension = os.path.splitext(output_file)
+    return f"{root}{suffix}{extension or '.csv'}"
+
+
+def _plain(value: Any) -> Any:
+    """Convert NumPy scalars to built-in Python types so every writer can handle them."""
+    if type(value) not in _BUILTIN_TYPES and hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+class _CsvWriter:
+    """Row writer for CSV files."""
+
+    def __init__(self, path: str, columns: List[str]):
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, row: Dict[str, Any]):
+        self._writer.writerow({k: ('' if v is None else v) for k, v in row.items()})
+
+    def close(self):
+        self._file.close()
+
+
+class _JsonlWriter:
+    """Row writer for JSON Lines files."""
+
+    def __init__(self, path: str, columns: List[str]):
+        self._file = open(path, 'w', encoding='utf-8')
+        self._columns = columns
+
+    def write(self, row: Dict[str, Any]):
+        record = {column: row.get(column) for column in self._columns}
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Row writer for Parquet files, flushed one row group at a time."""
+
+    def __init__(self, path: str, columns: List[str], row_group_size: int = 50000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportError("pyarrow not available. Install with: pip install pyarrow")
+
+        self._pa = pa
+        self._pq = pq
+        self._path = path
+        self._columns = columns
+        self._row_group_size = row_group_size
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer = None
+
+    def write(self, row: Dict[str, Any]):
+        self._buffer.append(row)
+        if len(self._buffer) >= self._row_group_size:
+            self._flush()
+
+    def _schema(self, table):
+        """
+        File schema, fixed from the first row group.
+
+        Known numeric columns get their type whatever the first group holds, and
+        other columns the type inferred from it; a column that is all null there
+        becomes a string column, so later groups with values still fit.
+        """
+        pa = self._pa
+        fields = []
+        for field in table.schema:
+            if field.name in INTEGER_COLUMNS:
+                kind = pa.int64()
+            elif field.name in NUMERIC_COLUMNS or field.name.startswith('interest_'):
+                kind = pa.float64()
+            elif pa.types.is_null(field.type):
+                kind = pa.string()
+            else:
+                kind = field.type
+            fields.append(pa.field(field.name, kind))
+        return pa.schema(fields)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        table = self._pa.Table.from_pydict(
+            {column: [row.get(column) for row in self._buffer] for column in self._columns}
+        )
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, self._schema(table))
+        # Each row group infers its own types (e.g. null or int64), cast to the file's
+        table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self._buffer = []
+
+    def close(self):
+        self._flush()
+        if self._writer is None:
+            # No rows: still produce a valid file with the expected columns
+            empty = self._pa.Table.from_pydict({column: [] for column in self._columns})
+            self._pq.write_table(empty.cast(self._schema(empty)), self._path)
+        else:
+            self._writer.close()
+
+
+_WRITERS = {
+    'csv': _CsvWriter,
+    'jsonl': _JsonlWriter,
+    'parquet': _ParquetWriter,
+}
+
+
+class StreamingExporter:
+    """
+    Streams keyword rows to CSV, JSONL or Parquet.
+
+    Unsorted exports stream straight out. Sorted exports buffer up to
+    `max_rows_in_memory` rows, spill each sorted run to a temporary JSONL file,
+    and k-way merge the runs into the output when the exporter is closed. Either
+    way rows go to a temporary file next to the output, renamed over it on close.
+    """
+
+    def __init__(self, output_file: str, columns: List[str], output_format: Optional[str] = None,
+                 sort_by: Optional[str] = None, descending: bool = True,
+                 max_rows_in_memory: int = 100000, tmp_dir: Optional[str] = None):
+        """
+        Initialize the exporter.
+
+        Args:
+            output_file (str): Output file path
+            columns (List[str]): Column order for the output
+            output_format (Optional[str]): 'csv', 'jsonl' or 'parquet' (inferred if None)
+            sort_by (Optional[str]): Column to sort by; missing values always go last
+            descending (bool): Sort direction for `sort_by`
+            max_rows_in_memory (int): Rows buffered before a sorted run is spilled to disk
+            tmp_dir (Optional[str]): Directory for spilled runs (default: system temp)
+        """
+        self.output_file = output_file
+        self.columns = columns
+        self.output_format = output_format or infer_format(output_file)
+        if self.output_format not in SUPPORTED_FORMATS:
+            raise ExportError(f"Unsupported export format: {self.output_format}")
+
+        self.sort_by = sort_by
+        self.descending = descending
+        self.max_rows_in_memory = max_rows_in_memory
+        self.tmp_dir = tmp_dir
+
+        self.rows_written = 0
+        self.column_stats: Dict[str, Dict[str, float]] = {}
+        self.value_counts: Dict[str, Dict[str, int]] = {}
+
+        # Same directory as the output, so the final rename is atomic
+        directory, name = os.path.split(output_file)
+        self._temp_file = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._runs: List[str] = []
+        self._writer = None if sort_by else self._open_writer()
+        self._closed = False
+
+    def _open_writer(self):
+        return _WRITERS[self.output_format](self._temp_file, self.columns)
+
+    def _sort_key(self, row: Dict[str, Any]):
+        """Sort key that puts missing values last in either direction."""
+        value = row.get(self.sort_by)
+        if value is None or value != value:  # None or NaN
+            return (1, 0)
+        return (0, -value if self.descending else value)
+
+    def _track(self, row: Dict[str, Any]):
+        """Update running summary statistics for a row."""
+        self.rows_written += 1
+        for column, value in row.items():
+            kind = type(value)
+            if (kind is float or kind is int) and value == value:
+                stats = self.column_stats.setdefault(column, {'count': 0, 'sum': 0.0})
+                stats['count'] += 1
+                stats['sum'] += value
+            elif kind is str and column in COUNTED_COLUMNS:
+                counts = self.value_counts.setdefault(column, {})
+                counts[value] = counts.get(value, 0) + 1
+
+    def write(self, row: Dict[str, Any]):
+        """
+        Write (or buffer, when sorting) a single row.
+
+        Args:
+            row (Dict[str, Any]): Row keyed by column name
+        """
+        row = {column: _plain(value) for column, value in row.items()}
+        self._track(row)
+
+        if self._writer is not None:
+            self._writer.write(row)
+            return
+
+        self._buffer.append(row)
+        if len(self._buffer) >= self.max_rows_in_memory:
+            self._spill()
+
+    def write_many(self, rows: Iterable[Dict[str, Any]]):
+        """Write every row from an iterable."""
+        for row in rows:
+            self.write(row)
+
+    def _spill(self):
+        """Sort the in-memory buffer and write it to a temporary run file."""
+        self._buffer.sort(key=self._sort_key)
+        fd, path = tempfile.mkstemp(prefix='keyword_run_', suffix='.jsonl', dir=self.tmp_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for row in self._buffer:
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self._runs.append(path)
+        self._buffer = []
+        logger.debug(f"Spilled sorted run {len(self._runs)} to {path}")
+
+    def _read_run(self, path: str) -> Iterator[Dict[str, Any]]:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish the export, merging sorted runs if needed.
+
+        Returns:
+            Dict[str, Any]: Export statistics
+        """
+        if self._closed:
+            return self.summary()
+        self._closed = True
+
+        try:
+            if self._writer is None:
+                writer = self._open_writer()
+                try:
+                    if self._runs:
+                        if self._buffer:
+                            self._spill()
+                        merged = heapq.merge(*(self._read_run(path) for path in self._runs),
+                                             key=self._sort_key)
+                        for row in merged:
+                            writer.write(row)
+                    else:
+                        self._buffer.sort(key=self._sort_key)
+                        for row in self._buffer:
+                            writer.write(row)
+                finally:
+                    writer.close()
+                    for path in self._runs:
+                        os.remove(path)
+                    self._buffer = []
+            else:
+                self._writer.close()
+            os.replace(self._temp_file, self.output_file)
+        except BaseException:
+            if os.path.exists(self._temp_file):
+                os.remove(self._temp_file)
+            raise
+
+        logger.info(f"Exported {self.rows_written} rows to {self.output_file} "
+                    f"({self.output_format}, {len(self._runs)} spilled runs)")
+        return self.summary()
+
+    def abort(self):
+        """Give up on the export: drop the temporary output and runs, leaving any existing output as is."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._writer.close()
+        for path in self._runs:
+            os.remove(path)
+        self._buffer = []
+        if os.path.exists(self._temp_file):
+            os.remove(self._temp_file)
+
+    def summary(self) -> Dict[str, Any]:
+        """Row count plus per-column non-null counts and means."""
+        means = {column: stats['sum'] / stats['count']
+                 for column, stats in self.column_stats.items() if stats['count']}
+        counts = {column: int(stats['count']) for column, stats in self.column_stats.items()}
+        return {
+            'rows': self.rows_written,
+            'non_null': counts,
+            'mean': means,
+            'value_counts': self.value_counts,
+            'output_file': self.output_file,
+            'format': self.output_format,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def export_rows(rows: Iterable[Dict[str, Any]], output_file: str, columns: List[str],
+                output_format: Optional[str] = None, sort_by: Optional[str] = None,
+                descending: bool = True, max_rows_in_memory: int = 100000) -> Dict[str, Any]:
+    """
+    Convenience function to stream rows into a file.
+
+    Args:
+        rows (Iterable[Dict[str, Any]]): Rows to export
+        output_file (str): Output file path
+        columns (List[str]): Column order
+        output_format (Optional[str]): 'csv', 'jsonl' or 'parquet' (inferred if None)
+        sort_by (Optional[str]): Column to sort by (missing values last)
+        descending (bool): Sort direction
+        max_rows_in_memory (int): Rows buffered before spilling a sorted run
+
+    Returns:
+        Dict[str, Any]: Export statistics
+    """
+    with StreamingExporter(output_file, columns, output_format=output_format,
+                           sort_by=sort_by, descending=descending,
+                           max_rows_in_memory=max_rows_in_memory) as exporter:
+        exporter.write_many(rows)
+    return exporter.summary()
+
+
+def _number(value: Any, integer: bool = False) -> Optional[float]:
+    """Parse a CSV cell as a number (None for blanks and text; an int if `integer` and whole)."""
+    if value is None or value == '':
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number) if integer and number.is_integer() else number
+
+
+def read_rows(input_file: str, input_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream rows back from a file written by export_rows.
+
+    CSV cells of NUMERIC_COLUMNS (and interest_<GEO> columns) are parsed as
+    numbers, INTEGER_COLUMNS as ints, and blank cells become None, so rows look
+    like the ones exported.
+
+    Args:
+        input_file (str): CSV, JSONL or Parquet file
+        input_format (Optional[str]): 'csv', 'jsonl' or 'parquet' (inferred if None)
+
+    Yields:
+        Dict[str, Any]: One row per record
+
+    Raises:
+        ExportError: If the file cannot be read
+    """
+    input_format = input_format or infer_format(input_file)
+    try:
+        if input_format == 'parquet':
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ExportError("Parquet input requires pyarrow (pip install pyarrow)")
+            for batch in pq.ParquetFile(input_file).iter_batches():
+                yield from batch.to_pylist()
+            return
+
+        with open(input_file, 'r', encoding='utf-8', newline='') as f:
+            if input_format == 'jsonl':
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+                return
+            for record in csv.DictReader(f):
+                row = {}
+                for key, value in record.items():
+                    if not key:
+                        continue
+                    if key in NUMERIC_COLUMNS or key.startswith('interest_'):
+                        value = _number(value, integer=key in INTEGER_COLUMNS)
+                    elif value == '':
+                        value = None
+                    row[key] = value
+                yield row
+    except (OSError, ValueError, csv.Error) as e:
+        raise ExportError(f"Could not read {input_file}: {e}")
@@ -0,0 +1,412 @@
+"""
+Keyword filter predicates that can be pushed down into keyword discovery.
+Drops keywords (and whole autocomplete branches) before any trends request is spent.
+"""
+
+import re
+import json
+import math
+import logging
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from fetch_autocomplete import DEFAULT_PREFIXES, DEFAULT_SUFFIXES
+
+if TYPE_CHECKING:
+    from used_keywords import UsedKeywordIndex
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Google Autocomplete returns about this many suggestions per query
+SUGGESTIONS_PER_QUERY = 10
+
+MATCH_MODES = ('any', 'all')
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+class FilterError(Exception):
+    """Custom exception for keyword filter errors."""
+    pass
+
+
+def _normalize_phrase(phrase: str) -> str:
+    return ' '.join(phrase.casefold().split())
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Regular expression matching any of the phrases, shaped like their trie.
+
+    Branches at each node start with distinct characters and optional tails are
+    greedy, so the engine never backtracks across phrases and always takes the
+    longest phrase starting at a position.
+    """
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{pattern})?' if '' in node else pattern
+
+    return build(trie)
+
+
+def _ends_word(text: str, index: int) -> bool:
+    """Whether a phrase ending just before text[index] ends a word there."""
+    return index == len(text) or not _WORD_CHAR.match(text[index])
+
+
+class PhraseMatcher:
+    """
+    Whole-word matcher for many phrases, compiled into a single regular expression.
+
+    Each keyword is scanned once in C regardless of the number of phrases
+    (unlike `any(phrase in keyword ...)`), and phrases only match whole words,
+    so "ai" does not match "email". Input text must already be casefolded.
+    """
+
+    def __init__(self, phrases: Iterable[str], anchored: bool = False):
+        """
+        Compile the matcher.
+
+        Args:
+            phrases (Iterable[str]): Phrases (case and extra whitespace are ignored)
+            anchored (bool): Only match phrases at the start of the text
+
+        Raises:
+            FilterError: If no phrase is given
+        """
+        self.phrases: FrozenSet[str] = frozenset(p for p in map(_normalize_phrase, phrases) if p)
+        if not self.phrases:
+            raise FilterError("PhraseMatcher needs at least one phrase")
+        trie = _trie_pattern(sorted(self.phrases))
+        # Lookarounds instead of \b so phrases like "c++" match whole words too
+        start = r'\A' if anchored else r'(?<!\w)'
+        self._search = re.compile(rf'{start}(?:{trie})(?!\w)').search
+        # Zero-width, so every word start is tried and overlapping phrases are all seen
+        self._finditer = re.compile(rf'{start}(?=((?:{trie}))(?!\w))').finditer
+        # The longest phrase found at a position implies the shorter ones it starts with
+        self._implied = {
+            phrase: frozenset(other for other in self.phrases
+                              if phrase.startswith(other) and _ends_word(phrase, len(other)))
+            for phrase in self.phrases
+        }
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def search(self, text: str) -> bool:
+        """Whether any phrase occurs in the (casefolded) text."""
+        return self._search(text) is not None
+
+    def found(self, text: str) -> Set[str]:
+        """All phrases occurring in the (casefolded) text, overlapping ones included."""
+        found: Set[str] = set()
+        for match in self._finditer(text):
+            found |= self._implied[match.group(1)]
+        return found
+
+    def contains_all(self, text: str) -> bool:
+        """Whether every phrase occurs in the (casefolded) text."""
+        if len(self.phrases) == 1:
+            return self.search(text)
+        return len(self.found(text)) == len(self.phrases)
+
+
+@lru_cache(maxsize=32)
+def compile_phrases(phrases: Tuple[str, ...], anchored: bool = False) -> PhraseMatcher:
+    """Compile (or reuse) a matcher for a tuple of phrases."""
+    return PhraseMatcher(phrases, anchored=anchored)
+
+
+def load_phrase_file(path: str) -> Dict:
+    """
+    Load include and exclude phrases for a project.
+
+    Text files hold one phrase per line; lines starting with '!' are excluded
+    phrases and '#' starts a comment. JSON files hold
+    {"include": [...], "exclude": [...], "mode": "any" | "all"}.
+
+    Args:
+        path (str): Phrase file path
+
+    Returns:
+        Dict: 'include' and 'exclude' phrase lists and 'mode' (None if unset)
+
+    Raises:
+        FilterError: If the file is missing or malformed
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.lower().endswith('.json'):
+                data = json.load(f)
+                if not isinstance(data, dict):
+                    raise FilterError(f"{path} must contain a JSON object")
+                phrases = {'include': list(data.get('include', [])),
+                           'exclude': list(data.get('exclude', [])),
+                           'mode': data.get('mode')}
+            else:
+                phrases = {'include': [], 'exclude': [], 'mode': None}
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    if line.startswith('!'):
+                        phrases['exclude'].append(line[1:].strip())
+                    else:
+                        phrases['include'].append(line)
+    except (OSError, ValueError) as e:
+        raise FilterError(f"Could not read phrases from {path}: {e}")
+
+    if phrases['mode'] not in (None,) + MATCH_MODES:
+        raise FilterError(f"Unknown match mode '{phrases['mode']}' in {path}")
+    logger.info(f"Loaded {len(phrases['include'])} include and {len(phrases['exclude'])} "
+                f"exclude phrases from {path}")
+    return phrases
+
+
+class KeywordFilter:
+    """
+    Compiled keyword predicate for length, phrase, include/exclude phrase list
+    and used-keyword filters.
+
+    Autocomplete completions keep the query as a prefix and append to it, so a
+    keyword's descendants are always longer than it. `can_expand` uses that to
+    prune whole branches once they are too long, or too long to still gain a
+    missing phrase or include phrase; "whatsapp" is expanded for the phrase
+    "bot", since "whatsapp bot" may be one of its completions.
+    Used keywords are dropped but still expanded, since their completions may be new.
+    An excluded phrase followed by more words stays in every completion, so
+    such branches are pruned too.
+    """
+
+    def __init__(self, min_length: Optional[int] = None, max_length: Optional[int] = None,
+                 phrase_match: Optional[str] = None,
+                 exclude: Optional['UsedKeywordIndex'] = None,
+                 include_phrases: Optional[Iterable[str]] = None,
+                 exclude_phrases: Optional[Iterable[str]] = None,
+                 match_mode: str = 'any'):
+        """
+        Initialize the filter.
+
+        Args:
+            min_length (Optional[int]): Minimum keyword length
+            max_length (Optional[int]): Maximum keyword length
+            phrase_match (Optional[str]): Required phrase (case insensitive)
+            exclude (Optional[UsedKeywordIndex]): Already used keywords and titles to drop
+            include_phrases (Optional[Iterable[str]]): Whole-word phrases a keyword must contain
+            exclude_phrases (Optional[Iterable[str]]): Whole-word phrases that drop a keyword
+            match_mode (str): 'any' or 'all' include phrases must be present
+
+        Raises:
+            FilterError: If the match mode is unknown
+        """
+        if match_mode not in MATCH_MODES:
+            raise FilterError(f"Unknown match mode '{match_mode}' (use 'any' or 'all')")
+        self.min_length = min_length
+        self.max_length = max_length
+        self.phrase = phrase_match.lower() if phrase_match else None
+        self.exclude = exclude
+        self.match_mode = match_mode
+        include_phrases = tuple(include_phrases or ())
+        exclude_phrases = tuple(exclude_phrases or ())
+        self.include_phrases = compile_phrases(include_phrases) if include_phrases else None
+        self.exclude_phrases = compile_phrases(exclude_phrases) if exclude_phrases else None
+
+    @property
+    def is_active(self) -> bool:
+        """Whether any filter criterion is set."""
+        return bool(self.min_length or self.max_length or self.phrase or self.exclude or
+                    self.include_phrases or self.exclude_phrases)
+
+    def _includes(self, text: str) -> bool:
+        if self.match_mode == 'all':
+            return self.include_phrases.contains_all(text)
+        return self.include_phrases.search(text)
+
+    def matches(self, keyword: str) -> bool:
+        """
+        Check whether a keyword passes all filters.
+
+        Args:
+            keyword (str): Keyword to test
+
+        Returns:
+            bool: True if the keyword should be kept
+        """
+        length = len(keyword)
+        if self.min_length and length < self.min_length:
+            return False
+        if self.max_length and length > self.max_length:
+            return False
+        if self.phrase and self.phrase not in keyword.lower():
+            return False
+        if self.include_phrases is not None or self.exclude_phrases is not None:
+            text = keyword.casefold()
+            if self.exclude_phrases is not None and self.exclude_phrases.search(text):
+                return False
+            if self.include_phrases is not None and not self._includes(text):
+                return False
+        if self.exclude is not None and keyword in self.exclude:
+            return False
+        return True
+
+    __call__ = matches
+
+    def can_expand(self, keyword: str) -> bool:
+        """
+        Check whether autocomplete completions of a keyword could pass the filters.
+
+        Args:
+            keyword (str): Keyword that would be sent to autocomplete
+
+        Returns:
+            bool: False if every completion is guaranteed to be dropped
+        """
+        # Completions are strictly longer than the query
+        if self.max_length and len(keyword) >= self.max_length:
+            return False
+
+        # Not even room left to complete the phrase
+        if self.phrase and self.max_length and \
+                len(keyword) + _chars_to_add(keyword.lower(), self.phrase) > self.max_length:
+            return False
+
+        if self.include_phrases is not None or self.exclude_phrases is not None:
+            text = keyword.casefold()
+            # Words before the last one are final, so an excluded phrase there is in every completion
+            head = text.rsplit(' ', 1)[0] + ' ' if ' ' in text else ''
+            if self.exclude_phrases is not None and self.exclude_phrases.search(head):
+                return False
+            # Completions can append missing include phrases, unless there is no room left
+            if self.include_phrases is not None and self.max_length and not self._includes(text):
+                if len(keyword) + self._chars_to_include(text) > self.max_length:
+                    return False
+
+        return True
+
+    def _chars_to_include(self, text: str) -> int:
+        """Fewest characters a completion of `text` must append to pass the include phrases."""
+        if self.match_mode == 'all':
+            missing = self.include_phrases.phrases - self.include_phrases.found(text)
+            # Missing phrases may overlap, so only the longest one is certain to be needed
+            return max(_chars_to_add(text, phrase) for phrase in missing)
+        return min(_chars_to_add(text, phrase) for phrase in self.include_phrases.phrases)
+
+    def describe(self) -> str:
+        """Human readable summary of the active criteria."""
+        parts = []
+        if self.min_length:
+            parts.append(f"length >= {self.min_length}")
+        if self.max_length:
+            parts.append(f"length <= {self.max_length}")
+        if self.phrase:
+            parts.append(f"contains '{self.phrase}'")
+        if self.include_phrases is not None:
+            parts.append(f"contains {self.match_mode} of {len(self.include_phrases)} phrases")
+        if self.exclude_phrases is not None:
+            parts.append(f"none of {len(self.exclude_phrases)} excluded phrases")
+        if self.exclude is not None:
+            parts.append(f"not one of {len(self.exclude)} used keywords/titles")
+        return ', '.join(parts) or 'no filters'
+
+
+def _chars_to_add(text: str, phrase: str) -> int:
+    """
+    Fewest characters a completion of `text` must append to contain `phrase`.
+
+    The phrase may start inside the last characters of the text, as in
+    "whatsapp bo" -> "whatsapp bot", so overlaps are counted.
+    """
+    if phrase in text:
+        return 0
+    for overlap in range(min(len(phrase), len(text)) - 1, 0, -1):
+        if text.endswith(phrase[:overlap]):
+            return len(phrase) - overlap
+    return len(phrase)
+
+
+def _recursive_tree_size(max_depth: int, fanout: int) -> Dict[str, int]:
+    """Autocomplete requests and discovered keywords for one recursive seed."""
+    expanded = sum(fanout ** depth for depth in range(max_depth))
+    discovered = sum(fanout ** depth for depth in range(1, max_depth + 1))
+    return {'autocomplete': expanded, 'keywords': discovered}
+
+
+def estimate_pushdown_savings(seeds: List[str], keyword_filter: KeywordFilter,
+                              recursive: bool = False, variations: bool = False,
+                              max_depth: int = 2, fanout: int = 5,
+                              batch_size: int = 5) -> Dict[str, int]:
+    """
+    Estimate how many requests filter pushdown saves, without touching the network.
+
+    Pushdown only saves the requests of branches that cannot produce a keyword
+    passing the filter (see KeywordFilter.can_expand). Seeds in such branches
+    are assumed to contribute nothing downstream; all other discovered keywords
+    are assumed to pass, so `keywords_after` is an upper bound.
+
+    Args:
+        seeds (List[str]): Seed keywords
+        keyword_filter (KeywordFilter): Filter that will be pushed down
+        recursive (bool): Whether recursive expansion is enabled
+        variations (bool): Whether prefix/suffix variations are enabled
+        max_depth (int): Maximum recursion depth
+        fanout (int): Suggestions expanded per keyword in recursive mode
+        batch_size (int): Keywords per trends request
+
+    Returns:
+        Dict[str, int]: Estimated request counts with and without pushdown
+    """
+    autocomplete_before = autocomplete_after = 0
+    keywords_before = keywords_after = 0
+
+    for seed in seeds:
+        viable = keyword_filter.can_expand(seed)
+        seed_kept = 1 if keyword_filter.matches(seed) else 0
+
+        if recursive:
+            tree = _recursive_tree_size(max_depth, fanout)
+            autocomplete_before += tree['autocomplete']
+            keywords_before += 1 + tree['keywords']
+            # The seed itself is always queried; pruned branches stop there
+            autocomplete_after += tree['autocomplete'] if viable else 1
+            keywords_after += seed_kept + (tree['keywords'] if viable else 0)
+
+        elif variations:
+            queries = [seed] + [f"{p} {seed}" for p in DEFAULT_PREFIXES] + \
+                      [f"{seed} {s}" for s in DEFAULT_SUFFIXES]
+            kept_queries = [seed] + [q for q in queries[1:] if keyword_filter.can_expand(q)]
+            autocomplete_before += len(queries)
+            autocomplete_after += len(kept_queries)
+            keywords_before += 1 + len(queries) * SUGGESTIONS_PER_QUERY
+            kept_suggestions = len(kept_queries) if viable else len(kept_queries) - 1
+            keywords_after += seed_kept + kept_suggestions * SUGGESTIONS_PER_QUERY
+
+        else:
+            autocomplete_before += 1
+            autocomplete_after += 1
+            keywords_before += 1 + SUGGESTIONS_PER_QUERY
+            keywords_after += seed_kept + (SUGGESTIONS_PER_QUERY if viable else 0)
+
+    trends_before = math.ceil(keywords_before / batch_size)
+    trends_after = math.ceil(keywords_after / batch_size)
+
+    return {
+        'autocomplete_requests_before': autocomplete_before,
+        'autocomplete_requests_after': autocomplete_after,
+        'trends_requests_before': trends_before,
+        'trends_requests_after': trends_after,
+        'keywords_before': keywords_before,
+        'keywords_after': keywords_after,
+        'requests_saved': (autocomplete_before - autocomplete_after) + (trends_before - trends_after),
+    }
@@ -0,0 +1,100 @@
+"""
+Expected-value ordering of keywords for the rate-limited trends and analysis stages.
+
+Each keyword gets a cheap priority from what is known before any trends request:
+the opportunity score the analyzer gives it without trends data (estimated
+competition, length and search intent) plus its proximity to the seeds. Stages
+take keywords in that order, so a run that is rate limited, killed or stopped by
+--deadline has spent its requests on the most promising keywords.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from seed_reader import normalize_seed
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROXIMITY_WEIGHT = 25.0  # Points for a keyword made only of seed words
+
+
+class KeywordPrioritizer:
+    """Scores and orders keywords by expected value before they are fetched."""
+
+    def __init__(self, seeds: Iterable[str], language: str = 'en', intent_tagger=None):
+        """
+        Initialize the prioritizer.
+
+        Only the seeds' vocabulary is kept, so a streamed seed file of any size
+        can be read again here without holding its seeds.
+
+        Args:
+            seeds (Iterable[str]): Seed keywords (a list or a SeedStream)
+            language (str): Keyword language, selects the intent lexicons
+            intent_tagger (Optional[IntentTagger]): Tagger to share with the analyzer
+        """
+        # Importing the analyzer pulls in NumPy, so it waits until a run needs priorities
+        from fetch_trends_api import KeywordAnalyzer
+
+        self.vocabulary = set()
+        for seed in seeds:
+            self.vocabulary.update(normalize_seed(seed).lower().split())
+        self._analyzer = KeywordAnalyzer(None, language=language, intent_tagger=intent_tagger)
+
+    def proximity(self, keyword: str) -> float:
+        """
+        Share of a keyword's words that occur in the seeds (1.0 for seeds themselves).
+
+        Each expansion level adds words of its own, so this falls with distance from the seeds.
+
+        Args:
+            keyword (str): Keyword
+
+        Returns:
+            float: Proximity (0-1)
+        """
+        tokens = normalize_seed(keyword).lower().split()
+        if not tokens:
+            return 0.0
+        return sum(token in self.vocabulary for token in tokens) / len(tokens)
+
+    def scores(self, keywords: Iterable[str]) -> Dict[str, float]:
+        """
+        Priority of each keyword: heuristic opportunity (0-100) plus PROXIMITY_WEIGHT * proximity.
+
+        Args:
+            keywords (Iterable[str]): Keywords
+
+        Returns:
+            Dict[str, float]: Priority by keyword
+        """
+        from fetch_trends_api import KeywordMetrics, estimate_competition
+        from intent_tagger import IntentTagger
+
+        keywords = list(keywords)
+        tags = self._analyzer.intent_tagger.tag_many(keywords)
+        scores = {}
+        for keyword, intents in zip(keywords, tags):
+            metrics = KeywordMetrics(keyword=keyword, intents=list(intents),
+                                     intent=IntentTagger.primary(intents))
+            metrics.competition_score = estimate_competition(keyword)['competition_score']
+            opportunity = self._analyzer._calculate_opportunity_score(metrics)
+            scores[keyword] = opportunity + PROXIMITY_WEIGHT * self.proximity(keyword)
+        return scores
+
+    def order(self, keywords: Iterable[str], scores: Optional[Dict[str, float]] = None) -> List[str]:
+        """
+        Keywords by descending priority (ties alphabetical, so cached runs stay reproducible).
+
+        Args:
+            keywords (Iterable[str]): Keywords
+            scores (Optional[Dict[str, float]]): Priorities from scores(), if already computed
+
+        Returns:
+            List[str]: Ordered keywords
+        """
+        keywords = list(keywords)
+        scores = scores if scores is not None else self.scores(keywords)
+        return sorted(keywords, key=lambda keyword: (-scores[keyword], keyword))
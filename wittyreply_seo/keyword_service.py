@@ -0,0 +1,425 @@
+"""
+Long-running keyword service exposing KeywordTool over HTTP or a Unix socket.
+Trends clients, HTTP sessions and response caches stay warm between requests,
+so each request only pays for the network calls it actually needs.
+
+Usage:
+    python main.py serve --port 8765
+    python main.py serve --socket /tmp/keywords.sock --cache .keyword_cache.sqlite
+
+    curl -s localhost:8765/analyze -d '{"seeds": ["whatsapp automation"], "max_length": 60}'
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import logging
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from keyword_filters import KeywordFilter, FilterError
+from rate_limiter import RateLimiter, install_rate_limiter
+from run_metrics import get_metrics
+from response_cache import (
+    ResponseCache,
+    MemoryCache,
+    install_response_cache,
+    get_response_cache,
+    DEFAULT_TTL
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class ServiceError(Exception):
+    """Custom exception for invalid service requests (answered with HTTP 400)."""
+    pass
+
+
+def _as_keyword_list(value: Any, field: str) -> List[str]:
+    """Accept a list or a comma-separated string of keywords."""
+    if value is None:
+        raise ServiceError(f"'{field}' is required")
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        raise ServiceError(f"'{field}' must be a list or a comma-separated string")
+    keywords = [str(k).strip() for k in value if str(k).strip()]
+    if not keywords:
+        raise ServiceError(f"'{field}' is empty")
+    return keywords
+
+
+def _as_geo_list(value: Any) -> List[str]:
+    """Optional list (or comma-separated string) of region codes to compare."""
+    if value is None:
+        return []
+    return list(dict.fromkeys(geo.upper() for geo in _as_keyword_list(value, 'geos')))
+
+
+def _as_number(payload: Dict, field: str, kind: type = int, default: Any = None) -> Any:
+    """Optional non-negative number field (JSON numbers or numeric strings)."""
+    value = payload.get(field)
+    if value is None:
+        return default
+    expected = 'an integer' if kind is int else 'a number'
+    if isinstance(value, bool):
+        raise ServiceError(f"'{field}' must be {expected}")
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise ServiceError(f"'{field}' must be {expected}")
+    if number < 0:
+        raise ServiceError(f"'{field}' must not be negative")
+    return number
+
+
+def _keyword_filter(payload: Dict) -> KeywordFilter:
+    """Filter built from a request's min_length, max_length, phrase_match and phrase list fields."""
+    include = payload.get('include_phrases')
+    exclude = payload.get('exclude_phrases')
+    try:
+        return KeywordFilter(
+            _as_number(payload, 'min_length'), _as_number(payload, 'max_length'),
+            payload.get('phrase_match'),
+            include_phrases=_as_keyword_list(include, 'include_phrases') if include else None,
+            exclude_phrases=_as_keyword_list(exclude, 'exclude_phrases') if exclude else None,
+            match_mode=payload.get('match_mode', 'any')
+        )
+    except FilterError as e:
+        raise ServiceError(str(e))
+
+
+class KeywordService:
+    """
+    Thread-safe facade over KeywordTool for concurrent requests.
+
+    One KeywordTool is kept per (language, country, geo). Autocomplete calls run
+    concurrently; trends calls on the same tool are serialized because a pytrends
+    client keeps per-request state. All requests share the process rate limiter.
+    """
+
+    def __init__(self, language: str = 'en', country: str = 'US', geo: str = 'US',
+                 google_api_key: Optional[str] = None):
+        """
+        Initialize the service.
+
+        Args:
+            language (str): Default language code
+            country (str): Default country code for autocomplete
+            geo (str): Default region for trends
+            google_api_key (Optional[str]): Google API key for enhanced analysis
+        """
+        self.language = language
+        self.country = country
+        self.geo = geo
+        self.google_api_key = google_api_key
+        self.started_at = time.time()
+        self.requests_served = 0
+
+        self._tools: Dict[Tuple[str, str, str], Tuple[Any, threading.Lock]] = {}
+        self._tools_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+
+    def _get_tool(self, payload: Dict) -> Tuple[Any, threading.Lock]:
+        """Return the warm tool (and its trends lock) for the request's locale."""
+        from main import KeywordTool
+
+        key = (payload.get('language', self.language),
+               payload.get('country', self.country),
+               payload.get('geo', self.geo))
+
+        with self._tools_lock:
+            if key not in self._tools:
+                logger.info(f"Creating keyword tool for {key}")
+                tool = KeywordTool(language=key[0], country=key[1], geo=key[2],
+                                   google_api_key=self.google_api_key)
+                self._tools[key] = (tool, threading.Lock())
+            return self._tools[key]
+
+    def warm_up(self):
+        """Create the default tool and its trends client up front so the first request is not slowed down."""
+        tool, _ = self._get_tool({})
+        try:
+            tool.trends_client.ensure_client()
+        except Exception as e:
+            logger.warning(f"Trends client warm-up failed, will retry on first request: {e}")
+
+    def _count(self):
+        with self._counter_lock:
+            self.requests_served += 1
+
+    def autocomplete(self, payload: Dict) -> Dict:
+        """
+        Expand seed keywords through autocomplete.
+
+        Payload: seeds, recursive, variations, max_depth, min_length, max_length,
+        phrase_match, include_phrases, exclude_phrases, match_mode, language, country.
+        """
+        self._count()
+        return self._expand(payload)
+
+    def _expand(self, payload: Dict) -> Dict:
+        """Autocomplete expansion shared by the autocomplete and analyze requests."""
+        seeds = _as_keyword_list(payload.get('seeds'), 'seeds')
+        tool, _ = self._get_tool(payload)
+        keyword_filter = _keyword_filter(payload)
+
+        keywords = tool.collect_autocomplete_keywords(
+            seeds,
+            recursive=bool(payload.get('recursive')),
+            variations=bool(payload.get('variations')),
+            max_depth=_as_number(payload, 'max_depth', default=2),
+            keyword_filter=keyword_filter if keyword_filter.is_active else None
+        )
+        return {'seeds': seeds, 'keywords': sorted(keywords)}
+
+    def trends(self, payload: Dict) -> Dict:
+        """
+        Fetch trend scores for a list of keywords.
+
+        Payload: keywords, geo, language, country, and optionally geos to compare.
+        """
+        self._count()
+        keywords = _as_keyword_list(payload.get('keywords'), 'keywords')
+        geos = _as_geo_list(payload.get('geos'))
+        tool, trends_lock = self._get_tool(payload)
+
+        with trends_lock:
+            keyword_data = tool.collect_trends_data(keywords, geos=geos)
+        return {'keywords': list(keyword_data.values())}
+
+    def analyze(self, payload: Dict) -> Dict:
+        """
+        Autocomplete expansion, trends, filtering and dedup in one request.
+
+        Payload: the autocomplete fields plus geos, near_dedup, dedup_threshold and no_dedup.
+        """
+        self._count()
+        started = time.time()
+        geos = _as_geo_list(payload.get('geos'))
+        threshold = _as_number(payload, 'dedup_threshold', float, default=0.8)
+        expanded = self._expand(payload)
+        keywords = expanded['keywords']
+        tool, trends_lock = self._get_tool(payload)
+
+        if payload.get('near_dedup'):
+            keywords = tool.collapse_near_duplicates(
+                keywords, threshold=threshold,
+                prefer=expanded['seeds']
+            )
+
+        with trends_lock:
+            keyword_data = tool.collect_trends_data(keywords, geos=geos)
+
+        keyword_filter = _keyword_filter(payload)
+        if keyword_filter.is_active:
+            keyword_data = {k: v for k, v in keyword_data.items() if keyword_filter.matches(k)}
+        if not payload.get('no_dedup'):
+            keyword_data = tool.deduplicate_keywords(keyword_data)
+
+        return {
+            'seeds': expanded['seeds'],
+            'keywords': list(keyword_data.values()),
+            'duration_seconds': round(time.time() - started, 3),
+        }
+
+    def metrics(self) -> str:
+        """Stage, request, sleep and cache metrics in Prometheus text format."""
+        return get_metrics().prometheus_text(requests_served=self.requests_served)
+
+    def health(self) -> Dict:
+        """Uptime, request count, warm tools and cache statistics."""
+        cache = get_response_cache()
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'requests_served': self.requests_served,
+            'tools': ['/'.join(key) for key in self._tools],
+            'cache': cache.stats() if cache is not None else None,
+        }
+
+
+class KeywordRequestHandler(BaseHTTPRequestHandler):
+    """JSON request handler; `self.server.service` is the KeywordService."""
+
+    server_version = 'KeywordService/1.0'
+    protocol_version = 'HTTP/1.1'  # Keep client connections alive between requests
+
+    GET_ROUTES = {'/health': 'health', '/metrics': 'metrics'}
+    POST_ROUTES = {'/autocomplete': 'autocomplete', '/trends': 'trends', '/analyze': 'analyze'}
+
+    def _send_json(self, status: int, body: Dict):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_text(self, status: int, body: str):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ServiceError(f"Request body too large ({length} bytes)")
+        raw = self.rfile.read(length) if length else b'{}'
+        try:
+            payload = json.loads(raw.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ServiceError(f"Invalid JSON body: {e}")
+        if not isinstance(payload, dict):
+            raise ServiceError("JSON body must be an object")
+        return payload
+
+    def _dispatch(self, routes: Dict[str, str], with_body: bool):
+        method = routes.get(self.path.split('?', 1)[0])
+        if method is None:
+            self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+            return
+
+        try:
+            service = self.server.service
+            result = getattr(service, method)(self._read_json()) if with_body \
+                else getattr(service, method)()
+            if isinstance(result, str):
+                self._send_text(200, result)
+            else:
+                self._send_json(200, result)
+        except ServiceError as e:
+            self._send_json(400, {'error': str(e)})
+        except Exception as e:
+            logger.error(f"Request {self.path} failed: {e}")
+            self._send_json(500, {'error': str(e)})
+
+    def do_GET(self):
+        self._dispatch(self.GET_ROUTES, with_body=False)
+
+    def do_POST(self):
+        self._dispatch(self.POST_ROUTES, with_body=True)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return 'unix'
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server listening on a Unix domain socket."""
+    daemon_threads = True
+
+
+def create_server(service: KeywordService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                  socket_path: Optional[str] = None) -> socketserver.BaseServer:
+    """
+    Build a threaded server for the service.
+
+    Args:
+        service (KeywordService): Service handling requests
+        host (str): TCP bind address
+        port (int): TCP port (0 picks a free port)
+        socket_path (Optional[str]): Listen on this Unix socket instead of TCP
+
+    Returns:
+        socketserver.BaseServer: Server ready for serve_forever()
+    """
+    if socket_path:
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ServiceError("Unix sockets are not supported on this platform")
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Stale socket from a previous run
+        server = ThreadingUnixHTTPServer(socket_path, KeywordRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), KeywordRequestHandler)
+
+    server.service = service
+    return server
+
+
+def serve_main(argv: List[str]) -> int:
+    """
+    CLI entry point for `python main.py serve`.
+
+    Args:
+        argv (List[str]): Arguments after the subcommand name
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py serve',
+        description='Run a local keyword service with warm clients and caches'
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Bind address (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'TCP port (default: {DEFAULT_PORT})')
+    parser.add_argument('--socket', type=str, help='Listen on a Unix socket instead of TCP')
+    parser.add_argument('--language', '-l', default='en', help='Default language code (default: en)')
+    parser.add_argument('--country', '-c', default='US', help='Default country code (default: US)')
+    parser.add_argument('--geo', '-g', default='US', help='Default trends region (default: US)')
+    parser.add_argument('--google-api-key', type=str, help='Google Cloud API key for enhanced analysis')
+    parser.add_argument('--cache', type=str, help='Persistent SQLite cache behind the in-memory cache')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL,
+                        help=f'Seconds before cached responses are refetched (default: {DEFAULT_TTL})')
+    parser.add_argument('--cache-entries', type=int, default=100000,
+                        help='Responses kept in memory (default: 100000)')
+    parser.add_argument('--verbose', '-V', action='store_true', help='Enable verbose logging')
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    backing = ResponseCache(args.cache, ttl=args.cache_ttl) if args.cache else None
+    install_response_cache(MemoryCache(max_entries=args.cache_entries, ttl=args.cache_ttl,
+                                       backing=backing))
+    install_rate_limiter(RateLimiter())
+
+    service = KeywordService(language=args.language, country=args.country, geo=args.geo,
+                             google_api_key=args.google_api_key)
+    service.warm_up()
+
+    try:
+        server = create_server(service, args.host, args.port, args.socket)
+    except (OSError, ServiceError) as e:
+        logger.error(f"Could not start keyword service: {e}")
+        return 1
+
+    where = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"🛰️  Keyword service listening on {where} (Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️  Keyword service stopped")
+    finally:
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+        get_response_cache().close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(serve_main(sys.argv[1:]))
@@ -0,0 +1,740 @@
+"""
+Indexed SQLite keyword store shared by every run, replacing one-off CSV outputs.
+
+Keywords, runs, the latest metrics per keyword and region, and time series
+(trend scores per run, seasonal curves, regional interest) live in one file.
+Metrics are indexed on opportunity score, recommendation, geo and fetch time,
+and keywords have an FTS5 index, so typical questions ("top 50 HIGH_PRIORITY
+real estate keywords not used yet") are answered in milliseconds.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from keyword_export import export_rows, infer_format, read_rows, ExportError
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = 'keywords.sqlite'
+DEFAULT_USED_FILE = os.path.join('..', 'data', 'used-keywords.json')
+
+# Metric columns kept per (keyword, geo); later runs only overwrite the values they have
+METRIC_COLUMNS = [
+    'search_volume', 'trend_score', 'competition', 'competition_score', 'cpc_low',
+    'cpc_high', 'opportunity_score', 'difficulty_score', 'recommendation', 'propagated_from'
+]
+
+# Columns scripts/blog-generator.js expects, in order
+BLOG_COLUMNS = [
+    'keyword', 'competition', 'competition_score', 'opportunity_score',
+    'difficulty_score', 'recommendation'
+]
+
+QUERY_COLUMNS = ['keyword', 'geo'] + METRIC_COLUMNS + ['used', 'fetched_at']
+METRIC_PAGE_SIZE = 10000  # Rows read per statement by metric_rows
+
+# Response cache namespaces --offline runs can read from stored series, and the series name
+OFFLINE_SERIES = {'trends': 'trend_score', 'seasonal': 'seasonal'}
+STORED_TIMEFRAME = 'today 1-m'  # Timeframe of the trend scores the pipeline stores
+
+ORDERINGS = {
+    'opportunity': 'm.opportunity_score DESC',
+    'difficulty': 'm.difficulty_score ASC',
+    'volume': 'm.search_volume DESC',
+    'trend': 'm.trend_score DESC',
+    'recent': 'm.fetched_at DESC',
+}
+
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS runs ('
+    ' id INTEGER PRIMARY KEY,'
+    ' started_at REAL NOT NULL,'
+    ' finished_at REAL,'
+    ' source TEXT,'
+    ' options TEXT,'
+    ' keywords INTEGER NOT NULL DEFAULT 0'
+    ')',
+    'CREATE TABLE IF NOT EXISTS keywords ('
+    ' id INTEGER PRIMARY KEY,'
+    ' keyword TEXT NOT NULL UNIQUE COLLATE NOCASE,'
+    ' source TEXT,'
+    ' first_seen REAL NOT NULL,'
+    ' last_seen REAL NOT NULL,'
+    ' used INTEGER NOT NULL DEFAULT 0'
+    ')',
+    'CREATE TABLE IF NOT EXISTS metrics ('
+    ' keyword_id INTEGER NOT NULL REFERENCES keywords(id),'
+    ' geo TEXT NOT NULL,'
+    ' run_id INTEGER REFERENCES runs(id),'
+    ' fetched_at REAL NOT NULL,'
+    ' search_volume INTEGER,'
+    ' trend_score REAL,'
+    ' competition TEXT,'
+    ' competition_score REAL,'
+    ' cpc_low REAL,'
+    ' cpc_high REAL,'
+    ' opportunity_score REAL,'
+    ' difficulty_score REAL,'
+    ' recommendation TEXT,'
+    ' propagated_from TEXT,'
+    ' PRIMARY KEY (keyword_id, geo)'
+    ')',
+    'CREATE TABLE IF NOT EXISTS series ('
+    ' keyword_id INTEGER NOT NULL REFERENCES keywords(id),'
+    ' geo TEXT NOT NULL,'
+    ' name TEXT NOT NULL,'
+    ' fetched_at REAL NOT NULL,'
+    ' run_id INTEGER REFERENCES runs(id),'
+    ' points TEXT NOT NULL,'
+    ' PRIMARY KEY (keyword_id, geo, name, fetched_at)'
+    ') WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS idx_metrics_opportunity ON metrics (opportunity_score DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_metrics_recommendation '
+    'ON metrics (recommendation, opportunity_score DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_metrics_geo ON metrics (geo, opportunity_score DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_metrics_fetched ON metrics (fetched_at)',
+    'CREATE INDEX IF NOT EXISTS idx_keywords_used ON keywords (used)',
+]
+
+_FTS_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS keywords_fts USING fts5("
+    " keyword, content='keywords', content_rowid='id',"
+    " tokenize='unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER IF NOT EXISTS keywords_fts_insert AFTER INSERT ON keywords BEGIN'
+    ' INSERT INTO keywords_fts (rowid, keyword) VALUES (new.id, new.keyword); END',
+    'CREATE TRIGGER IF NOT EXISTS keywords_fts_delete AFTER DELETE ON keywords BEGIN'
+    " INSERT INTO keywords_fts (keywords_fts, rowid, keyword) VALUES ('delete', old.id, old.keyword); END",
+]
+
+
+class KeywordStoreError(Exception):
+    """Custom exception for keyword store errors."""
+    pass
+
+
+def fts_phrase(text: str) -> str:
+    """
+    Quote text as an FTS5 phrase, so 'real-estate' and 'real estate' both match "real estate agent".
+
+    Args:
+        text (str): Phrase to search for
+
+    Returns:
+        str: FTS5 MATCH expression
+    """
+    return '"' + ' '.join(text.split()).replace('"', '""') + '"'
+
+
+class KeywordStore:
+    """Persistent, indexed store of keywords and their metrics across runs."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        """
+        Open (and create if needed) the keyword store.
+
+        Args:
+            path (str): SQLite database path
+
+        Raises:
+            KeywordStoreError: If the database cannot be opened
+        """
+        self.path = path
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(path, timeout=30)
+            self._connection.row_factory = sqlite3.Row
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+            self.has_fts = self._create_fts()
+            self._connection.commit()
+        except sqlite3.Error as e:
+            raise KeywordStoreError(f"Could not open keyword store at {path}: {e}")
+
+    def _create_fts(self) -> bool:
+        """Create the full-text index; phrase search falls back to LIKE without FTS5."""
+        try:
+            for statement in _FTS_SCHEMA:
+                self._connection.execute(statement)
+            return True
+        except sqlite3.OperationalError:
+            logger.warning("SQLite was built without FTS5; phrase search will scan keywords")
+            return False
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # Writing
+
+    def start_run(self, source: str, options: Optional[Dict] = None) -> int:
+        """
+        Record the start of a run.
+
+        Args:
+            source (str): What produced the data ('pipeline', or an imported file path)
+            options (Optional[Dict]): Run options stored as JSON
+
+        Returns:
+            int: Run id
+        """
+        cursor = self._connection.execute(
+            'INSERT INTO runs (started_at, source, options) VALUES (?, ?, ?)',
+            (time.time(), source, json.dumps(options or {}, default=str))
+        )
+        self._connection.commit()
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int, keywords: int):
+        """Record the end of a run and how many keywords it stored."""
+        self._connection.execute('UPDATE runs SET finished_at = ?, keywords = ? WHERE id = ?',
+                                 (time.time(), keywords, run_id))
+        self._connection.commit()
+
+    def _keyword_ids(self, entries: Iterable[Tuple[str, Optional[str]]], now: float,
+                     used: bool = False) -> Dict[str, int]:
+        """Insert or touch (keyword, source) entries and return the keyword ids."""
+        sources = {}
+        for keyword, source in entries:
+            if keyword:
+                sources.setdefault(keyword, source)
+        keywords = list(sources)
+        self._connection.executemany(
+            'INSERT INTO keywords (keyword, source, first_seen, last_seen, used) '
+            'VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT (keyword) DO UPDATE SET last_seen = excluded.last_seen, '
+            'used = MAX(keywords.used, excluded.used)',
+            ((keyword, sources[keyword], now, now, int(used)) for keyword in keywords)
+        )
+        ids = {}
+        for start in range(0, len(keywords), 500):
+            chunk = keywords[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._connection.execute(
+                f'SELECT id, keyword FROM keywords WHERE keyword IN ({placeholders})', chunk
+            ).fetchall()
+            lowered = {row['keyword'].lower(): row['id'] for row in rows}
+            ids.update((keyword, lowered[keyword.lower()]) for keyword in chunk
+                       if keyword.lower() in lowered)
+        return ids
+
+    def record_rows(self, run_id: int, rows: Iterable[Dict[str, Any]], geo: str,
+                    source: Optional[str] = None) -> int:
+        """
+        Store keyword rows (basic or enhanced output) from one run.
+
+        Metric values present in a row replace the stored ones for (keyword, geo);
+        missing values keep what earlier runs found. Trend scores, seasonal curves
+        ('seasonal_trend' lists) and regional interest ('interest_<GEO>' fields)
+        are also appended to the time series.
+
+        Args:
+            run_id (int): Run id from start_run
+            rows (Iterable[Dict[str, Any]]): Rows with at least a 'keyword' field
+            geo (str): Region the metrics were fetched for
+            source (Optional[str]): Default keyword source when a row has none
+
+        Returns:
+            int: Number of rows stored
+        """
+        rows = [row for row in rows if row.get('keyword')]
+        now = time.time()
+        ids = self._keyword_ids(((row['keyword'], row.get('source') or source) for row in rows), now)
+
+        assignments = ', '.join(f'{column} = COALESCE(excluded.{column}, metrics.{column})'
+                                for column in METRIC_COLUMNS)
+        metric_rows = []
+        series_rows = []
+        for row in rows:
+            keyword_id = ids.get(row['keyword'])
+            if keyword_id is None:
+                continue
+            values = [row.get(column) for column in METRIC_COLUMNS]
+            values = [None if value == '' else value for value in values]
+            metric_rows.append([keyword_id, geo, run_id, now] + values)
+
+            if row.get('trend_score') not in (None, ''):
+                series_rows.append((keyword_id, geo, 'trend_score', now, run_id,
+                                    json.dumps([float(row['trend_score'])])))
+            if row.get('seasonal_trend'):
+                series_rows.append((keyword_id, geo, 'seasonal', now, run_id,
+                                    json.dumps(list(row['seasonal_trend']))))
+            for field, value in row.items():
+                if field.startswith('interest_') and value not in (None, ''):
+                    series_rows.append((keyword_id, field[len('interest_'):], 'interest', now,
+                                        run_id, json.dumps([float(value)])))
+
+        columns = ['keyword_id', 'geo', 'run_id', 'fetched_at'] + METRIC_COLUMNS
+        self._connection.executemany(
+            f"INSERT INTO metrics ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT (keyword_id, geo) DO UPDATE SET run_id = excluded.run_id, "
+            f"fetched_at = excluded.fetched_at, {assignments}",
+            metric_rows
+        )
+        self._connection.executemany('INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?, ?, ?)',
+                                     series_rows)
+        self._connection.commit()
+        return len(metric_rows)
+
+    def import_file(self, path: str, geo: str = 'US') -> int:
+        """
+        Import an existing CSV or JSONL output (basic, enhanced or blog format) as a run.
+
+        Args:
+            path (str): File to import
+            geo (str): Region its metrics were fetched for
+
+        Returns:
+            int: Number of keywords imported
+
+        Raises:
+            KeywordStoreError: If the file cannot be read
+        """
+        run_id = self.start_run(path, {'import': path, 'geo': geo})
+        try:
+            stored = self.record_rows(run_id, read_rows(path), geo, source='import')
+        except ExportError as e:
+            raise KeywordStoreError(str(e))
+        self.finish_run(run_id, stored)
+        logger.info(f"Imported {stored} keywords from {path}")
+        return stored
+
+    def mark_used(self, keywords: Iterable[str]) -> int:
+        """
+        Flag keywords as already used (e.g. by published posts).
+
+        Unknown keywords are added so later runs that rediscover them see the flag.
+
+        Args:
+            keywords (Iterable[str]): Used keywords
+
+        Returns:
+            int: Number of keywords flagged
+        """
+        ids = self._keyword_ids(((' '.join(str(k).split()), 'used') for k in keywords),
+                                time.time(), used=True)
+        self._connection.commit()
+        return len(ids)
+
+    def mark_used_from_file(self, path: str) -> int:
+        """
+        Flag the keywords listed in a JSON file (e.g. data/used-keywords.json) as used.
+
+        Args:
+            path (str): JSON list of keyword strings
+
+        Returns:
+            int: Number of keywords flagged
+
+        Raises:
+            KeywordStoreError: If the file is missing or not a JSON list
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                used = json.load(f)
+        except (OSError, ValueError) as e:
+            raise KeywordStoreError(f"Could not read used keywords from {path}: {e}")
+        if not isinstance(used, list):
+            raise KeywordStoreError(f"{path} must contain a JSON list of keywords")
+        return self.mark_used(used)
+
+    # Reading
+
+    def query(self, phrase: Optional[str] = None, recommendation: Optional[str] = None,
+              geo: Optional[str] = None, unused: bool = False,
+              min_opportunity: Optional[float] = None, since: Optional[float] = None,
+              order: str = 'opportunity', limit: Optional[int] = 50) -> List[Dict[str, Any]]:
+        """
+        Find keywords by phrase, recommendation, region, usage and freshness.
+
+        Args:
+            phrase (Optional[str]): Phrase the keyword must contain (full-text search)
+            recommendation (Optional[str]): e.g. 'HIGH_PRIORITY'
+            geo (Optional[str]): Region the metrics were fetched for
+            unused (bool): Skip keywords flagged as used
+            min_opportunity (Optional[float]): Minimum opportunity score
+            since (Optional[float]): Only metrics fetched at or after this Unix time
+            order (str): One of ORDERINGS
+            limit (Optional[int]): Maximum rows (None = all)
+
+        Returns:
+            List[Dict[str, Any]]: Rows with QUERY_COLUMNS fields
+
+        Raises:
+            KeywordStoreError: If the ordering is unknown
+        """
+        if order not in ORDERINGS:
+            raise KeywordStoreError(f"Unknown ordering '{order}' (use one of {', '.join(ORDERINGS)})")
+
+        conditions = []
+        params: List[Any] = []
+        if phrase:
+            if self.has_fts:
+                conditions.append('k.id IN (SELECT rowid FROM keywords_fts WHERE keywords_fts MATCH ?)')
+                params.append(fts_phrase(phrase))
+            else:
+                conditions.append('k.keyword LIKE ?')
+                params.append(f"%{' '.join(phrase.replace('-', ' ').split())}%")
+        if recommendation:
+            conditions.append('m.recommendation = ?')
+            params.append(recommendation)
+        if geo:
+            conditions.append('m.geo = ?')
+            params.append(geo)
+        if unused:
+            conditions.append('k.used = 0')
+        if min_opportunity is not None:
+            conditions.append('m.opportunity_score >= ?')
+            params.append(min_opportunity)
+        if since is not None:
+            conditions.append('m.fetched_at >= ?')
+            params.append(since)
+
+        metric_fields = ', '.join(f'm.{column}' for column in METRIC_COLUMNS)
+        sql = (f'SELECT k.keyword, m.geo, {metric_fields}, k.used, m.fetched_at '
+               f'FROM metrics m JOIN keywords k ON k.id = m.keyword_id')
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += f' ORDER BY {ORDERINGS[order]}, k.keyword'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        try:
+            rows = self._connection.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            raise KeywordStoreError(f"Query failed: {e}")
+        return [dict(row) for row in rows]
+
+    def series(self, keyword: str, name: str = 'trend_score',
+               geo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Time series of one keyword, oldest first.
+
+        Args:
+            keyword (str): Keyword
+            name (str): 'trend_score', 'seasonal' or 'interest'
+            geo (Optional[str]): Restrict to one region
+
+        Returns:
+            List[Dict[str, Any]]: Rows with geo, fetched_at, run_id and points
+        """
+        sql = ('SELECT s.geo, s.fetched_at, s.run_id, s.points FROM series s '
+               'JOIN keywords k ON k.id = s.keyword_id WHERE k.keyword = ? AND s.name = ?')
+        params = [keyword, name]
+        if geo:
+            sql += ' AND s.geo = ?'
+            params.append(geo)
+        rows = self._connection.execute(sql + ' ORDER BY s.fetched_at', params).fetchall()
+        return [{'geo': row['geo'], 'fetched_at': row['fetched_at'], 'run_id': row['run_id'],
+                 'points': json.loads(row['points'])} for row in rows]
+
+    def latest_series(self, name: str = 'seasonal',
+                      geo: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Most recent series of every keyword (and region).
+
+        Args:
+            name (str): 'trend_score', 'seasonal' or 'interest'
+            geo (Optional[str]): Restrict to one region
+
+        Yields:
+            Dict[str, Any]: keyword, geo, fetched_at and points
+        """
+        # SQLite returns the bare columns of the row holding MAX(fetched_at)
+        sql = ('SELECT k.keyword, s.geo, MAX(s.fetched_at) AS fetched_at, s.points FROM series s '
+               'JOIN keywords k ON k.id = s.keyword_id WHERE s.name = ?')
+        params = [name]
+        if geo:
+            sql += ' AND s.geo = ?'
+            params.append(geo)
+        for row in self._connection.execute(sql + ' GROUP BY s.keyword_id, s.geo', params):
+            yield {'keyword': row['keyword'], 'geo': row['geo'], 'fetched_at': row['fetched_at'],
+                   'points': json.loads(row['points'])}
+
+    def latest_points(self, name: str, geo: str, keywords: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Most recent series points of several keywords in one region.
+
+        Args:
+            name (str): 'trend_score', 'seasonal' or 'interest'
+            geo (str): Region
+            keywords (Iterable[str]): Keywords to look up (case-insensitive)
+
+        Returns:
+            Dict[str, List[float]]: Points by keyword as stored, for keywords that have the series
+        """
+        keywords = list(keywords)
+        found = {}
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keywords), 500):
+            chunk = keywords[start:start + 500]
+            rows = self._connection.execute(
+                f"SELECT k.keyword, s.points, MAX(s.fetched_at) FROM series s "
+                f"JOIN keywords k ON k.id = s.keyword_id WHERE s.name = ? AND s.geo = ? "
+                f"AND k.keyword IN ({','.join('?' * len(chunk))}) GROUP BY s.keyword_id",
+                [name, geo] + chunk
+            ).fetchall()
+            for row in rows:
+                found[row['keyword']] = json.loads(row['points'])
+        return found
+
+    def metric_rows(self, geo: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Every stored metrics row with its latest seasonal curve, for re-scoring.
+
+        Args:
+            geo (Optional[str]): Restrict to one region
+
+        Yields:
+            Dict[str, Any]: keyword_id, keyword, source, geo, METRIC_COLUMNS and
+            seasonal_trend (None if no curve was stored)
+        """
+        columns = ', '.join(f'm.{column}' for column in METRIC_COLUMNS)
+        sql = (f"SELECT m.rowid AS position, m.keyword_id, k.keyword, k.source, m.geo, {columns}, "
+               f"(SELECT s.points FROM series s WHERE s.keyword_id = m.keyword_id "
+               f"AND s.geo = m.geo AND s.name = 'seasonal' "
+               f"ORDER BY s.fetched_at DESC LIMIT 1) AS seasonal "
+               f"FROM metrics m JOIN keywords k ON k.id = m.keyword_id WHERE m.rowid > ?")
+        if geo:
+            sql += ' AND m.geo = ?'
+        sql += ' ORDER BY m.rowid LIMIT ?'
+
+        # Keyset pages, so no statement is open while update_scores writes
+        position = 0
+        while True:
+            params = [position] + ([geo] if geo else []) + [METRIC_PAGE_SIZE]
+            rows = self._connection.execute(sql, params).fetchall()
+            for row in rows:
+                data = dict(row)
+                position = data.pop('position')
+                seasonal = data.pop('seasonal')
+                data['seasonal_trend'] = json.loads(seasonal) if seasonal else None
+                yield data
+            if len(rows) < METRIC_PAGE_SIZE:
+                return
+
+    def update_scores(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Overwrite the scores of stored metrics rows (from metric_rows).
+
+        Args:
+            rows (Iterable[Dict[str, Any]]): Rows with keyword_id, geo and the new
+                opportunity_score, difficulty_score and recommendation
+
+        Returns:
+            int: Number of rows updated
+        """
+        cursor = self._connection.executemany(
+            'UPDATE metrics SET opportunity_score = ?, difficulty_score = ?, recommendation = ? '
+            'WHERE keyword_id = ? AND geo = ?',
+            ((row['opportunity_score'], row['difficulty_score'], row['recommendation'],
+              row['keyword_id'], row['geo']) for row in rows)
+        )
+        self._connection.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Row counts of the main tables."""
+        counts = {}
+        for table in ('keywords', 'runs', 'metrics', 'series'):
+            counts[table] = self._connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+        counts['used'] = self._connection.execute(
+            'SELECT COUNT(*) FROM keywords WHERE used = 1').fetchone()[0]
+        return counts
+
+
+class StoreResponses:
+    """
+    Stored series looked up by response cache key (see OFFLINE_SERIES).
+
+    The fallback of response_cache.OfflineCache, so --offline runs can still
+    use results of earlier runs whose cache entries were cleared or never written.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open an existing keyword store read-only in practice.
+
+        Args:
+            path (str): SQLite database path
+
+        Raises:
+            KeywordStoreError: If there is no store at `path`
+        """
+        if not os.path.exists(path):
+            raise KeywordStoreError(f"Keyword store not found: {path}")
+        self.store = KeywordStore(path)
+
+    def peek_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Values for response cache keys of the namespaces in OFFLINE_SERIES.
+
+        Args:
+            namespace (str): Cache namespace ('trends' or 'seasonal'; others find nothing)
+            keys (Iterable[str]): Cache keys ('geo|timeframe|keyword' or 'geo|keyword')
+
+        Returns:
+            Dict[str, Any]: Trend score or monthly curve by key, for keys found
+        """
+        name = OFFLINE_SERIES.get(namespace)
+        if name is None:
+            return {}
+
+        wanted: Dict[str, Dict[str, str]] = {}
+        for key in keys:
+            if namespace == 'trends':
+                geo, timeframe, keyword = key.split('|', 2)
+                if timeframe != STORED_TIMEFRAME:
+                    continue
+            else:
+                geo, keyword = key.split('|', 1)
+            wanted.setdefault(geo, {})[keyword.lower()] = key
+
+        found = {}
+        for geo, keys_by_keyword in wanted.items():
+            for keyword, points in self.store.latest_points(name, geo, keys_by_keyword).items():
+                key = keys_by_keyword.get(keyword.lower())
+                if key is not None:
+                    found[key] = points[-1] if namespace == 'trends' else points
+        return found
+
+    def close(self):
+        self.store.close()
+
+
+def store_run_results(path: str, options: Dict, keyword_data: List[Dict],
+                      enhanced_metrics: List, geo: str) -> Dict[str, int]:
+    """
+    Save one pipeline run's basic and enhanced results in the keyword store.
+
+    Args:
+        path (str): Keyword store path
+        options (Dict): Run options (stored with the run)
+        keyword_data (List[Dict]): Basic keyword rows
+        enhanced_metrics (List[KeywordMetrics]): Enhanced analysis results (may be empty)
+        geo (str): Region the run fetched metrics for
+
+    Returns:
+        Dict[str, int]: Run id and number of keyword rows stored
+    """
+    with KeywordStore(path) as store:
+        run_id = store.start_run('pipeline', options)
+        stored = store.record_rows(run_id, keyword_data, geo)
+        if enhanced_metrics:
+            store.record_rows(run_id, (vars(metric) for metric in enhanced_metrics), geo)
+        store.finish_run(run_id, stored)
+    return {'run_id': run_id, 'keywords': stored}
+
+
+def _print_rows(rows: List[Dict[str, Any]]):
+    """Print query results as an aligned table."""
+    if not rows:
+        print("No matching keywords.")
+        return
+    width = min(max(len(row['keyword']) for row in rows), 60)
+    print(f"{'#':>3}  {'keyword':<{width}}  {'geo':<5} {'opportunity':>11} {'difficulty':>10} "
+          f"{'trend':>6}  recommendation")
+    for i, row in enumerate(rows, 1):
+        def fmt(value, size):
+            return f"{value:>{size}.1f}" if value is not None else f"{'-':>{size}}"
+        print(f"{i:>3}  {row['keyword'][:width]:<{width}}  {row['geo']:<5} "
+              f"{fmt(row['opportunity_score'], 11)} {fmt(row['difficulty_score'], 10)} "
+              f"{fmt(row['trend_score'], 6)}  {row['recommendation'] or '-'}")
+
+
+def query_main(argv: List[str]) -> int:
+    """
+    CLI entry point for `python main.py query`.
+
+    Args:
+        argv (List[str]): Arguments after the subcommand name
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py query',
+        description='Query (and fill) the indexed keyword store',
+        epilog='Example: python main.py query --recommendation HIGH_PRIORITY '
+               '--phrase "real estate" --unused --limit 50'
+    )
+    parser.add_argument('--store', type=str, default=DEFAULT_STORE_PATH,
+                        help=f'Keyword store path (default: {DEFAULT_STORE_PATH})')
+    parser.add_argument('--phrase', '-p', type=str, help='Phrase the keyword must contain')
+    parser.add_argument('--recommendation', type=str,
+                        help='Recommendation, e.g. HIGH_PRIORITY or MEDIUM_PRIORITY')
+    parser.add_argument('--geo', type=str, help='Region the metrics were fetched for')
+    parser.add_argument('--unused', action='store_true',
+                        help='Skip keywords flagged as used (see --used-file)')
+    parser.add_argument('--used-file', type=str,
+                        help=f'Flag the keywords in this JSON list as used first '
+                             f'(e.g. {DEFAULT_USED_FILE})')
+    parser.add_argument('--min-opportunity', type=float, help='Minimum opportunity score')
+    parser.add_argument('--since-days', type=float, help='Only metrics fetched in the last N days')
+    parser.add_argument('--order', choices=list(ORDERINGS), default='opportunity',
+                        help='Sort order (default: opportunity)')
+    parser.add_argument('--limit', '-n', type=int, default=50, help='Maximum rows (default: 50)')
+    parser.add_argument('--import', dest='imports', nargs='+', metavar='FILE',
+                        help='Import existing CSV/JSONL outputs before querying')
+    parser.add_argument('--import-geo', type=str, default='US',
+                        help='Region of imported metrics (default: US)')
+    parser.add_argument('--output', '-o', type=str,
+                        help='Write results to a file; .csv files use the blog generator columns')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--stats', action='store_true', help='Print store row counts')
+    args = parser.parse_args(argv)
+
+    try:
+        with KeywordStore(args.store) as store:
+            for path in args.imports or []:
+                print(f"📥 Imported {store.import_file(path, geo=args.import_geo)} keywords from {path}")
+            if args.used_file:
+                print(f"🏷️  Flagged {store.mark_used_from_file(args.used_file)} used keywords")
+            if args.stats:
+                counts = store.stats()
+                print(f"🗄️  {args.store}: " + ', '.join(f"{count} {table}" for table, count in counts.items()))
+
+            started = time.perf_counter()
+            since = time.time() - args.since_days * 86400 if args.since_days is not None else None
+            rows = store.query(phrase=args.phrase, recommendation=args.recommendation, geo=args.geo,
+                               unused=args.unused, min_opportunity=args.min_opportunity,
+                               since=since, order=args.order, limit=args.limit)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+    except KeywordStoreError as e:
+        logger.error(str(e))
+        return 2
+
+    if args.output:
+        columns = BLOG_COLUMNS if infer_format(args.output) == 'csv' else QUERY_COLUMNS
+        try:
+            export_rows(rows, args.output, columns)
+        except ExportError as e:
+            logger.error(str(e))
+            return 2
+        print(f"💾 Wrote {len(rows)} keywords to {args.output}")
+    elif args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        _print_rows(rows)
+    print(f"🔎 {len(rows)} keywords in {elapsed_ms:.1f} ms", file=sys.stderr if args.json else sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(query_main(sys.argv[1:]))
@@ -13,31 +13,58 @@ Usage:
 import argparse
 import sys
 import os
-import pandas as pd
-import numpy as np
 import logging
-from typing import List, Dict, Set, Optional
+import signal
+from typing import Iterable, List, Dict, Set, Optional, TYPE_CHECKING
 from datetime import datetime
 import json
 
-# Import our custom modules
+# Import our custom modules (lightweight ones only; pandas, numpy, pytrends and
+# scikit-learn are imported on first use so --help and --dry-run start fast)
 from fetch_autocomplete import (
     fetch_google_autocomplete, 
     fetch_autocomplete_recursive, 
     fetch_autocomplete_variations,
-    AutocompleteError
+    AutocompleteError,
+    DEFAULT_FRONTIER_MEMORY
 )
-from fetch_trends import (
-    TrendsClient, 
-    get_keyword_trends,
-    TrendsError
+from keyword_filters import KeywordFilter, FilterError, load_phrase_file, estimate_pushdown_savings
+from keyword_export import export_rows, derive_output_path
+from seed_reader import SeedStream
+from rate_limiter import (
+    BudgetExhaustedError,
+    RequestBudget,
+    install_request_budget,
+    get_request_budget,
+    install_deadline,
+    deadline_reached
 )
-from fetch_trends_api import (
-    GoogleTrendsAPI,
-    KeywordAnalyzer,
-    KeywordMetrics,
-    create_enhanced_trends_client
+from request_planner import RequestPlanner, format_duration, parse_duration
+from response_cache import (
+    ResponseCache,
+    OfflineCache,
+    install_response_cache,
+    get_response_cache,
+    CacheError,
+    DEFAULT_CACHE_PATH,
+    DEFAULT_TTL
 )
+from run_metrics import get_metrics, instrumented_stage, stage
+from content_coverage import CoverageIndex, CoverageError, DEFAULT_INDEX_PATH, DEFAULT_COVERAGE_THRESHOLD
+from partial_results import (
+    PartialResults,
+    PartialResultsError,
+    install_partial_results,
+    get_partial_results,
+    journal_path,
+    DEFAULT_FLUSH_ROWS,
+    DEFAULT_FLUSH_SECONDS
+)
+
+if TYPE_CHECKING:
+    from fetch_trends import TrendsClient
+    from fetch_trends_api import KeywordMetrics
+    from keyword_clustering import KeywordCluster
 
 # Set up logging
 logging.basicConfig(
@@ -47,12 +74,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Output columns, in export order
+BASIC_COLUMNS = ['keyword', 'source', 'trend_score', 'error']
+CLUSTER_COLUMNS = ['cluster_id', 'cluster_centroid', 'cluster_size', 'propagated']
+REGIONAL_PREFIX = 'interest_'  # one column per --geos region, e.g. interest_FR
+DRY_RUN_SEEDS_SHOWN = 20
+ENHANCED_COLUMNS = [
+    'keyword', 'search_volume', 'trend_score', 'competition', 'competition_score',
+    'cpc_low', 'cpc_high', 'opportunity_score', 'difficulty_score', 'recommendation',
+    'seasonal_trend_avg', 'trend_slope', 'seasonality_strength', 'peak_month', 'volatility',
+    'propagated_from'
+]
+INTENT_COLUMNS = ['intent', 'intents']  # primary intent and all intents ('|'-joined)
+COVERAGE_COLUMNS = ['coverage_score', 'covered_by']  # best matching post (--coverage-posts)
+
 
 class KeywordTool:
     """Main keyword analysis orchestrator and CLI tool."""
     
     def __init__(self, language: str = 'en', country: str = 'US', geo: str = 'US', 
-                 google_api_key: Optional[str] = None):
+                 google_api_key: Optional[str] = None, offline: bool = False):
         """
         Initialize the keyword analyzer.
         
@@ -61,31 +102,106 @@ class KeywordTool:
             country (str): Country code for autocomplete  
             geo (str): Geographic region for trends
             google_api_key (Optional[str]): Google API key for enhanced features
+            offline (bool): Serve everything from the response cache; enhanced
+                analysis then runs on cached data without an API key
         """
         self.language = language
         self.country = country
         self.geo = geo
         self.google_api_key = google_api_key
-        self.trends_client = None
-        self.enhanced_trends_api = None
-        self.keyword_analyzer = None
+        self.offline = offline
         
-        # Initialize basic trends client
-        try:
-            self.trends_client = TrendsClient(language=f'{language}-{country}')
-        except Exception as e:
-            logger.warning(f"Could not initialize basic trends client: {e}")
+        # Clients are created on first use: building a TrendReq imports pandas
+        # and performs a network handshake, which pure paths never need
+        self._trends_client = None
+        self._trends_client_ready = False
+        self._enhanced_trends_api = None
+        self._keyword_analyzer = None
+        self._enhanced_ready = False
+        self._intent_tagger = None
+        self._intent_lexicons = None
+        # Coverage of existing posts (content_coverage.CoverageIndex), set per run by --coverage-posts
+        self.coverage_index = None
+    
+    @property
+    def intent_tagger(self):
+        """Search intent tagger for the tool's language, compiled on first access."""
+        if self._intent_tagger is None:
+            from intent_tagger import IntentTagger
+            self._intent_tagger = IntentTagger(self.language, self._intent_lexicons)
+        return self._intent_tagger
+    
+    def set_intent_lexicons(self, lexicons: Optional[Dict[str, Dict[str, List[str]]]]):
+        """
+        Use extra intent lexicon phrases (as from intent_tagger.load_lexicon_file).
         
-        # Initialize enhanced trends API if API key provided
-        if google_api_key:
+        Args:
+            lexicons (Optional[Dict]): Phrases per locale and intent, or None for the built-in lexicons
+        """
+        if lexicons == self._intent_lexicons:
+            return
+        self._intent_lexicons = lexicons
+        self._intent_tagger = None
+        if self._keyword_analyzer is not None:
+            self._keyword_analyzer.intent_tagger = self.intent_tagger
+    
+    def prioritizer(self, seeds: Iterable[str]):
+        """Keyword prioritizer for a run's seeds, sharing this tool's intent tagger."""
+        from keyword_priority import KeywordPrioritizer
+        return KeywordPrioritizer(seeds, language=self.language, intent_tagger=self.intent_tagger)
+    
+    @property
+    def trends_client(self) -> Optional['TrendsClient']:
+        """Basic trends client, initialized on first access (None if unavailable)."""
+        if not self._trends_client_ready:
+            self._trends_client_ready = True
             try:
-                self.enhanced_trends_api = create_enhanced_trends_client(google_api_key)
-                from fetch_trends_api import KeywordAnalyzer as EnhancedAnalyzer
-                self.keyword_analyzer = EnhancedAnalyzer(self.enhanced_trends_api)
-                logger.info("Enhanced Google Trends API initialized with paid access")
+                from fetch_trends import TrendsClient
+                self._trends_client = TrendsClient(language=f'{self.language}-{self.country}')
             except Exception as e:
-                logger.warning(f"Could not initialize enhanced trends API: {e}")
+                logger.warning(f"Could not initialize basic trends client: {e}")
+        return self._trends_client
+    
+    @trends_client.setter
+    def trends_client(self, client: Optional['TrendsClient']):
+        self._trends_client = client
+        self._trends_client_ready = True
+    
+    def _init_enhanced(self):
+        """Initialize the enhanced trends API on first access, if an API key was given."""
+        if self._enhanced_ready:
+            return
+        self._enhanced_ready = True
+        if not self.google_api_key and not self.offline:
+            return
+        try:
+            from fetch_trends_api import create_enhanced_trends_client
+            from fetch_trends_api import KeywordAnalyzer as EnhancedAnalyzer
+            # Paid API responses are never cached, so offline runs read the free client's entries
+            api_key = None if self.offline else self.google_api_key
+            self._enhanced_trends_api = create_enhanced_trends_client(api_key)
+            self._keyword_analyzer = EnhancedAnalyzer(self._enhanced_trends_api, language=self.language,
+                                                      intent_tagger=self.intent_tagger)
+            if self.offline:
+                logger.info("Enhanced analysis initialized on cached data (offline)")
+            else:
+                logger.info("Enhanced Google Trends API initialized with paid access")
+        except Exception as e:
+            logger.warning(f"Could not initialize enhanced trends API: {e}")
+    
+    @property
+    def enhanced_trends_api(self):
+        """Enhanced trends API client (None without an API key)."""
+        self._init_enhanced()
+        return self._enhanced_trends_api
+    
+    @property
+    def keyword_analyzer(self):
+        """Enhanced keyword analyzer (None without an API key)."""
+        self._init_enhanced()
+        return self._keyword_analyzer
     
+    @instrumented_stage('load_seeds')
     def load_seeds_from_file(self, file_path: str) -> List[str]:
         """
         Load seed keywords from a text file.
@@ -94,24 +210,13 @@ class KeywordTool:
             file_path (str): Path to the seeds file
         
         Returns:
-            List[str]: List of seed keywords
+            List[str]: List of seed keywords (normalized, duplicates removed)
         """
         try:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Seeds file not found: {file_path}")
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Split by lines and commas, clean up
-            seeds = []
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#'):  # Skip empty lines and comments
-                    # Split by commas and clean
-                    line_seeds = [seed.strip() for seed in line.split(',') if seed.strip()]
-                    seeds.extend(line_seeds)
-            
+            seeds = list(SeedStream(file_path))
             logger.info(f"Loaded {len(seeds)} seed keywords from {file_path}")
             return seeds
             
@@ -119,6 +224,18 @@ class KeywordTool:
             logger.error(f"Error loading seeds from file: {e}")
             raise
     
+    def stream_seeds_from_file(self, file_path: str) -> SeedStream:
+        """
+        Open a seeds file for lazy reading, for files too large to load at once.
+        
+        Args:
+            file_path (str): Path to the seeds file
+        
+        Returns:
+            SeedStream: Re-iterable stream of normalized, de-duplicated seeds
+        """
+        return SeedStream(file_path)
+    
     def parse_seeds_from_string(self, seeds_string: str) -> List[str]:
         """
         Parse seed keywords from a comma-separated string.
@@ -133,41 +250,66 @@ class KeywordTool:
         logger.info(f"Parsed {len(seeds)} seed keywords from input string")
         return seeds
     
-    def collect_autocomplete_keywords(self, seeds: List[str], recursive: bool = False, 
-                                    variations: bool = False, max_depth: int = 2) -> Set[str]:
+    @instrumented_stage('autocomplete')
+    def collect_autocomplete_keywords(self, seeds: Iterable[str], recursive: bool = False, 
+                                    variations: bool = False, max_depth: int = 2,
+                                    keyword_filter: Optional[KeywordFilter] = None,
+                                    max_keywords_per_seed: int = 5,
+                                    frontier_memory: int = DEFAULT_FRONTIER_MEMORY) -> Set[str]:
         """
         Collect keywords from Google Autocomplete.
         
         Args:
-            seeds (List[str]): Seed keywords
+            seeds (Iterable[str]): Seed keywords (a list or a lazily read SeedStream)
             recursive (bool): Whether to expand recursively
             variations (bool): Whether to try prefix/suffix variations
             max_depth (int): Maximum recursion depth
+            keyword_filter (Optional[KeywordFilter]): Filters pushed down into discovery
+            max_keywords_per_seed (int): Suggestions expanded per keyword in recursive mode
+            frontier_memory (int): Keywords a recursive crawl's queue and seen set hold in memory
+                before spilling to disk (the collected keywords are not bounded by it)
         
         Returns:
             Set[str]: Collected keywords
         """
         all_keywords = set()
         
-        logger.info(f"Collecting autocomplete keywords for {len(seeds)} seeds...")
+        if isinstance(seeds, list):
+            logger.info(f"Collecting autocomplete keywords for {len(seeds)} seeds...")
+        else:
+            logger.info("Collecting autocomplete keywords for streamed seeds...")
+        
+        if recursive and get_request_budget() is not None:
+            # Expand all seeds breadth-first together, so a limited budget reaches
+            # every seed before it is spent on deeper levels
+            all_keywords = fetch_autocomplete_recursive(
+                seeds, max_depth=max_depth, max_keywords_per_seed=max_keywords_per_seed,
+                language=self.language, country=self.country,
+                keyword_filter=keyword_filter, frontier_memory=frontier_memory
+            )
+            logger.info(f"Collected {len(all_keywords)} unique keywords from autocomplete")
+            return all_keywords
         
         for seed in seeds:
             try:
                 # Add the original seed
-                all_keywords.add(seed)
+                if keyword_filter is None or keyword_filter.matches(seed):
+                    all_keywords.add(seed)
                 
                 if recursive:
                     # Recursive expansion
                     recursive_keywords = fetch_autocomplete_recursive(
-                        [seed], max_depth=max_depth, max_keywords_per_seed=5,
-                        language=self.language, country=self.country
+                        [seed], max_depth=max_depth, max_keywords_per_seed=max_keywords_per_seed,
+                        language=self.language, country=self.country,
+                        keyword_filter=keyword_filter, frontier_memory=frontier_memory
                     )
                     all_keywords.update(recursive_keywords)
                     
                 elif variations:
                     # Try variations with prefixes/suffixes
                     variation_keywords = fetch_autocomplete_variations(
-                        seed, language=self.language, country=self.country
+                        seed, language=self.language, country=self.country,
+                        keyword_filter=keyword_filter
                     )
                     all_keywords.update(variation_keywords)
                     
@@ -176,21 +318,28 @@ class KeywordTool:
                     suggestions = fetch_google_autocomplete(
                         seed, language=self.language, country=self.country
                     )
+                    if keyword_filter is not None:
+                        suggestions = [k for k in suggestions if keyword_filter.matches(k)]
                     all_keywords.update(suggestions)
                     
             except AutocompleteError as e:
                 logger.warning(f"Failed to get autocomplete for '{seed}': {e}")
                 continue
+            except BudgetExhaustedError:
+                continue
         
         logger.info(f"Collected {len(all_keywords)} unique keywords from autocomplete")
         return all_keywords
     
-    def collect_trends_data(self, keywords: List[str]) -> Dict[str, Dict]:
+    @instrumented_stage('trends')
+    def collect_trends_data(self, keywords: List[str],
+                            geos: Optional[List[str]] = None) -> Dict[str, Dict]:
         """
         Collect trend data for keywords.
         
         Args:
             keywords (List[str]): Keywords to analyze
+            geos (Optional[List[str]]): Regions to compare; adds an interest_<GEO> field each
         
         Returns:
             Dict[str, Dict]: Keyword data with trend scores
@@ -210,11 +359,23 @@ class KeywordTool:
                 }
             return keyword_data
         
+        # Scores journaled by an earlier, interrupted run aren't fetched again
+        journal = get_partial_results()
+        on_batch = journal.add_trend_scores if journal is not None else None
+        resumed = {}
+        if journal is not None:
+            resumed = {keyword: journal.trend_scores[keyword] for keyword in keywords
+                       if keyword in journal.trend_scores}
+            if resumed:
+                logger.info(f"Resumed {len(resumed)} trend scores from {journal.path}")
+        
         try:
             # Get trend scores in batches
-            trend_scores = self.trends_client.get_batch_trends(
-                keywords, timeframe='today 1-m', geo=self.geo
-            )
+            trend_scores = dict(resumed)
+            trend_scores.update(self.trends_client.get_batch_trends(
+                [keyword for keyword in keywords if keyword not in resumed],
+                timeframe='today 1-m', geo=self.geo, on_batch=on_batch
+            ))
             
             # Also try to get related queries for seed keywords (first few)
             related_keywords = set()
@@ -238,7 +399,7 @@ class KeywordTool:
             if related_keywords:
                 logger.info(f"Found {len(related_keywords)} related keywords from trends")
                 related_trends = self.trends_client.get_batch_trends(
-                    list(related_keywords), timeframe='today 1-m', geo=self.geo
+                    list(related_keywords), timeframe='today 1-m', geo=self.geo, on_batch=on_batch
                 )
                 
                 for keyword in related_keywords:
@@ -250,6 +411,13 @@ class KeywordTool:
                             'error': None
                         }
             
+            # Per-region interest for every keyword from worldwide payloads
+            if geos:
+                regional = self.trends_client.get_regional_interest(list(keyword_data), geos)
+                for keyword, by_geo in regional.items():
+                    for geo, interest in by_geo.items():
+                        keyword_data[keyword][f"{REGIONAL_PREFIX}{geo}"] = interest
+            
         except Exception as e:
             logger.error(f"Error collecting trends data: {e}")
             # Fallback: set all to None
@@ -265,9 +433,11 @@ class KeywordTool:
         logger.info(f"Completed trends analysis for {len(keyword_data)} keywords")
         return keyword_data
     
+    @instrumented_stage('filter')
     def filter_keywords(self, keyword_data: Dict[str, Dict], 
                        min_length: int = None, max_length: int = None,
-                       phrase_match: str = None) -> Dict[str, Dict]:
+                       phrase_match: str = None,
+                       keyword_filter: Optional[KeywordFilter] = None) -> Dict[str, Dict]:
         """
         Filter keywords based on various criteria.
         
@@ -276,28 +446,22 @@ class KeywordTool:
             min_length (int): Minimum keyword length
             max_length (int): Maximum keyword length
             phrase_match (str): Required phrase in keyword
+            keyword_filter (Optional[KeywordFilter]): Compiled filter used instead of the criteria above
         
         Returns:
             Dict[str, Dict]: Filtered keyword data
         """
-        filtered_data = {}
-        
-        for keyword, data in keyword_data.items():
-            # Length filters
-            if min_length and len(keyword) < min_length:
-                continue
-            if max_length and len(keyword) > max_length:
-                continue
-            
-            # Phrase match filter
-            if phrase_match and phrase_match.lower() not in keyword.lower():
-                continue
-            
-            filtered_data[keyword] = data
+        if keyword_filter is None:
+            keyword_filter = KeywordFilter(min_length, max_length, phrase_match)
+        filtered_data = {
+            keyword: data for keyword, data in keyword_data.items()
+            if keyword_filter.matches(keyword)
+        }
         
         logger.info(f"Filtered to {len(filtered_data)} keywords from {len(keyword_data)}")
         return filtered_data
     
+    @instrumented_stage('dedup')
     def deduplicate_keywords(self, keyword_data: Dict[str, Dict]) -> Dict[str, Dict]:
         """
         Remove duplicate and very similar keywords.
@@ -328,52 +492,116 @@ class KeywordTool:
         logger.info(f"Deduplicated to {len(deduplicated)} keywords from {len(keyword_data)}")
         return deduplicated
     
-    def export_to_csv(self, keyword_data: Dict[str, Dict], output_file: str):
+    @instrumented_stage('near_dedup')
+    def collapse_near_duplicates(self, keywords: List[str], threshold: float = 0.8,
+                                 prefer: Optional[Iterable[str]] = None) -> List[str]:
         """
-        Export keyword data to CSV file.
+        Collapse near-duplicate keywords before any trends requests are spent.
+        
+        Args:
+            keywords (List[str]): Keywords discovered by autocomplete
+            threshold (float): Minimum token-set similarity to treat keywords as duplicates
+            prefer (Optional[Iterable[str]]): Keywords to keep as representatives (e.g. seeds,
+                read one at a time, so a SeedStream is not loaded into memory)
+        
+        Returns:
+            List[str]: One representative keyword per near-duplicate cluster
+        """
+        from keyword_dedup import NearDuplicateDetector
+        
+        detector = NearDuplicateDetector(threshold=threshold, language=self.language)
+        clusters = detector.cluster(keywords, prefer=prefer)
+        
+        logger.info(f"Collapsed {len(keywords)} keywords to {len(clusters)} near-duplicate representatives")
+        return list(clusters.keys())
+    
+    @instrumented_stage('clustering')
+    def cluster_keywords(self, keywords: List[str], avg_cluster_size: int = 5) -> List['KeywordCluster']:
+        """
+        Cluster near-synonymous keywords so only centroids need trends requests.
+        
+        Args:
+            keywords (List[str]): Keywords to cluster
+            avg_cluster_size (int): Target average cluster size
+        
+        Returns:
+            List[KeywordCluster]: Keyword clusters with their centroid keywords
+        """
+        from keyword_clustering import KeywordClusterer
+        
+        clusterer = KeywordClusterer(avg_cluster_size=avg_cluster_size)
+        clusters = clusterer.fit(keywords)
+        
+        logger.info(f"Grouped {len(keywords)} keywords into {len(clusters)} clusters")
+        return clusters
+    
+    def export_cluster_summary(self, keyword_data: Dict[str, Dict], 
+                               clusters: List['KeywordCluster'], output_file: str,
+                               output_format: Optional[str] = None):
+        """
+        Export per-cluster aggregates to a CSV, JSONL or Parquet file.
         
         Args:
             keyword_data (Dict): Keyword data dictionary
-            output_file (str): Output CSV file path
+            clusters (List[KeywordCluster]): Keyword clusters
+            output_file (str): Output file path
+            output_format (Optional[str]): 'csv', 'jsonl' or 'parquet' (inferred from extension if None)
+        """
+        from keyword_clustering import summarize_clusters
+        
+        rows = summarize_clusters(keyword_data, clusters)
+        columns = list(rows[0].keys()) if rows else ['cluster_id', 'centroid']
+        summary = export_rows(rows, output_file, columns, output_format=output_format)
+        logger.info(f"Exported {summary['rows']} cluster summaries to {output_file}")
+    
+    def export_to_csv(self, keyword_data: Dict[str, Dict], output_file: str,
+                      output_format: Optional[str] = None):
+        """
+        Export keyword data to a CSV, JSONL or Parquet file.
+        
+        Args:
+            keyword_data (Dict): Keyword data dictionary
+            output_file (str): Output file path
+            output_format (Optional[str]): 'csv', 'jsonl' or 'parquet' (inferred from extension if None)
         """
         try:
-            # Convert to DataFrame
-            df_data = []
-            for keyword, data in keyword_data.items():
-                df_data.append({
-                    'keyword': data['keyword'],
-                    'source': data['source'],
-                    'trend_score': data['trend_score'],
-                    'error': data.get('error', '')
-                })
-            
-            df = pd.DataFrame(df_data)
+            columns = BASIC_COLUMNS + _regional_columns(keyword_data)
+            if any('cluster_id' in data for data in keyword_data.values()):
+                columns += CLUSTER_COLUMNS
+            columns += INTENT_COLUMNS
             
-            # Sort by trend score (descending, None values last)
-            df['trend_score_sort'] = df['trend_score'].fillna(-1)
-            df = df.sort_values('trend_score_sort', ascending=False)
-            df = df.drop('trend_score_sort', axis=1)
+            # Intents are tagged for the whole keyword column in one pass
+            intents = self.intent_tagger.columns(list(keyword_data))
+            coverage = [{}] * len(keyword_data)
+            if self.coverage_index is not None:
+                columns += COVERAGE_COLUMNS
+                coverage = self.coverage_index.columns(list(keyword_data))
             
-            # Export to CSV
-            df.to_csv(output_file, index=False, encoding='utf-8')
-            logger.info(f"Exported {len(df)} keywords to {output_file}")
+            # Stream rows sorted by trend score (descending, None values last)
+            rows = (
+                {**{column: data.get(column) for column in columns}, **tags, **covered}
+                for data, tags, covered in zip(keyword_data.values(), intents, coverage)
+            )
+            summary = export_rows(rows, output_file, columns, output_format=output_format,
+                                  sort_by='trend_score')
+            logger.info(f"Exported {summary['rows']} keywords to {output_file}")
             
             # Print summary statistics
-            total_keywords = len(df)
-            with_trends = len(df[df['trend_score'].notna()])
-            avg_score = df['trend_score'].mean()
+            with_trends = summary['non_null'].get('trend_score', 0)
+            avg_score = summary['mean'].get('trend_score')
             
             print(f"\n📊 Export Summary:")
-            print(f"Total keywords: {total_keywords}")
+            print(f"Total keywords: {summary['rows']}")
             print(f"Keywords with trend data: {with_trends}")
-            print(f"Average trend score: {avg_score:.1f}" if pd.notna(avg_score) else "Average trend score: N/A")
+            print(f"Average trend score: {avg_score:.1f}" if avg_score is not None else "Average trend score: N/A")
             print(f"Output file: {output_file}")
             
         except Exception as e:
-            logger.error(f"Error exporting to CSV: {e}")
+            logger.error(f"Error exporting results: {e}")
             raise
     
-    def perform_advanced_analysis(self, keywords: List[str]) -> List[KeywordMetrics]:
+    @instrumented_stage('enhanced_analysis')
+    def perform_advanced_analysis(self, keywords: List[str]) -> List['KeywordMetrics']:
         """
         Perform advanced keyword analysis using enhanced API.
         
@@ -390,7 +618,8 @@ class KeywordTool:
         logger.info("🔬 Performing advanced keyword analysis...")
         return self.keyword_analyzer.analyze_keywords(keywords, self.geo)
     
-    def get_keyword_recommendations(self, keywords: List[str], top_n: int = 10) -> List[KeywordMetrics]:
+    @instrumented_stage('enhanced_analysis')
+    def get_keyword_recommendations(self, keywords: List[str], top_n: int = 10) -> List['KeywordMetrics']:
         """
         Get top keyword recommendations with full analysis.
         
@@ -406,9 +635,14 @@ class KeywordTool:
             return []
         
         logger.info(f"🎯 Getting top {top_n} keyword recommendations...")
-        return self.keyword_analyzer.get_top_recommendations(keywords, self.geo, top_n)
+        journal = get_partial_results()
+        if journal is None:
+            return self.keyword_analyzer.get_top_recommendations(keywords, self.geo, top_n)
+        return self.keyword_analyzer.get_top_recommendations(
+            keywords, self.geo, top_n, known=journal.known_metrics(), on_progress=journal.add_metrics
+        )
     
-    def generate_analysis_report(self, metrics: List[KeywordMetrics]) -> str:
+    def generate_analysis_report(self, metrics: List['KeywordMetrics']) -> str:
         """
         Generate comprehensive analysis report.
         
@@ -423,19 +657,32 @@ class KeywordTool:
         
         return self.keyword_analyzer.generate_analysis_report(metrics)
     
-    def export_enhanced_csv(self, metrics: List[KeywordMetrics], output_file: str):
+    def export_enhanced_csv(self, metrics: List['KeywordMetrics'], output_file: str,
+                            output_format: Optional[str] = None,
+                            keyword_data: Optional[Dict[str, Dict]] = None):
         """
-        Export enhanced analysis results to CSV.
+        Export enhanced analysis results to a CSV, JSONL or Parquet file.
         
         Args:
             metrics (List[KeywordMetrics]): Analysis results
-            output_file (str): Output CSV file path
+            output_file (str): Output file path
+            output_format (Optional[str]): 'csv', 'jsonl' or 'parquet' (inferred from extension if None)
+            keyword_data (Optional[Dict]): Keyword data dictionary; its interest_<GEO> fields
+                become columns as in the basic export
         """
         try:
-            # Convert to DataFrame with enhanced metrics
-            df_data = []
-            for metric in metrics:
-                df_data.append({
+            keyword_data = keyword_data or {}
+            regional = _regional_columns(keyword_data)
+            columns = ENHANCED_COLUMNS + regional + INTENT_COLUMNS
+            coverage = {}
+            if self.coverage_index is not None:
+                columns += COVERAGE_COLUMNS
+                keywords = [metric.keyword for metric in metrics]
+                coverage = dict(zip(keywords, self.coverage_index.columns(keywords)))
+            
+            # Stream rows sorted by opportunity score (descending, None values last)
+            rows = (
+                {
                     'keyword': metric.keyword,
                     'search_volume': metric.search_volume,
                     'trend_score': metric.trend_score,
@@ -446,42 +693,130 @@ class KeywordTool:
                     'opportunity_score': metric.opportunity_score,
                     'difficulty_score': metric.difficulty_score,
                     'recommendation': metric.recommendation,
-                    'seasonal_trend_avg': np.mean(metric.seasonal_trend) if metric.seasonal_trend else None
-                })
-            
-            df = pd.DataFrame(df_data)
-            
-            # Sort by opportunity score (descending)
-            df = df.sort_values('opportunity_score', ascending=False, na_last=True)
-            
-            # Export to CSV
-            df.to_csv(output_file, index=False, encoding='utf-8')
-            logger.info(f"Exported enhanced analysis for {len(df)} keywords to {output_file}")
+                    'seasonal_trend_avg': (sum(metric.seasonal_trend) / len(metric.seasonal_trend)
+                                           if metric.seasonal_trend else None),
+                    'trend_slope': metric.trend_slope,
+                    'seasonality_strength': metric.seasonality_strength,
+                    'peak_month': metric.peak_month,
+                    'volatility': metric.volatility,
+                    'propagated_from': metric.propagated_from,
+                    **{column: keyword_data.get(metric.keyword, {}).get(column) for column in regional},
+                    'intent': metric.intent,
+                    'intents': '|'.join(metric.intents) if metric.intents else None,
+                    **coverage.get(metric.keyword, {})
+                }
+                for metric in metrics
+            )
+            summary = export_rows(rows, output_file, columns,
+                                  output_format=output_format, sort_by='opportunity_score')
+            logger.info(f"Exported enhanced analysis for {summary['rows']} keywords to {output_file}")
             
             # Print enhanced summary
-            total_keywords = len(df)
-            high_priority = len(df[df['recommendation'] == 'HIGH_PRIORITY'])
-            medium_priority = len(df[df['recommendation'] == 'MEDIUM_PRIORITY'])
-            with_volume = len(df[df['search_volume'].notna()])
-            avg_opportunity = df['opportunity_score'].mean()
-            avg_difficulty = df['difficulty_score'].mean()
+            recommendations = summary['value_counts'].get('recommendation', {})
+            high_priority = recommendations.get('HIGH_PRIORITY', 0)
+            medium_priority = recommendations.get('MEDIUM_PRIORITY', 0)
+            with_volume = summary['non_null'].get('search_volume', 0)
+            avg_opportunity = summary['mean'].get('opportunity_score')
+            avg_difficulty = summary['mean'].get('difficulty_score')
             
             print(f"\n🎯 Enhanced Analysis Summary:")
-            print(f"Total keywords analyzed: {total_keywords}")
+            print(f"Total keywords analyzed: {summary['rows']}")
             print(f"High priority targets: {high_priority}")
             print(f"Medium priority targets: {medium_priority}")
             print(f"Keywords with search volume: {with_volume}")
-            print(f"Average opportunity score: {avg_opportunity:.1f}/100" if pd.notna(avg_opportunity) else "Average opportunity score: N/A")
-            print(f"Average difficulty score: {avg_difficulty:.1f}/100" if pd.notna(avg_difficulty) else "Average difficulty score: N/A")
+            print(f"Average opportunity score: {avg_opportunity:.1f}/100" if avg_opportunity is not None else "Average opportunity score: N/A")
+            print(f"Average difficulty score: {avg_difficulty:.1f}/100" if avg_difficulty is not None else "Average difficulty score: N/A")
             print(f"Enhanced output file: {output_file}")
             
         except Exception as e:
-            logger.error(f"Error exporting enhanced CSV: {e}")
+            logger.error(f"Error exporting enhanced results: {e}")
             raise
 
 
-def main():
-    """Main CLI entry point."""
+class PipelineError(Exception):
+    """Raised when a pipeline run cannot produce any results."""
+    pass
+
+
+def _regional_columns(keyword_data: Dict[str, Dict]) -> List[str]:
+    """interest_<GEO> columns present in the keyword data, in first-seen order."""
+    return list(dict.fromkeys(
+        field for data in keyword_data.values() for field in data
+        if field.startswith(REGIONAL_PREFIX)
+    ))
+
+
+def parse_geos(geos: Optional[str]) -> List[str]:
+    """
+    Parse a comma-separated region list.
+    
+    Args:
+        geos (Optional[str]): Region codes (e.g. "us, fr, US-CA")
+    
+    Returns:
+        List[str]: Upper-cased, de-duplicated codes in input order
+    """
+    if not geos:
+        return []
+    return list(dict.fromkeys(geo.strip().upper() for geo in geos.split(',') if geo.strip()))
+
+
+def open_offline_cache(cache_path: str, store_path: Optional[str] = None) -> OfflineCache:
+    """
+    Open the local sources of an --offline run.
+    
+    Args:
+        cache_path (str): Response cache of earlier runs (not created if missing)
+        store_path (Optional[str]): Keyword store whose series fill cache misses
+    
+    Returns:
+        OfflineCache: Cache to install for the run
+    
+    Raises:
+        PipelineError: If neither source exists
+    """
+    from keyword_store import StoreResponses, KeywordStoreError
+    
+    have_cache = os.path.exists(cache_path)
+    have_store = bool(store_path) and os.path.exists(store_path)
+    if not have_cache and not have_store:
+        raise PipelineError(f"--offline needs a response cache from earlier runs; none at {cache_path}")
+    try:
+        backing = ResponseCache(cache_path, ttl=None) if have_cache else None
+        fallback = StoreResponses(store_path) if have_store else None
+        return OfflineCache(backing, fallback=fallback)
+    except (CacheError, KeywordStoreError) as e:
+        raise PipelineError(str(e))
+
+
+def report_offline_misses(cache: OfflineCache, examples: int = 3) -> Dict[str, int]:
+    """
+    Print what an --offline run had no local data for.
+    
+    Args:
+        cache (OfflineCache): The run's cache
+        examples (int): Missed keys shown per namespace
+    
+    Returns:
+        Dict[str, int]: Distinct keys missed per namespace
+    """
+    counts = cache.miss_counts()
+    if not counts:
+        print("📴 Offline: every lookup was served locally")
+        return counts
+    
+    print(f"📴 Offline cache misses ({sum(counts.values())} keys had no local data; "
+          f"run once online with --cache to fill them):")
+    for namespace, count in counts.items():
+        shown = sorted(cache.missed[namespace])[:examples]
+        more = f", ... +{count - len(shown)}" if count > len(shown) else ""
+        print(f"   {namespace}: {count} ({', '.join(shown)}{more})")
+    logger.debug(f"Offline misses: { {ns: sorted(keys) for ns, keys in cache.missed.items()} }")
+    return counts
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for a single keyword analysis run."""
     parser = argparse.ArgumentParser(
         description='Keyword Analysis Tool for Startups',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -498,6 +833,16 @@ Examples:
   # Advanced options
   python main.py --seeds "blockchain" --variations --output my_keywords.csv
   python main.py --file seeds.txt --language fr --country FR --geo FR
+  
+  # Refresh several keyword projects in one process pool
+  python main.py batch jobs.json --workers 3
+  
+  # Local keyword service with warm clients and caches
+  python main.py serve --port 8765
+  
+  # Keep results in an indexed store and query it
+  python main.py --file seeds.txt --analyze --google-api-key YOUR_API_KEY --store keywords.sqlite
+  python main.py query --recommendation HIGH_PRIORITY --phrase "real estate" --unused
         """
     )
     
@@ -532,7 +877,12 @@ Examples:
         '--output', '-o',
         type=str,
         default='keyword_analysis.csv',
-        help='Output CSV file path (default: keyword_analysis.csv)'
+        help='Output file path; .csv, .jsonl or .parquet (default: keyword_analysis.csv)'
+    )
+    parser.add_argument(
+        '--output-format',
+        choices=['csv', 'jsonl', 'parquet'],
+        help='Output format (default: inferred from the --output extension)'
     )
     parser.add_argument(
         '--language',
@@ -552,12 +902,57 @@ Examples:
         default='US',
         help='Geographic region for trends (default: US)'
     )
+    parser.add_argument(
+        '--geos',
+        type=str,
+        help='Comma-separated regions to compare (e.g. "US, FR, MA" or "US-CA"); '
+             'adds an interest_<GEO> column each from one worldwide request per batch'
+    )
     parser.add_argument(
         '--max-depth',
         type=int,
         default=2,
         help='Maximum recursion depth for recursive expansion (default: 2)'
     )
+    parser.add_argument(
+        '--max-keywords-per-seed',
+        type=int,
+        default=5,
+        help='Suggestions expanded per keyword in recursive expansion (default: 5)'
+    )
+    parser.add_argument(
+        '--frontier-memory',
+        type=int,
+        default=DEFAULT_FRONTIER_MEMORY,
+        help='Frontier-only limit: keywords a recursive crawl keeps in memory before its queue '
+             'and seen set spill to disk. Keywords that pass the filters are still held in '
+             'memory; bound them with --max-depth, --max-length or --phrases '
+             f'(default: {DEFAULT_FRONTIER_MEMORY})'
+    )
+    parser.add_argument(
+        '--max-requests',
+        type=int,
+        help='Hard limit on network requests; expansion is sized to fit (cached responses are free)'
+    )
+    parser.add_argument(
+        '--deadline',
+        type=parse_duration,
+        help='Stop sending requests after this long (e.g. 30m, 1h30m) and export the partial '
+             'result; keywords are fetched highest priority first'
+    )
+    parser.add_argument(
+        '--flush-every',
+        type=int,
+        default=DEFAULT_FLUSH_ROWS,
+        help='Append fetched results to <output>.partial.jsonl every N keywords, so an interrupted '
+             f'run resumes where it stopped (default: {DEFAULT_FLUSH_ROWS})'
+    )
+    parser.add_argument(
+        '--flush-seconds',
+        type=float,
+        default=DEFAULT_FLUSH_SECONDS,
+        help=f'...or at least every T seconds (default: {DEFAULT_FLUSH_SECONDS:g})'
+    )
     
     # Filtering options
     parser.add_argument(
@@ -580,6 +975,86 @@ Examples:
         action='store_true',
         help='Disable keyword deduplication'
     )
+    parser.add_argument(
+        '--near-dedup',
+        action='store_true',
+        help='Collapse near-duplicate keywords (MinHash/LSH) before fetching trends'
+    )
+    parser.add_argument(
+        '--cluster',
+        action='store_true',
+        help='Cluster keywords and fetch trends only for each cluster centroid'
+    )
+    parser.add_argument(
+        '--cluster-size',
+        type=int,
+        default=5,
+        help='Target average keywords per cluster for --cluster (default: 5)'
+    )
+    parser.add_argument(
+        '--phrases',
+        type=str,
+        help='File of include phrases and !excluded phrases (e.g. competitor brands), '
+             'matched as whole words in one pass; .txt or .json'
+    )
+    parser.add_argument(
+        '--match-mode',
+        choices=['any', 'all'],
+        help='Keep keywords containing any (default) or all of the --phrases include phrases'
+    )
+    parser.add_argument(
+        '--exclude-used',
+        action='append',
+        metavar='PATH',
+        help='Drop keywords matching a used keywords/titles list during discovery '
+             '(JSON list or one per line; repeatable, e.g. ../data/used-keywords.json)'
+    )
+    parser.add_argument(
+        '--exclude-threshold',
+        type=float,
+        default=0.8,
+        help='Token-set similarity (0-1] counted as a match for --exclude-used; '
+             '1.0 only matches reordered or pluralized phrases (default: 0.8)'
+    )
+    parser.add_argument(
+        '--coverage-posts',
+        type=str,
+        metavar='DIR',
+        help='Score keywords against the titles, h1-h3 headings and meta keywords of DIR/*.html '
+             '(e.g. ../posts); adds coverage_score and covered_by columns'
+    )
+    parser.add_argument(
+        '--coverage-index',
+        type=str,
+        default=DEFAULT_INDEX_PATH,
+        help=f'SQLite file of the coverage index; only changed posts are re-indexed '
+             f'(default: {DEFAULT_INDEX_PATH})'
+    )
+    parser.add_argument(
+        '--skip-covered',
+        action='store_true',
+        help='Drop keywords existing posts already cover before any trends request'
+    )
+    parser.add_argument(
+        '--coverage-threshold',
+        type=float,
+        default=DEFAULT_COVERAGE_THRESHOLD,
+        help=f'Coverage score (0-1) counted as covered by --skip-covered '
+             f'(default: {DEFAULT_COVERAGE_THRESHOLD})'
+    )
+    parser.add_argument(
+        '--intent-lexicon',
+        type=str,
+        metavar='PATH',
+        help='JSON file of extra intent phrases (e.g. brand names as navigational), '
+             'keyed by intent or by locale then intent'
+    )
+    parser.add_argument(
+        '--dedup-threshold',
+        type=float,
+        default=0.8,
+        help='Similarity threshold (0-1] for --near-dedup (default: 0.8)'
+    )
     
     # Enhanced analysis options
     parser.add_argument(
@@ -615,131 +1090,559 @@ Examples:
         action='store_true',
         help='Show what would be done without making API calls'
     )
+    parser.add_argument(
+        '--cache',
+        type=str,
+        help='SQLite response cache shared between runs (e.g. .keyword_cache.sqlite)'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Make no requests: serve autocomplete, trends and analysis from --cache '
+             f'(default: {DEFAULT_CACHE_PATH}, any age) and --store, and report cache misses'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=DEFAULT_TTL,
+        help=f'Seconds before cached responses are refetched (default: {DEFAULT_TTL})'
+    )
+    parser.add_argument(
+        '--metrics-file',
+        type=str,
+        help='Write a JSON run summary (stage timings, requests, sleeps, cache hits)'
+    )
+    parser.add_argument(
+        '--prometheus-file',
+        type=str,
+        help='Write run metrics as a Prometheus textfile (node exporter textfile collector)'
+    )
+    parser.add_argument(
+        '--baseline',
+        type=str,
+        help='Previous output to diff against; keywords it already scored are carried '
+             'forward instead of re-fetched, and a _diff report is written'
+    )
+    parser.add_argument(
+        '--diff-threshold',
+        type=float,
+        default=5.0,
+        help='Score change reported as moved in the --baseline diff (default: 5.0)'
+    )
+    parser.add_argument(
+        '--store',
+        type=str,
+        help='Also save results in an indexed keyword store (e.g. keywords.sqlite; see `query`)'
+    )
     
-    args = parser.parse_args()
+    return parser
+
+
+def default_args(**overrides) -> argparse.Namespace:
+    """
+    Build run options from the CLI defaults plus keyword overrides.
     
-    # Set logging level
-    if args.verbose:
-        logging.getLogger().setLevel(logging.DEBUG)
+    Args:
+        **overrides: Option values keyed by destination name (e.g. phrase_match='crm')
     
-    try:
-        # Initialize analyzer
+    Returns:
+        argparse.Namespace: Options accepted by run_pipeline
+    """
+    args = build_parser().parse_args(['--seeds', ''])
+    args.seeds = None
+    
+    for key, value in overrides.items():
+        dest = key.replace('-', '_')
+        if not hasattr(args, dest):
+            raise ValueError(f"Unknown option: {key}")
+        setattr(args, dest, value)
+    
+    return args
+
+
+def build_planner(args: argparse.Namespace, seeds: List[str],
+                  keyword_filter: KeywordFilter) -> RequestPlanner:
+    """Request planner for a run's options, using the installed cache and rate limiter."""
+    return RequestPlanner(
+        seeds,
+        recursive=args.recursive,
+        variations=args.variations,
+        max_depth=args.max_depth,
+        fanout=args.max_keywords_per_seed,
+        keyword_filter=keyword_filter if keyword_filter.is_active else None,
+        language=args.language,
+        country=args.country,
+        geo=args.geo,
+        analyze=bool(args.analyze and (args.google_api_key or args.offline)),
+        cluster_size=args.cluster_size if args.cluster else None,
+        geos=parse_geos(args.geos)
+    )
+
+
+def run_pipeline(args: argparse.Namespace, analyzer: Optional[KeywordTool] = None) -> Dict:
+    """
+    Run keyword discovery, trends, analysis and export for one set of options.
+    
+    Args:
+        args (argparse.Namespace): Options, as produced by build_parser() or default_args()
+        analyzer (Optional[KeywordTool]): Reuse an existing tool (and its warm clients)
+    
+    Returns:
+        Dict: Run summary (seed and keyword counts, output files)
+    
+    Raises:
+        PipelineError: If no seeds or no keywords are available
+    """
+    summary = {'seeds': 0, 'keywords': 0, 'output': None, 'enhanced_output': None}
+    
+    # Initialize analyzer
+    if analyzer is None:
         analyzer = KeywordTool(
             language=args.language,
             country=args.country,
             geo=args.geo,
-            google_api_key=args.google_api_key
+            google_api_key=args.google_api_key,
+            offline=args.offline
         )
-        
-        # Load seed keywords
-        if args.seeds:
-            seeds = analyzer.parse_seeds_from_string(args.seeds)
-        else:
-            seeds = analyzer.load_seeds_from_file(args.file)
-        
+    
+    # Load seed keywords; files are streamed so autocomplete starts on the first line
+    if args.seeds:
+        seeds = analyzer.parse_seeds_from_string(args.seeds)
         if not seeds:
-            logger.error("No seed keywords provided")
-            sys.exit(1)
-        
+            raise PipelineError("No seed keywords provided")
+        summary['seeds'] = len(seeds)
         print(f"🌱 Starting analysis with {len(seeds)} seed keywords: {seeds}")
-        
-        if args.dry_run:
-            print("🔍 DRY RUN - Would analyze these keywords:")
-            for i, seed in enumerate(seeds, 1):
-                print(f"  {i}. {seed}")
-            print(f"\nConfiguration:")
-            print(f"  Language: {args.language}")
-            print(f"  Country: {args.country}")
-            print(f"  Geo: {args.geo}")
-            print(f"  Recursive: {args.recursive}")
-            print(f"  Variations: {args.variations}")
-            print(f"  Output: {args.output}")
-            return
-        
-        # Collect autocomplete keywords
-        print("🔍 Collecting keywords from Google Autocomplete...")
-        keywords = analyzer.collect_autocomplete_keywords(
-            seeds,
-            recursive=args.recursive,
-            variations=args.variations,
-            max_depth=args.max_depth
+    else:
+        seeds = analyzer.stream_seeds_from_file(args.file)
+        print(f"🌱 Starting analysis with seed keywords streamed from {args.file}")
+    
+    # Planning needs every seed up front, so only dry runs and budgeted runs read them all
+    if args.dry_run or args.max_requests:
+        seeds = list(seeds)
+        if not seeds:
+            raise PipelineError("No seed keywords provided")
+        summary['seeds'] = len(seeds)
+    
+    # Keywords and titles already published on are dropped during discovery
+    used_index = None
+    if args.exclude_used:
+        from used_keywords import build_used_index, UsedKeywordsError
+        try:
+            used_index = build_used_index(args.exclude_used, threshold=args.exclude_threshold,
+                                          language=args.language)
+        except UsedKeywordsError as e:
+            raise PipelineError(str(e))
+        print(f"🚫 Excluding {len(used_index)} used keywords/titles from {', '.join(args.exclude_used)}")
+    
+    # Index what existing posts already cover (only changed posts are parsed again)
+    analyzer.coverage_index = None
+    if args.skip_covered and not args.coverage_posts:
+        raise PipelineError("--skip-covered needs --coverage-posts")
+    if args.coverage_posts:
+        try:
+            coverage_index = CoverageIndex(args.coverage_posts, args.coverage_index, language=args.language)
+            refreshed = coverage_index.refresh()
+        except CoverageError as e:
+            raise PipelineError(str(e))
+        analyzer.coverage_index = coverage_index
+        print(f"📚 Coverage index of {len(coverage_index)} posts in {args.coverage_posts} "
+              f"({refreshed['indexed']} re-indexed, {refreshed['removed']} removed)")
+    
+    # Compile filters once so they can be pushed down into discovery
+    try:
+        phrases = load_phrase_file(args.phrases) if args.phrases else {}
+        keyword_filter = KeywordFilter(
+            min_length=args.min_length,
+            max_length=args.max_length,
+            phrase_match=args.phrase_match,
+            exclude=used_index,
+            include_phrases=phrases.get('include'),
+            exclude_phrases=phrases.get('exclude'),
+            match_mode=args.match_mode or phrases.get('mode') or 'any'
         )
+    except FilterError as e:
+        raise PipelineError(str(e))
+    
+    # Extra intent phrases extend the built-in lexicons used for scoring and export
+    if args.intent_lexicon:
+        from intent_tagger import load_lexicon_file, IntentError
+        try:
+            analyzer.set_intent_lexicons(load_lexicon_file(args.intent_lexicon))
+        except IntentError as e:
+            raise PipelineError(str(e))
+    else:
+        analyzer.set_intent_lexicons(None)
+    
+    # Load the previous output up front so a bad path fails before any request
+    baseline = None
+    if args.baseline:
+        from keyword_diff import Baseline, BaselineError
+        try:
+            baseline = Baseline.load(args.baseline)
+        except BaselineError as e:
+            raise PipelineError(str(e))
+    
+    if args.dry_run:
+        print("🔍 DRY RUN - Would analyze these keywords:")
+        for i, seed in enumerate(seeds[:DRY_RUN_SEEDS_SHOWN], 1):
+            print(f"  {i}. {seed}")
+        if len(seeds) > DRY_RUN_SEEDS_SHOWN:
+            print(f"  ... and {len(seeds) - DRY_RUN_SEEDS_SHOWN} more")
+        print(f"\nConfiguration:")
+        print(f"  Language: {args.language}")
+        print(f"  Country: {args.country}")
+        print(f"  Geo: {args.geo}")
+        if args.geos:
+            print(f"  Compared regions: {', '.join(parse_geos(args.geos))}")
+        print(f"  Recursive: {args.recursive}")
+        print(f"  Variations: {args.variations}")
+        print(f"  Output: {args.output}")
+        if baseline is not None:
+            print(f"  Baseline: {args.baseline} ({len(baseline)} keywords; scored ones are "
+                  f"carried forward, so the plan below is an upper bound)")
         
-        if not keywords:
-            logger.error("No keywords collected from autocomplete")
-            sys.exit(1)
-        
-        print(f"✅ Collected {len(keywords)} unique keywords")
-        
-        # Collect trends data
-        print("📈 Analyzing trends data...")
-        keyword_data = analyzer.collect_trends_data(list(keywords))
-        
-        # Apply filters
-        if args.min_length or args.max_length or args.phrase_match:
-            print("🔧 Applying filters...")
-            keyword_data = analyzer.filter_keywords(
-                keyword_data,
-                min_length=args.min_length,
-                max_length=args.max_length,
-                phrase_match=args.phrase_match
+        if keyword_filter.is_active:
+            estimate = estimate_pushdown_savings(
+                seeds, keyword_filter,
+                recursive=args.recursive,
+                variations=args.variations,
+                max_depth=args.max_depth,
+                fanout=args.max_keywords_per_seed
             )
+            print(f"\nFilter pushdown ({keyword_filter.describe()}) estimate:")
+            print(f"  Autocomplete requests: {estimate['autocomplete_requests_before']} -> "
+                  f"{estimate['autocomplete_requests_after']}")
+            print(f"  Trends requests: {estimate['trends_requests_before']} -> "
+                  f"{estimate['trends_requests_after']}")
+            print(f"  Estimated requests saved: {estimate['requests_saved']}")
         
-        # Deduplicate
-        if not args.no_dedup:
-            print("🧹 Removing duplicates...")
-            keyword_data = analyzer.deduplicate_keywords(keyword_data)
-        
-        # Perform enhanced analysis if requested
-        if args.analyze and args.google_api_key:
-            print("🔬 Performing enhanced analysis...")
+        planner = build_planner(args, seeds, keyword_filter)
+        plan = planner.fit_budget(args.max_requests) if args.max_requests else planner.plan()
+        print(f"\nRequest plan (cached responses are free):")
+        for line in plan.describe():
+            print(line)
+        if args.offline:
+            print("📴 Offline: no requests will be sent; the ones above are cache misses without data")
+        elif args.deadline and plan.wall_seconds > args.deadline:
+            print(f"⏱️  The plan needs ~{format_duration(plan.wall_seconds)} but --deadline allows "
+                  f"{format_duration(args.deadline)}; the lowest priority keywords will stay unscored")
+        summary['plan'] = plan.to_dict()
+        return summary
+    
+    # Enforce the request budget and deadline (or clear ones left by a previous run in this process)
+    install_request_budget(None)
+    install_deadline(args.deadline)
+    if args.deadline:
+        print(f"⏱️  Deadline: requests stop after {format_duration(args.deadline)}")
+    if args.offline:
+        install_request_budget(RequestBudget(0))
+        print("📴 Offline: serving every response from the local cache")
+    elif args.max_requests:
+        plan = build_planner(args, seeds, keyword_filter).fit_budget(args.max_requests)
+        install_request_budget(plan.make_budget())
+        print(f"💰 Request budget: {args.max_requests} requests, autocomplete up to "
+              f"{plan.allocations['autocomplete']}; ~{plan.keywords} keywords in "
+              f"~{format_duration(plan.wall_seconds)}")
+    
+    # Journal fetched results as they arrive, resuming from the journal of an interrupted run
+    try:
+        journal = PartialResults(journal_path(args.output), {'geo': args.geo},
+                                 flush_rows=args.flush_every, flush_seconds=args.flush_seconds)
+    except PartialResultsError as e:
+        raise PipelineError(str(e))
+    install_partial_results(journal)
+    if journal.resumed:
+        print(f"♻️  Resuming from {journal.path}: {len(journal.trend_scores)} trend scores and "
+              f"{len(journal.metrics)} analyzed keywords already fetched")
+    
+    # Collect autocomplete keywords
+    print("🔍 Collecting keywords from Google Autocomplete...")
+    keywords = analyzer.collect_autocomplete_keywords(
+        seeds,
+        recursive=args.recursive,
+        variations=args.variations,
+        max_depth=args.max_depth,
+        keyword_filter=keyword_filter if keyword_filter.is_active else None,
+        max_keywords_per_seed=args.max_keywords_per_seed,
+        frontier_memory=args.frontier_memory
+    )
+    
+    if isinstance(seeds, SeedStream):
+        summary['seeds'] = seeds.count
+        if not seeds.count:
+            raise PipelineError("No seed keywords provided")
+        print(f"🌱 Read {seeds.count} seed keywords ({seeds.duplicates} duplicates skipped)")
+    
+    if not keywords:
+        raise PipelineError("No keywords collected from autocomplete")
+    
+    print(f"✅ Collected {len(keywords)} unique keywords")
+    
+    # Collapse near-duplicates before spending trends requests
+    if args.near_dedup:
+        print("🧬 Collapsing near-duplicate keywords...")
+        keywords = analyzer.collapse_near_duplicates(
+            list(keywords), threshold=args.dedup_threshold, prefer=seeds
+        )
+        print(f"✅ Kept {len(keywords)} representative keywords")
+    
+    # Hash-join against the previous output; only new keywords go to trends and analysis
+    carried = []
+    if baseline is not None:
+        keywords, carried = baseline.split(keywords)
+        print(f"🔁 {len(carried)} keywords carried forward from {args.baseline}, {len(keywords)} new")
+    
+    # Topics existing posts already cover don't need trends requests
+    if args.skip_covered and analyzer.coverage_index is not None:
+        uncovered = [keyword for keyword in keywords
+                     if not analyzer.coverage_index.is_covered(keyword, args.coverage_threshold)]
+        summary['covered'] = len(keywords) - len(uncovered)
+        print(f"📚 Skipped {summary['covered']} keywords already covered by posts "
+              f"(coverage >= {args.coverage_threshold:g}), {len(uncovered)} left")
+        keywords = uncovered
+    
+    # Fetch the most promising keywords first, so a rate limited, killed or
+    # --deadline run has spent its requests where they matter most
+    prioritizer = analyzer.prioritizer(seeds)
+    priorities = prioritizer.scores(keywords)
+    trend_keywords = prioritizer.order(keywords, priorities)
+    
+    # Cluster keywords so trends are fetched only for centroids
+    clusters = None
+    if args.cluster and trend_keywords:
+        print("🧩 Clustering keywords...")
+        # Deterministic input order keeps cached runs reproducible
+        clusters = analyzer.cluster_keywords(sorted(keywords), avg_cluster_size=args.cluster_size)
+        # A cluster is worth as much as its best member
+        for cluster in clusters:
+            priorities[cluster.centroid] = max(priorities.get(member, 0.0)
+                                               for member in cluster.members + [cluster.centroid])
+        trend_keywords = prioritizer.order([cluster.centroid for cluster in clusters], priorities)
+        print(f"✅ {len(clusters)} clusters, querying trends for their centroids only")
+    
+    # Collect trends data
+    keyword_data = {}
+    if trend_keywords:
+        print("📈 Analyzing trends data...")
+        keyword_data = analyzer.collect_trends_data(trend_keywords, geos=parse_geos(args.geos))
+    else:
+        print("📈 No new keywords, skipping trends")
+    if clusters:
+        from keyword_clustering import propagate_keyword_data
+        keyword_data = propagate_keyword_data(keyword_data, clusters)
+    if baseline is not None:
+        carried_data = baseline.carried_data(carried)
+        carried_data.update(baseline.related_data(list(keyword_data) + carried))
+        for keyword, data in carried_data.items():
+            keyword_data.setdefault(keyword, data)
+    
+    # Re-apply filters to related queries added by the trends stage
+    if keyword_filter.is_active:
+        print("🔧 Applying filters...")
+        keyword_data = analyzer.filter_keywords(keyword_data, keyword_filter=keyword_filter)
+        if used_index is not None:
+            print(f"🚫 Dropped {used_index.excluded} already used keywords")
+    
+    # Deduplicate
+    if not args.no_dedup:
+        print("🧹 Removing duplicates...")
+        keyword_data = analyzer.deduplicate_keywords(keyword_data)
+    
+    # Perform enhanced analysis if requested
+    enhanced_metrics = []
+    if args.analyze and (args.google_api_key or args.offline):
+        print("🔬 Performing enhanced analysis...")
+        if trend_keywords:
             enhanced_metrics = analyzer.get_keyword_recommendations(
-                list(keywords), 
+                trend_keywords, 
                 top_n=args.top_recommendations
             )
+        if clusters and enhanced_metrics:
+            from keyword_clustering import propagate_metrics
+            enhanced_metrics = propagate_metrics(enhanced_metrics, clusters,
+                                                 analyzer.keyword_analyzer)
+        if baseline is not None:
+            # Scoring may have changed since the baseline run, so carried keywords
+            # are re-scored from their stored volume and competition before diffing
+            carried_metrics = baseline.carried_metrics(carried)
+            if analyzer.keyword_analyzer is not None:
+                carried_metrics = analyzer.keyword_analyzer.rescore(carried_metrics)
+            enhanced_metrics += carried_metrics
+        
+        if enhanced_metrics:
+            # Export enhanced results
+            enhanced_output = derive_output_path(args.output, '_enhanced')
+            with stage('export') as timer:
+                analyzer.export_enhanced_csv(enhanced_metrics, enhanced_output,
+                                             output_format=args.output_format,
+                                             keyword_data=keyword_data)
+                timer.items = len(enhanced_metrics)
             
-            if enhanced_metrics:
-                # Export enhanced results
-                enhanced_output = args.output.replace('.csv', '_enhanced.csv')
-                analyzer.export_enhanced_csv(enhanced_metrics, enhanced_output)
+            # Generate and display report
+            if args.generate_report:
+                print("\n" + "="*60)
+                report = analyzer.generate_analysis_report(enhanced_metrics)
+                print(report)
+                print("="*60)
                 
-                # Generate and display report
-                if args.generate_report:
-                    print("\n" + "="*60)
-                    report = analyzer.generate_analysis_report(enhanced_metrics)
-                    print(report)
-                    print("="*60)
-                    
-                    # Save report to file
-                    report_file = args.output.replace('.csv', '_report.txt')
-                    with open(report_file, 'w', encoding='utf-8') as f:
-                        f.write(report)
-                    print(f"\n📄 Analysis report saved to: {report_file}")
-                
-                print(f"🎯 Enhanced analysis complete! Check {enhanced_output} for detailed results.")
-            else:
-                print("⚠️  Enhanced analysis failed. Check API key and connection.")
-        
-        elif args.analyze and not args.google_api_key:
-            print("⚠️  Enhanced analysis requires --google-api-key parameter")
-            print("💡 For now, exporting basic results...")
-        
-        # Export basic results
-        export_basic = True
-        if args.analyze and args.google_api_key:
-            try:
-                if 'enhanced_metrics' in locals() and enhanced_metrics:
-                    export_basic = False
-            except:
-                pass
-        
-        if export_basic:
-            print("💾 Exporting basic results...")
-            analyzer.export_to_csv(keyword_data, args.output)
-        
-        print("🎉 Analysis complete!")
+                # Save report to file
+                report_file = os.path.splitext(args.output)[0] + '_report.txt'
+                with open(report_file, 'w', encoding='utf-8') as f:
+                    f.write(report)
+                print(f"\n📄 Analysis report saved to: {report_file}")
+            
+            summary['enhanced_output'] = enhanced_output
+            print(f"🎯 Enhanced analysis complete! Check {enhanced_output} for detailed results.")
+        else:
+            print("⚠️  Enhanced analysis failed. Check API key and connection.")
+    
+    elif args.analyze and not args.google_api_key:
+        print("⚠️  Enhanced analysis requires --google-api-key parameter")
+        print("💡 For now, exporting basic results...")
+    
+    # Export basic results unless enhanced results were produced
+    summary['keywords'] = len(keyword_data)
+    if not enhanced_metrics:
+        print("💾 Exporting basic results...")
+        with stage('export') as timer:
+            analyzer.export_to_csv(keyword_data, args.output, output_format=args.output_format)
+            timer.items = len(keyword_data)
+        summary['output'] = args.output
+    
+    if clusters:
+        analyzer.export_cluster_summary(
+            keyword_data, clusters, derive_output_path(args.output, '_clusters'),
+            output_format=args.output_format
+        )
+    
+    if baseline is not None:
+        from keyword_diff import diff_results, run_scores, write_diff_report
+        diff_rows, counts = diff_results(baseline.scores(), run_scores(keyword_data, enhanced_metrics),
+                                         threshold=args.diff_threshold)
+        diff_output = derive_output_path(args.output, '_diff')
+        write_diff_report(diff_rows, diff_output, output_format=args.output_format)
+        summary['diff'] = counts
+        summary['diff_output'] = diff_output
+        print(f"🔀 Changes since baseline: {counts['added']} added, {counts['dropped']} dropped, "
+              f"{counts['moved']} moved ({diff_output})")
+    
+    if args.store:
+        from keyword_store import store_run_results
+        options = {key: value for key, value in vars(args).items() if key != 'google_api_key'}
+        stored = store_run_results(args.store, options, list(keyword_data.values()), enhanced_metrics,
+                                   args.geo)
+        summary['store_run'] = stored['run_id']
+        print(f"🗄️  Stored {stored['keywords']} keywords in {args.store} (run {stored['run_id']})")
+    
+    # Every output is in place, so the journal has nothing left to recover
+    journal.discard()
+    install_partial_results(None)
+    
+    budget = get_request_budget()
+    if budget is not None:
+        summary['request_budget'] = budget.summary()
+        install_request_budget(None)
+        if not args.offline:
+            print(f"💰 Spent {summary['request_budget']['total_spent']} of "
+                  f"{budget.max_requests} budgeted requests")
+    
+    if deadline_reached():
+        scored = sum(1 for data in keyword_data.values() if data.get('trend_score') is not None)
+        summary['deadline_reached'] = True
+        print(f"⏱️  Deadline reached: {scored} of {len(keyword_data)} keywords have trend scores "
+              f"(fetched highest priority first)")
+    install_deadline(None)
+    
+    cache = get_response_cache()
+    if args.offline and isinstance(cache, OfflineCache):
+        summary['offline_misses'] = report_offline_misses(cache)
+    
+    print("🎉 Analysis complete!")
+    
+    return summary
+
+
+def _run_batch(argv: List[str]) -> int:
+    """Entry point for the `batch` subcommand."""
+    from batch_runner import batch_main
+    return batch_main(argv)
+
+
+def _run_serve(argv: List[str]) -> int:
+    """Entry point for the `serve` subcommand."""
+    from keyword_service import serve_main
+    return serve_main(argv)
+
+
+def _run_query(argv: List[str]) -> int:
+    """Entry point for the `query` subcommand."""
+    from keyword_store import query_main
+    return query_main(argv)
+
+
+def _run_forecast(argv: List[str]) -> int:
+    """Entry point for the `forecast` subcommand."""
+    from forecasting import forecast_main
+    return forecast_main(argv)
+
+
+def _run_score(argv: List[str]) -> int:
+    """Entry point for the `score` subcommand."""
+    from rescoring import score_main
+    return score_main(argv)
+
+
+# Subcommands dispatched on the first CLI argument
+SUBCOMMANDS = {
+    'batch': _run_batch,
+    'serve': _run_serve,
+    'query': _run_query,
+    'forecast': _run_forecast,
+    'score': _run_score,
+}
+
+
+def _exit_on_signal(signum, frame):
+    """Exit with the conventional status for a signal, running cleanup handlers."""
+    raise SystemExit(128 + signum)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main CLI entry point."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUBCOMMANDS:
+        sys.exit(SUBCOMMANDS[argv[0]](argv[1:]))
+    
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    # A cron or timeout kill then unwinds like an error: partial results and metrics get flushed
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+    
+    # Set logging level
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
+    if args.offline:
+        try:
+            install_response_cache(open_offline_cache(args.cache or DEFAULT_CACHE_PATH, args.store))
+        except PipelineError as e:
+            logger.error(str(e))
+            sys.exit(1)
+    elif args.cache:
+        install_response_cache(ResponseCache(args.cache, ttl=args.cache_ttl))
+    
+    summary = {}
+    status = 'failed'
+    try:
+        summary = run_pipeline(args)
+        status = 'ok'
         
+    except PipelineError as e:
+        logger.error(str(e))
+        sys.exit(1)
     except KeyboardInterrupt:
+        status = 'interrupted'
         print("\n⚠️  Analysis interrupted by user")
         sys.exit(1)
     except Exception as e:
@@ -748,6 +1651,17 @@ Examples:
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        journal = get_partial_results()
+        if journal is not None:
+            install_partial_results(None)
+            if len(journal):
+                print(f"💾 Partial results kept in {journal.path}; rerun the same command to resume")
+        # Failed runs are the ones worth inspecting, so always write metrics
+        if args.metrics_file:
+            get_metrics().write_json(args.metrics_file, status=status, **summary)
+        if args.prometheus_file:
+            get_metrics().write_prometheus(args.prometheus_file, keywords=summary.get('keywords', 0))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,219 @@
+"""
+Append-only journal of a run's fetched results, so rate-limited work survives
+exceptions, timeouts and kills.
+
+Trend scores and analyzed keyword metrics are appended to a JSONL file next to
+the output as they arrive, and flushed to disk every `flush_rows` records or
+`flush_seconds`. A rerun with the same output and region resumes from the
+journal and only fetches what is missing; a successful run deletes it once the
+final outputs are in place.
+"""
+
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = '.partial.jsonl'
+DEFAULT_FLUSH_ROWS = 100
+DEFAULT_FLUSH_SECONDS = 30.0
+
+# Fetched KeywordMetrics fields kept per analyzed keyword; scores are recomputed on resume
+ANALYSIS_FIELDS = ['search_volume', 'competition', 'competition_score', 'cpc_low', 'cpc_high',
+                   'seasonal_trend']
+
+
+class PartialResultsError(Exception):
+    """Custom exception for partial result journal errors."""
+    pass
+
+
+def journal_path(output_file: str) -> str:
+    """
+    Journal path of an output file, e.g. 'out.csv' -> 'out.partial.jsonl'.
+
+    Args:
+        output_file (str): Main output file path
+
+    Returns:
+        str: Journal file path
+    """
+    return os.path.splitext(output_file)[0] + JOURNAL_SUFFIX
+
+
+class PartialResults:
+    """Append-only, periodically flushed journal of trend scores and analyzed metrics."""
+
+    def __init__(self, path: str, context: Dict[str, Any], flush_rows: int = DEFAULT_FLUSH_ROWS,
+                 flush_seconds: float = DEFAULT_FLUSH_SECONDS):
+        """
+        Open a journal, resuming from an existing one written for the same context.
+
+        Args:
+            path (str): Journal file path (see journal_path)
+            context (Dict[str, Any]): Options the results depend on (e.g. geo, language);
+                a journal written for a different context is started over
+            flush_rows (int): Records buffered before they are written out
+            flush_seconds (float): Longest time a record stays buffered
+
+        Raises:
+            PartialResultsError: If the flush settings are invalid
+        """
+        if flush_rows < 1 or flush_seconds <= 0:
+            raise PartialResultsError("flush_rows must be >= 1 and flush_seconds > 0")
+        self.path = path
+        self.context = context
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.trend_scores: Dict[str, float] = {}
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+        self.written = 0
+        self._buffer: List[str] = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        self.resumed = self._load()
+
+    def _load(self) -> int:
+        """Read an existing journal (last record per keyword wins) and compact it."""
+        if not os.path.exists(self.path):
+            return 0
+
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # Torn last line of a killed run
+        except OSError as e:
+            raise PartialResultsError(f"Could not read partial results from {self.path}: {e}")
+
+        if not records or records[0].get('stage') != 'header' or records[0].get('context') != self.context:
+            logger.warning(f"Ignoring {self.path}: written for different options")
+            return 0
+        for record in records[1:]:
+            if record.get('stage') == 'trends':
+                self.trend_scores[record['keyword']] = record['trend_score']
+            elif record.get('stage') == 'analysis':
+                self.metrics[record['keyword']] = {field: record.get(field) for field in ANALYSIS_FIELDS}
+
+        # Rewrite without duplicates or a torn line, so appends start on a clean line
+        self._rewrite()
+        return len(self.trend_scores) + len(self.metrics)
+
+    def _header(self) -> str:
+        return json.dumps({'stage': 'header', 'context': self.context}, ensure_ascii=False) + '\n'
+
+    def _rewrite(self):
+        temp = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            f.write(self._header())
+            for keyword, score in self.trend_scores.items():
+                f.write(self._record('trends', keyword, {'trend_score': score}))
+            for keyword, fields in self.metrics.items():
+                f.write(self._record('analysis', keyword, fields))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+
+    @staticmethod
+    def _record(stage: str, keyword: str, fields: Dict[str, Any]) -> str:
+        return json.dumps(dict({'stage': stage, 'keyword': keyword}, **fields), ensure_ascii=False) + '\n'
+
+    def add_trend_scores(self, scores: Dict[str, Optional[float]]):
+        """
+        Journal trend scores. Keywords without a score are not kept, so a resumed run retries them.
+
+        Args:
+            scores (Dict[str, Optional[float]]): Trend score by keyword
+        """
+        for keyword, score in scores.items():
+            if score is not None:
+                self.trend_scores[keyword] = score
+                self._buffer.append(self._record('trends', keyword, {'trend_score': score}))
+        self._maybe_flush()
+
+    def add_metrics(self, metrics):
+        """
+        Journal the fetched fields of one analyzed keyword (nothing if nothing was fetched).
+
+        Args:
+            metrics (KeywordMetrics): Metrics as fetched, before scoring
+        """
+        if metrics.search_volume is None and not metrics.seasonal_trend:
+            return
+        fields = {field: getattr(metrics, field) for field in ANALYSIS_FIELDS}
+        self.metrics[metrics.keyword] = fields
+        self._buffer.append(self._record('analysis', metrics.keyword, fields))
+        self._maybe_flush()
+
+    def known_metrics(self) -> Dict[str, Any]:
+        """Journaled analysis results as KeywordMetrics, by keyword."""
+        from fetch_trends_api import KeywordMetrics
+        return {keyword: KeywordMetrics(keyword=keyword, **fields) for keyword, fields in self.metrics.items()}
+
+    def _maybe_flush(self):
+        if (len(self._buffer) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """Write buffered records and force them to disk."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        if self._file is None:
+            fresh = not self.resumed and self.written == 0
+            self._file = open(self.path, 'w' if fresh else 'a', encoding='utf-8')
+            if fresh:
+                self._file.write(self._header())
+        self._file.write(''.join(self._buffer))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        """Flush and close; the journal stays on disk for a rerun to resume from."""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self):
+        """Delete the journal once the run's final outputs are written."""
+        self._buffer = []
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __len__(self) -> int:
+        return len(self.trend_scores) + len(self.metrics)
+
+
+# Journal of the run in progress in this process (None = not journaling)
+_partial_results: Optional[PartialResults] = None
+
+
+def install_partial_results(journal: Optional[PartialResults]):
+    """
+    Make a journal the current run's (or with None, stop journaling), closing the previous one.
+
+    Args:
+        journal (Optional[PartialResults]): Journal for subsequent results
+    """
+    global _partial_results
+    if _partial_results is not None and _partial_results is not journal:
+        _partial_results.close()
+    _partial_results = journal
+
+
+def get_partial_results() -> Optional[PartialResults]:
+    """Return the journal installed in this process, if any."""
+    return _partial_results
@@ -0,0 +1,312 @@
+"""
+Request rate limiting shared by the autocomplete and trends clients.
+Supports a per-process limiter, a limiter shared by a pool of worker processes,
+a hard cap on the number of requests a run may issue, and a deadline after which
+no more requests are sent.
+"""
+
+import time
+import threading
+import multiprocessing
+import logging
+from typing import Dict, Optional
+
+from run_metrics import record_sleep
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between requests to each endpoint
+DEFAULT_INTERVALS = {
+    'autocomplete': 0.5,
+    'trends': 0.0,  # TrendsClient already adds randomized delays between batches
+}
+
+
+class BudgetExhaustedError(Exception):
+    """Raised when a request is refused because the request budget is spent."""
+    pass
+
+
+class RateLimiter:
+    """
+    Minimum-interval rate limiter per endpoint, safe across threads.
+
+    Callers reserve the next free slot under a lock and sleep outside it, so
+    concurrent callers queue up fairly instead of waking at the same time.
+    """
+
+    def __init__(self, intervals: Optional[Dict[str, float]] = None):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            intervals (Optional[Dict[str, float]]): Minimum seconds between requests per endpoint
+        """
+        self.intervals = dict(DEFAULT_INTERVALS)
+        self.intervals.update(intervals or {})
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def _reserve(self, endpoint: str, interval: float) -> float:
+        """Reserve the next slot for an endpoint and return how long to wait for it."""
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next_slot.get(endpoint, 0.0))
+            self._next_slot[endpoint] = start + interval
+        return start - now
+
+    def acquire(self, endpoint: str) -> float:
+        """
+        Block until a request to the endpoint is allowed.
+
+        Args:
+            endpoint (str): Endpoint name (e.g. 'autocomplete', 'trends')
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        interval = self.intervals.get(endpoint, 0.0)
+        if interval <= 0:
+            return 0.0
+
+        wait = self._reserve(endpoint, interval)
+        if wait > 0:
+            time.sleep(wait)
+            record_sleep(f"{endpoint}_rate_limit", wait)
+        return max(wait, 0.0)
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    Rate limiter whose budget is shared by every process that inherits it.
+
+    Create it in the parent process and hand it to workers (e.g. through a
+    multiprocessing.Pool initializer); slot reservations go through shared memory.
+    """
+
+    def __init__(self, intervals: Optional[Dict[str, float]] = None, context=None):
+        """
+        Initialize the shared rate limiter.
+
+        Args:
+            intervals (Optional[Dict[str, float]]): Minimum seconds between requests per endpoint
+            context: multiprocessing context used to allocate the shared state
+        """
+        super().__init__(intervals)
+        context = context or multiprocessing.get_context()
+        self._endpoints = sorted(self.intervals)
+        self._lock = context.Lock()
+        self._slots = context.Array('d', len(self._endpoints), lock=False)
+
+    def _reserve(self, endpoint: str, interval: float) -> float:
+        index = self._endpoints.index(endpoint)
+        with self._lock:
+            now = time.time()
+            start = max(now, self._slots[index])
+            self._slots[index] = start + interval
+        return start - now
+
+
+# Limiter used by the module-level fetch functions of this process
+_rate_limiter = RateLimiter()
+
+
+def install_rate_limiter(limiter: RateLimiter):
+    """
+    Replace the rate limiter used by this process.
+
+    Args:
+        limiter (RateLimiter): Limiter to use for all subsequent requests
+    """
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the rate limiter used by this process."""
+    return _rate_limiter
+
+
+def throttle(endpoint: str) -> float:
+    """
+    Wait for the installed rate limiter to allow a request.
+
+    Args:
+        endpoint (str): Endpoint name
+
+    Returns:
+        float: Seconds spent waiting
+    """
+    return _rate_limiter.acquire(endpoint)
+
+
+class RequestBudget:
+    """
+    Hard cap on the number of network requests, safe across threads.
+
+    Cached responses are free; only requests that would reach the network are
+    counted. Per-endpoint allocations reserve part of the total for later stages
+    (e.g. keep autocomplete from spending what the trends stage needs).
+    """
+
+    def __init__(self, max_requests: int, allocations: Optional[Dict[str, int]] = None):
+        """
+        Initialize the request budget.
+
+        Args:
+            max_requests (int): Total requests allowed across all endpoints
+            allocations (Optional[Dict[str, int]]): Upper bound per endpoint within the total
+        """
+        self.max_requests = max_requests
+        self.allocations = dict(allocations or {})
+        self.spent: Dict[str, int] = {}
+        self.refused: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def total_spent(self) -> int:
+        return sum(self.spent.values())
+
+    def remaining(self, endpoint: Optional[str] = None) -> int:
+        """
+        Requests still available, overall or for one endpoint.
+
+        Args:
+            endpoint (Optional[str]): Endpoint name (None = whole budget)
+
+        Returns:
+            int: Requests left
+        """
+        with self._lock:
+            left = self.max_requests - self.total_spent
+            if endpoint in self.allocations:
+                left = min(left, self.allocations[endpoint] - self.spent.get(endpoint, 0))
+            return max(left, 0)
+
+    def try_spend(self, endpoint: str) -> bool:
+        """
+        Reserve one request to an endpoint if the budget allows it.
+
+        Args:
+            endpoint (str): Endpoint name (e.g. 'autocomplete', 'trends')
+
+        Returns:
+            bool: True if the request may be sent
+        """
+        with self._lock:
+            allowed = self.total_spent < self.max_requests
+            if endpoint in self.allocations:
+                allowed = allowed and self.spent.get(endpoint, 0) < self.allocations[endpoint]
+
+            if allowed:
+                self.spent[endpoint] = self.spent.get(endpoint, 0) + 1
+                return True
+
+            first_refusal = endpoint not in self.refused
+            self.refused[endpoint] = self.refused.get(endpoint, 0) + 1
+
+        if first_refusal:
+            logger.warning(f"Request budget exhausted for {endpoint}; "
+                           f"continuing with cached responses only")
+        return False
+
+    def summary(self) -> Dict:
+        """Budget, allocations and requests spent or refused per endpoint."""
+        with self._lock:
+            return {
+                'max_requests': self.max_requests,
+                'allocations': dict(self.allocations),
+                'spent': dict(self.spent),
+                'refused': dict(self.refused),
+                'total_spent': self.total_spent,
+            }
+
+
+# Budget enforced by the fetch functions of this process (None = unlimited)
+_request_budget: Optional[RequestBudget] = None
+
+
+def install_request_budget(budget: Optional[RequestBudget]):
+    """
+    Enable (or with None, disable) a hard request budget for this process.
+
+    Args:
+        budget (Optional[RequestBudget]): Budget to charge subsequent requests to
+    """
+    global _request_budget
+    _request_budget = budget
+
+
+def get_request_budget() -> Optional[RequestBudget]:
+    """Return the request budget installed in this process, if any."""
+    return _request_budget
+
+
+# time.monotonic() after which no request is sent (None = no deadline)
+_deadline: Optional[float] = None
+_deadline_reached = False
+
+
+def install_deadline(seconds: Optional[float]):
+    """
+    Stop sending requests once `seconds` have passed (None clears the deadline).
+
+    After the deadline every fetch is refused as if the request budget were
+    spent, so stages finish on cached responses and the run exports what it has.
+
+    Args:
+        seconds (Optional[float]): Time allowed from now
+    """
+    global _deadline, _deadline_reached
+    _deadline = None if seconds is None else time.monotonic() + seconds
+    _deadline_reached = False
+
+
+def deadline_reached() -> bool:
+    """Whether the installed deadline has passed (logged once when it does)."""
+    global _deadline_reached
+    if _deadline is None:
+        return False
+    if not _deadline_reached and time.monotonic() >= _deadline:
+        _deadline_reached = True
+        logger.warning("Deadline reached; continuing with cached responses only")
+    return _deadline_reached
+
+
+def can_spend(endpoint: str) -> bool:
+    """
+    Whether the installed budget still allows a request to an endpoint, without charging it.
+
+    Lets callers skip expensive client setup (e.g. the pytrends handshake) when
+    no request could be sent anyway, as in --offline runs.
+
+    Args:
+        endpoint (str): Endpoint name
+
+    Returns:
+        bool: True if a request may be sent (always True without a budget or deadline)
+    """
+    if deadline_reached():
+        return False
+    if _request_budget is None:
+        return True
+    return _request_budget.remaining(endpoint) > 0
+
+
+def spend_request(endpoint: str) -> bool:
+    """
+    Charge one request to the installed budget.
+
+    Args:
+        endpoint (str): Endpoint name
+
+    Returns:
+        bool: True if the request may be sent (always True without a budget or deadline)
+    """
+    if deadline_reached():
+        return False
+    if _request_budget is None:
+        return True
+    return _request_budget.try_spend(endpoint)
@@ -0,0 +1,442 @@
+"""
+Request-budget planner for keyword runs.
+Estimates requests per endpoint and wall time before anything is sent, using
+cached responses where they exist, and sizes expansion to fit a hard budget.
+"""
+
+import re
+import math
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fetch_autocomplete import DEFAULT_PREFIXES, DEFAULT_SUFFIXES
+from keyword_filters import KeywordFilter, SUGGESTIONS_PER_QUERY
+from rate_limiter import RateLimiter, RequestBudget, get_rate_limiter
+from response_cache import get_response_cache
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Mirrors of the pipeline's fixed request shapes
+TRENDS_BATCH_SIZE = 5       # keywords per interest_over_time request
+TRENDS_TIMEFRAME = 'today 1-m'
+VOLUME_TIMEFRAME = 'today 12-m'
+RELATED_SOURCE_KEYWORDS = 3  # collect_trends_data fetches related queries for 3 keywords
+RELATED_KEPT = 5             # and keeps the top 5 of each
+PAID_API_REQUESTS = 2        # search volume and competition, one request each
+
+# Mean politeness delay the clients sleep before each request (seconds)
+CLIENT_DELAYS = {
+    'autocomplete': 0.0,
+    'trends': 4.5,           # uniform(3, 6) between batches
+    'trends_related': 3.0,   # uniform(2, 4)
+    'trends_regional': 4.5,  # uniform(3, 6) between batches
+    'volume': 2.0,
+    'seasonal': 0.0,
+    'trends_api': 0.0,
+}
+ANALYZER_DELAY = 0.5         # per analyzed keyword, cached or not
+
+# Typical round trip per request (seconds); rough defaults, override with measurements
+DEFAULT_LATENCIES = {
+    'autocomplete': 0.3,
+    'trends': 1.5,
+    'trends_related': 1.5,
+    'trends_regional': 1.5,
+    'volume': 1.5,
+    'seasonal': 1.5,
+    'trends_api': 0.5,
+}
+
+# Rate limiter endpoint that spaces the requests of each planned endpoint
+LIMITER_ENDPOINTS = {
+    'autocomplete': 'autocomplete',
+    'trends': 'trends',
+    'trends_related': 'trends',
+    'trends_regional': 'trends',
+    'volume': 'trends',
+    'seasonal': 'trends',
+    'trends_api': 'trends_api',
+}
+PAID_API_INTERVAL = 1.0      # GoogleTrendsAPI.min_request_interval
+
+ENDPOINTS = list(CLIENT_DELAYS)
+
+_MISSING = object()
+
+
+def format_duration(seconds: float) -> str:
+    """Render seconds as a short human-readable duration (e.g. '1h 05m')."""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"
+
+
+def parse_duration(text: str) -> float:
+    """
+    Parse a duration such as '90', '45s', '30m' or '1h30m' into seconds.
+
+    Args:
+        text (str): Duration; a bare number is seconds
+
+    Returns:
+        float: Seconds
+
+    Raises:
+        ValueError: If the text is not a positive duration
+    """
+    text = text.strip().lower()
+    match = re.fullmatch(r'(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m)?(?:(\d+(?:\.\d+)?)s?)?', text)
+    if not text or match is None:
+        raise ValueError(f"Invalid duration: {text!r} (e.g. 90s, 30m, 1h30m)")
+    hours, minutes, seconds = (float(part) if part else 0.0 for part in match.groups())
+    total = hours * 3600 + minutes * 60 + seconds
+    if total <= 0:
+        raise ValueError(f"Duration must be positive: {text!r}")
+    return total
+
+
+@dataclass
+class RequestPlan:
+    """Estimated network requests, cache hits and wall time of one run."""
+    requests: Dict[str, int] = field(default_factory=dict)
+    cache_hits: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    keywords: int = 0
+    trend_keywords: int = 0
+    analyzed_keywords: int = 0
+    max_requests: Optional[int] = None
+    allocations: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    @property
+    def wall_seconds(self) -> float:
+        return sum(self.seconds.values())
+
+    def make_budget(self) -> Optional[RequestBudget]:
+        """Request budget enforcing this plan (None if the plan has no limit)."""
+        if self.max_requests is None:
+            return None
+        return RequestBudget(self.max_requests, self.allocations)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plan as a JSON-serializable dictionary."""
+        return {
+            'requests': dict(self.requests),
+            'total_requests': self.total_requests,
+            'cache_hits': dict(self.cache_hits),
+            'seconds': {k: round(v, 1) for k, v in self.seconds.items()},
+            'wall_seconds': round(self.wall_seconds, 1),
+            'keywords': self.keywords,
+            'trend_keywords': self.trend_keywords,
+            'analyzed_keywords': self.analyzed_keywords,
+            'max_requests': self.max_requests,
+            'allocations': dict(self.allocations),
+        }
+
+    def describe(self) -> List[str]:
+        """Human-readable plan, one line per endpoint plus totals."""
+        lines = []
+        for endpoint in ENDPOINTS:
+            requests = self.requests.get(endpoint, 0)
+            hits = self.cache_hits.get(endpoint, 0)
+            if not requests and not hits:
+                continue
+            lines.append(f"  {endpoint:<15} {requests:>7,} requests  {hits:>7,} cached  "
+                         f"~{format_duration(self.seconds.get(endpoint, 0.0))}")
+        if self.seconds.get('analyzer_delay'):
+            lines.append(f"  {'analyzer delay':<15} {'':>33}"
+                         f"~{format_duration(self.seconds['analyzer_delay'])}")
+        lines.append(f"  Total: {self.total_requests:,} requests, "
+                     f"~{format_duration(self.wall_seconds)} wall time")
+        lines.append(f"  Keywords: up to {self.keywords:,} discovered, "
+                     f"{self.trend_keywords:,} scored by trends")
+        if self.max_requests is not None:
+            allocated = ', '.join(f"{k} <= {v:,}" for k, v in self.allocations.items())
+            lines.append(f"  Budget: {self.max_requests:,} requests"
+                         f"{f' ({allocated})' if allocated else ''}")
+        return lines
+
+
+class RequestPlanner:
+    """
+    Estimate the requests a run will send, without touching the network.
+
+    Autocomplete expansion is simulated breadth-first: queries with a cached
+    response are expanded with their real suggestions (and cost nothing), the
+    rest are assumed to return `fanout` new keywords each. Keyword counts are
+    therefore upper bounds; request counts assume every uncached query succeeds.
+    """
+
+    def __init__(self, seeds: List[str], recursive: bool = False, variations: bool = False,
+                 max_depth: int = 2, fanout: int = 5,
+                 keyword_filter: Optional[KeywordFilter] = None,
+                 language: str = 'en', country: str = 'US', geo: str = 'US',
+                 analyze: bool = False, cluster_size: Optional[int] = None,
+                 geos: Optional[List[str]] = None, cache=None, limiter: Optional[RateLimiter] = None,
+                 latencies: Optional[Dict[str, float]] = None):
+        """
+        Initialize the planner.
+
+        Args:
+            seeds (List[str]): Seed keywords
+            recursive (bool): Whether recursive expansion is enabled
+            variations (bool): Whether prefix/suffix variations are enabled
+            max_depth (int): Maximum recursion depth
+            fanout (int): Suggestions expanded per keyword in recursive mode
+            keyword_filter (Optional[KeywordFilter]): Filter pushed down into discovery
+            language (str): Autocomplete language code
+            country (str): Autocomplete country code
+            geo (str): Trends region
+            analyze (bool): Whether enhanced analysis will run
+            cluster_size (Optional[int]): Average cluster size when --cluster is used
+            geos (Optional[List[str]]): Regions compared with --geos
+            cache (Optional[ResponseCache | MemoryCache]): Cache to consult (default: installed cache)
+            limiter (Optional[RateLimiter]): Limiter whose intervals apply (default: installed limiter)
+            latencies (Optional[Dict[str, float]]): Round-trip seconds per endpoint
+        """
+        self.seeds = list(dict.fromkeys(seed.strip() for seed in seeds if seed.strip()))
+        self.recursive = recursive
+        self.variations = variations
+        self.max_depth = max_depth
+        self.fanout = fanout
+        self.keyword_filter = keyword_filter
+        self.language = language
+        self.country = country
+        self.geo = geo
+        self.analyze = analyze
+        self.cluster_size = cluster_size
+        self.geos = list(geos or [])
+        self.cache = cache if cache is not None else get_response_cache()
+        self.intervals = dict((limiter or get_rate_limiter()).intervals)
+        self.intervals.setdefault('trends_api', PAID_API_INTERVAL)
+        self.latencies = dict(DEFAULT_LATENCIES)
+        self.latencies.update(latencies or {})
+        self._peeked: Dict[Tuple[str, str], Any] = {}
+
+    def _peek(self, namespace: str, keys: List[str]) -> Dict[str, Any]:
+        """Cached values for keys, memoized so repeated plans hit SQLite once."""
+        if self.cache is None:
+            return {}
+        unseen = [key for key in dict.fromkeys(keys) if (namespace, key) not in self._peeked]
+        if unseen:
+            found = self.cache.peek_many(namespace, unseen)
+            for key in unseen:
+                self._peeked[(namespace, key)] = found.get(key, _MISSING)
+        return {key: self._peeked[(namespace, key)] for key in keys
+                if self._peeked[(namespace, key)] is not _MISSING}
+
+    def _matches(self, keyword: str) -> bool:
+        return self.keyword_filter is None or self.keyword_filter.matches(keyword)
+
+    def _can_expand(self, keyword: str) -> bool:
+        return self.keyword_filter is None or self.keyword_filter.can_expand(keyword)
+
+    def _autocomplete_key(self, query: str) -> str:
+        return f"{self.language}|{self.country}|{query}"
+
+    def _suggestions(self, queries: List[str]) -> Dict[str, List[str]]:
+        """Cached autocomplete suggestions for the queries that have them."""
+        cached = self._peek('autocomplete', [self._autocomplete_key(q) for q in queries])
+        return {q: cached[self._autocomplete_key(q)] for q in queries
+                if self._autocomplete_key(q) in cached}
+
+    def _plan_queries(self, queries: List[str], limit: Optional[int],
+                      keywords: Set[str]) -> Tuple[int, int, int]:
+        """Plan independent autocomplete queries; returns (requests, hits, unknown keywords)."""
+        requests = hits = unknown = 0
+        cached = self._suggestions(queries)
+
+        for query in queries:
+            if query in cached:
+                hits += 1
+                keywords.update(k for k in cached[query] if self._matches(k))
+            elif limit is None or requests < limit:
+                requests += 1
+                if self._can_expand(query):
+                    unknown += SUGGESTIONS_PER_QUERY
+        return requests, hits, unknown
+
+    def _plan_recursive(self, limit: Optional[int],
+                        keywords: Set[str]) -> Tuple[int, int, int]:
+        """Simulate breadth-first recursive expansion; returns (requests, hits, unknown keywords)."""
+        requests = hits = unknown = 0
+        processed: Set[str] = set()
+        level = list(self.seeds)
+        unknown_nodes = 0  # queued keywords whose text is not known yet
+
+        for depth in range(self.max_depth):
+            expand_next = depth + 1 < self.max_depth
+            cached = self._suggestions([q for q in level if q not in processed])
+            next_level: List[str] = []
+            next_unknown = 0
+
+            for query in level:
+                if query in processed:
+                    continue
+                processed.add(query)
+                if query in cached:
+                    hits += 1
+                    for suggestion in cached[query][:self.fanout]:
+                        if suggestion in processed:
+                            continue
+                        if self._matches(suggestion):
+                            keywords.add(suggestion)
+                        if expand_next and self._can_expand(suggestion):
+                            next_level.append(suggestion)
+                elif limit is None or requests < limit:
+                    requests += 1
+                    if self._can_expand(query):
+                        unknown += self.fanout
+                        next_unknown += self.fanout if expand_next else 0
+
+            queried = unknown_nodes if limit is None else min(unknown_nodes, max(limit - requests, 0))
+            requests += queried
+            unknown += queried * self.fanout
+            next_unknown += queried * self.fanout if expand_next else 0
+
+            level, unknown_nodes = next_level, next_unknown
+
+        return requests, hits, unknown
+
+    def _variation_queries(self, seed: str) -> List[str]:
+        """Queries fetch_autocomplete_variations sends for a seed."""
+        queries = [seed]
+        queries += [f"{p} {seed}" for p in DEFAULT_PREFIXES if self._can_expand(f"{p} {seed}")]
+        queries += [f"{seed} {s}" for s in DEFAULT_SUFFIXES if self._can_expand(f"{seed} {s}")]
+        return queries
+
+    def _seconds(self, endpoint: str, requests: int) -> float:
+        """Wall time of sequential requests to an endpoint."""
+        interval = self.intervals.get(LIMITER_ENDPOINTS[endpoint], 0.0)
+        per_request = max(interval, CLIENT_DELAYS[endpoint] + self.latencies[endpoint])
+        return requests * per_request
+
+    def plan(self, autocomplete_limit: Optional[int] = None) -> RequestPlan:
+        """
+        Estimate requests and wall time for the configured run.
+
+        Args:
+            autocomplete_limit (Optional[int]): Stop planning autocomplete requests after this many
+
+        Returns:
+            RequestPlan: Estimated requests, cache hits and seconds per endpoint
+        """
+        keywords = {seed for seed in self.seeds if self._matches(seed)}
+
+        if self.recursive:
+            ac_requests, ac_hits, unknown = self._plan_recursive(autocomplete_limit, keywords)
+        elif self.variations:
+            queries = [q for seed in self.seeds for q in self._variation_queries(seed)]
+            ac_requests, ac_hits, unknown = self._plan_queries(queries, autocomplete_limit, keywords)
+        else:
+            ac_requests, ac_hits, unknown = self._plan_queries(self.seeds, autocomplete_limit, keywords)
+
+        plan = RequestPlan(keywords=len(keywords) + unknown)
+        plan.requests['autocomplete'] = ac_requests
+        plan.cache_hits['autocomplete'] = ac_hits
+
+        # Clustering queries trends for centroids only, which are not known in advance
+        if self.cluster_size:
+            plan.trend_keywords = math.ceil(plan.keywords / max(self.cluster_size, 1))
+            trend_keywords = []
+        else:
+            plan.trend_keywords = plan.keywords
+            trend_keywords = sorted(keywords)
+
+        trend_hits = len(self._peek('trends', [f"{self.geo}|{TRENDS_TIMEFRAME}|{k}"
+                                               for k in trend_keywords]))
+        trend_pending = plan.trend_keywords - trend_hits
+
+        # Related queries for the first few keywords (known only once every keyword is),
+        # then trends for the queries they add
+        related_sources = min(RELATED_SOURCE_KEYWORDS, plan.trend_keywords)
+        related_candidates = trend_keywords[:related_sources] if not unknown else []
+        related_cached = self._peek('related', [f"{self.geo}|{TRENDS_TIMEFRAME}|{k}"
+                                                for k in related_candidates])
+        related_known = {q for queries in related_cached.values() for q in queries[:RELATED_KEPT]}
+        related_known -= keywords
+        related_known_hits = len(self._peek('trends', [f"{self.geo}|{TRENDS_TIMEFRAME}|{k}"
+                                                        for k in related_known]))
+        related_unknown = (related_sources - len(related_cached)) * RELATED_KEPT
+        related_pending = len(related_known) - related_known_hits + related_unknown
+
+        plan.requests['trends'] = (math.ceil(trend_pending / TRENDS_BATCH_SIZE) +
+                                   math.ceil(related_pending / TRENDS_BATCH_SIZE))
+        plan.cache_hits['trends'] = trend_hits + related_known_hits
+        plan.requests['trends_related'] = related_sources - len(related_cached)
+        plan.cache_hits['trends_related'] = len(related_cached)
+
+        if self.geos:
+            # One batch of requests per payload scope: worldwide, plus one per country
+            # whose subregions are compared
+            scopes = {geo.split('-')[0] if '-' in geo else 'world' for geo in self.geos}
+            regional_keywords = trend_keywords + sorted(related_known)
+            regional_total = plan.trend_keywords + len(related_known) + related_unknown
+            plan.requests['trends_regional'] = plan.cache_hits['trends_regional'] = 0
+            for scope in scopes:
+                hits = len(self._peek('regional', [f"{scope}|{TRENDS_TIMEFRAME}|{k}"
+                                                   for k in regional_keywords]))
+                plan.requests['trends_regional'] += math.ceil((regional_total - hits) / TRENDS_BATCH_SIZE)
+                plan.cache_hits['trends_regional'] += hits
+
+        if self.analyze:
+            # Upper bound: the per-keyword pytrends fallbacks run for every analyzed keyword
+            plan.analyzed_keywords = plan.trend_keywords
+            volume_hits = len(self._peek('volume', [f"{self.geo}|{VOLUME_TIMEFRAME}|{k}"
+                                                    for k in trend_keywords]))
+            seasonal_hits = len(self._peek('seasonal', [f"{self.geo}|{k}" for k in trend_keywords]))
+            plan.requests['trends_api'] = PAID_API_REQUESTS
+            plan.requests['volume'] = plan.analyzed_keywords - volume_hits
+            plan.cache_hits['volume'] = volume_hits
+            plan.requests['seasonal'] = plan.analyzed_keywords - seasonal_hits
+            plan.cache_hits['seasonal'] = seasonal_hits
+            plan.seconds['analyzer_delay'] = plan.analyzed_keywords * ANALYZER_DELAY
+
+        for endpoint, requests in plan.requests.items():
+            plan.seconds[endpoint] = self._seconds(endpoint, requests)
+        return plan
+
+    def fit_budget(self, max_requests: int) -> RequestPlan:
+        """
+        Size autocomplete expansion so the whole run fits a request budget.
+
+        Every autocomplete request discovers keywords that later cost trends
+        requests, so autocomplete gets the largest allocation whose estimated
+        downstream cost still fits; expansion is breadth-first, so the budget
+        reaches every seed before deeper levels.
+
+        Args:
+            max_requests (int): Hard limit on requests across all endpoints
+
+        Returns:
+            RequestPlan: Plan within the budget, with per-endpoint allocations
+        """
+        plan = self.plan()
+        if plan.total_requests > max_requests:
+            low, high = 0, plan.requests['autocomplete']
+            while low < high:
+                middle = (low + high + 1) // 2
+                if self.plan(autocomplete_limit=middle).total_requests <= max_requests:
+                    low = middle
+                else:
+                    high = middle - 1
+            plan = self.plan(autocomplete_limit=low)
+
+        # Slack left by the estimate goes to autocomplete; later stages share the rest
+        downstream = plan.total_requests - plan.requests['autocomplete']
+        plan.max_requests = max_requests
+        plan.allocations = {'autocomplete': max(max_requests - downstream, 0)}
+        logger.info(f"Request budget {max_requests}: autocomplete up to "
+                    f"{plan.allocations['autocomplete']}, ~{plan.keywords} keywords")
+        return plan
@@ -0,0 +1,276 @@
+"""
+Offline re-scoring of existing results with the current scoring code.
+
+Opportunity score, difficulty score and recommendation are recomputed from
+metrics already in an output file or the keyword store, without any request.
+Rows are streamed in chunks across a process pool, so tweaking the scorers no
+longer means re-running the network pipeline.
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+import multiprocessing
+from collections import deque
+from dataclasses import fields
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from keyword_export import export_rows, read_rows, ExportError
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = ['opportunity_score', 'difficulty_score', 'recommendation', 'intent', 'intents']
+STORE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+DEFAULT_CHUNK_SIZE = 20000
+
+# Analyzer built once per worker process by _init_worker
+_worker_analyzer = None
+
+
+class RescoreError(Exception):
+    """Custom exception for re-scoring errors."""
+    pass
+
+
+def is_store_path(path: str) -> bool:
+    """Whether a path names a keyword store rather than an output file."""
+    return path.lower().endswith(STORE_EXTENSIONS)
+
+
+def _init_worker(language: str, lexicons: Optional[Dict]):
+    """Build the scoring analyzer (and compile its intent lexicons) once per process."""
+    global _worker_analyzer
+    from fetch_trends_api import KeywordAnalyzer
+    from intent_tagger import IntentTagger
+    # Scoring never touches the trends client
+    _worker_analyzer = KeywordAnalyzer(None, language=language,
+                                       intent_tagger=IntentTagger(language, lexicons))
+
+
+def score_chunk(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Re-score one chunk of rows in place.
+
+    Seasonality is recomputed (one vectorized pass per chunk) for rows that
+    have a monthly curve but no stored profile, and intents are re-tagged.
+
+    Args:
+        rows (List[Dict[str, Any]]): Output or store rows
+
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: The rows with new SCORE_COLUMNS, and
+        how many recommendations changed
+    """
+    from fetch_trends_api import KeywordMetrics
+    from seasonality import apply_seasonality, SEASONALITY_FIELDS, MIN_POINTS
+
+    analyzer = _worker_analyzer
+    names = [field.name for field in fields(KeywordMetrics)]
+    metrics = []
+    for row in rows:
+        values = {name: row[name] for name in names if row.get(name) is not None and row[name] != ''}
+        values.pop('intent', None)
+        values.pop('intents', None)
+        metrics.append(KeywordMetrics(**values))
+
+    profiled = [metric for metric in metrics
+                if metric.trend_slope is None and len(metric.seasonal_trend or []) >= MIN_POINTS]
+    apply_seasonality(profiled)
+    profiled = set(map(id, profiled))
+
+    changed = 0
+    analyzer.rescore(metrics)
+    for row, metric in zip(rows, metrics):
+        if row.get('recommendation') != metric.recommendation:
+            changed += 1
+        row['opportunity_score'] = metric.opportunity_score
+        row['difficulty_score'] = metric.difficulty_score
+        row['recommendation'] = metric.recommendation
+        row['intent'] = metric.intent
+        row['intents'] = '|'.join(metric.intents) or None
+        if id(metric) in profiled:
+            row.update((field, getattr(metric, field)) for field in SEASONALITY_FIELDS)
+    return rows, changed
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Rescorer:
+    """Streams rows through score_chunk, in process or across a worker pool."""
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 language: str = 'en', lexicons: Optional[Dict] = None):
+        """
+        Initialize the re-scorer.
+
+        Args:
+            workers (Optional[int]): Worker processes (default: CPU count; 1 = no pool)
+            chunk_size (int): Rows sent to a worker at a time
+            language (str): Keyword language, selects the intent lexicons
+            lexicons (Optional[Dict]): Extra intent phrases (intent_tagger.load_lexicon_file)
+        """
+        if chunk_size < 1:
+            raise RescoreError(f"Chunk size must be >= 1, got {chunk_size}")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.language = language
+        self.lexicons = lexicons
+        self.rows = 0
+        self.changed = 0
+
+    def rescore(self, rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Re-score rows, keeping their order.
+
+        Args:
+            rows (Iterable[Dict[str, Any]]): Rows to re-score (read lazily)
+
+        Yields:
+            Dict[str, Any]: Re-scored rows
+        """
+        self.rows = self.changed = 0
+        chunks = _chunks(rows, self.chunk_size)
+        if self.workers == 1:
+            _init_worker(self.language, self.lexicons)
+            results = map(score_chunk, chunks)
+            yield from self._collect(results)
+            return
+
+        with multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                  initargs=(self.language, self.lexicons)) as pool:
+            yield from self._collect(self._submit(pool, chunks))
+
+    def _submit(self, pool, chunks: Iterator[List[Dict[str, Any]]]):
+        """
+        Results of the chunks in order, keeping at most two chunks per worker in flight.
+
+        Chunks are read on this thread (Pool.imap would read them on a helper
+        thread, which a SQLite cursor does not allow) and the window bounds memory.
+        """
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(score_chunk, (chunk,)))
+            if len(pending) >= 2 * self.workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+    def _collect(self, results: Iterable[Tuple[List[Dict[str, Any]], int]]) -> Iterator[Dict[str, Any]]:
+        for chunk, changed in results:
+            self.rows += len(chunk)
+            self.changed += changed
+            yield from chunk
+
+
+def _with_columns(rows: Iterator[Dict[str, Any]]) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    """Columns of a row stream (first row's fields plus SCORE_COLUMNS), and the stream."""
+    first = next(rows, None)
+    if first is None:
+        return [], iter(())
+    columns = list(first) + [column for column in SCORE_COLUMNS if column not in first]
+    return columns, chain([first], rows)
+
+
+def score_main(argv: List[str]) -> int:
+    """
+    CLI entry point for `python main.py score`.
+
+    Args:
+        argv (List[str]): Arguments after the subcommand name
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog='main.py score',
+        description='Recompute opportunity, difficulty and recommendation from stored metrics '
+                    '(no requests)',
+        epilog='Example: python main.py score --input whatsapp_ai_ENHANCED.csv '
+               '--output whatsapp_ai_ENHANCED.csv'
+    )
+    parser.add_argument('--input', '-i', type=str, required=True,
+                        help='Output file (CSV/JSONL/Parquet) or keyword store (.sqlite) to re-score')
+    parser.add_argument('--output', '-o', type=str,
+                        help='Where to write re-scored rows (required for file input; a store '
+                             'is updated in place when omitted)')
+    parser.add_argument('--geo', type=str, help='Only re-score store metrics of this region')
+    parser.add_argument('--language', '-l', type=str, default='en',
+                        help='Keyword language for intent tagging (default: en)')
+    parser.add_argument('--intent-lexicon', type=str, metavar='PATH',
+                        help='JSON file of extra intent phrases')
+    parser.add_argument('--workers', '-w', type=int,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Rows per worker task (default: {DEFAULT_CHUNK_SIZE})')
+    args = parser.parse_args(argv)
+
+    from_store = is_store_path(args.input)
+    if not from_store and not args.output:
+        parser.error("--output is required when --input is a file")
+    if not os.path.exists(args.input):
+        logger.error(f"Input not found: {args.input}")
+        return 2
+
+    try:
+        lexicons = None
+        if args.intent_lexicon:
+            from intent_tagger import load_lexicon_file, IntentError
+            try:
+                lexicons = load_lexicon_file(args.intent_lexicon)
+            except IntentError as e:
+                raise RescoreError(str(e))
+        rescorer = Rescorer(workers=args.workers, chunk_size=args.chunk_size,
+                            language=args.language, lexicons=lexicons)
+        started = time.perf_counter()
+        if from_store:
+            _score_store(rescorer, args.input, args.output, args.geo)
+        else:
+            columns, rows = _with_columns(rescorer.rescore(read_rows(args.input)))
+            if not columns:
+                raise RescoreError(f"No rows in {args.input}")
+            export_rows(rows, args.output, columns, sort_by='opportunity_score')
+    except (RescoreError, ExportError) as e:
+        logger.error(str(e))
+        return 2
+    elapsed = time.perf_counter() - started
+
+    rate = rescorer.rows / elapsed if elapsed else 0
+    print(f"♻️  Re-scored {rescorer.rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s, "
+          f"{rescorer.workers} workers); {rescorer.changed} recommendations changed")
+    print(f"💾 Output: {args.output or args.input}")
+    return 0
+
+
+def _score_store(rescorer: Rescorer, path: str, output: Optional[str], geo: Optional[str]):
+    """Re-score a keyword store: update its metrics in place, or export them."""
+    from keyword_store import KeywordStore, KeywordStoreError, QUERY_COLUMNS
+    from seasonality import SEASONALITY_FIELDS
+
+    try:
+        with KeywordStore(path) as store:
+            rows = rescorer.rescore(store.metric_rows(geo=geo))
+            if output:
+                columns = [c for c in QUERY_COLUMNS if c not in ('used', 'fetched_at')]
+                columns += SEASONALITY_FIELDS + ['intent', 'intents']
+                export_rows(rows, output, columns, sort_by='opportunity_score')
+            else:
+                for chunk in _chunks(rows, rescorer.chunk_size):
+                    store.update_scores(chunk)
+    except KeywordStoreError as e:
+        raise RescoreError(str(e))
+
+
+if __name__ == "__main__":
+    sys.exit(score_main(sys.argv[1:]))
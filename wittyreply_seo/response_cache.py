@@ -0,0 +1,459 @@
+"""
+Caches of autocomplete and trends responses: a SQLite store shared between runs
+and batch worker processes, an in-memory LRU tier for the keyword service, and a
+read-only view that serves --offline runs and records what they missed.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from run_metrics import record_cache
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = '.keyword_cache.sqlite'
+DEFAULT_TTL = 24 * 3600  # Trends data for 'today 1-m' is stale after a day
+
+
+class CacheError(Exception):
+    """Custom exception for response cache errors."""
+    pass
+
+
+class ResponseCache:
+    """Persistent key/value cache of API responses, grouped by namespace."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: Optional[float] = DEFAULT_TTL):
+        """
+        Initialize the response cache.
+
+        Args:
+            path (str): SQLite database path
+            ttl (Optional[float]): Seconds before an entry is considered stale (None = never)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open (or reopen after a fork) this process's connection."""
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' namespace TEXT NOT NULL,'
+                ' key TEXT NOT NULL,'
+                ' value TEXT,'
+                ' fetched_at REAL NOT NULL,'
+                ' PRIMARY KEY (namespace, key)'
+                ') WITHOUT ROWID'
+            )
+            connection.commit()
+        except sqlite3.Error as e:
+            raise CacheError(f"Could not open response cache at {self.path}: {e}")
+
+        self._connection = connection
+        self._pid = os.getpid()
+        return connection
+
+    def _is_fresh(self, fetched_at: float, max_age: Optional[float]) -> bool:
+        max_age = self.ttl if max_age is None else max_age
+        return max_age is None or time.time() - fetched_at <= max_age
+
+    def get_many(self, namespace: str, keys: Iterable[str],
+                 max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Look up several keys at once.
+
+        Args:
+            namespace (str): Cache namespace (e.g. 'autocomplete', 'trends')
+            keys (Iterable[str]): Keys to look up
+            max_age (Optional[float]): Override the cache TTL for this lookup
+
+        Returns:
+            Dict[str, Any]: Fresh cached values for the keys that were found
+        """
+        keys = list(keys)
+        found = self.peek_many(namespace, keys, max_age=max_age)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        record_cache('sqlite', namespace, len(found), len(keys) - len(found))
+        return found
+
+    def peek_many(self, namespace: str, keys: Iterable[str],
+                  max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Like get_many, but without counting hits and misses (used for planning)."""
+        keys = list(keys)
+        found = {}
+
+        with self._lock:
+            connection = self._connect()
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = connection.execute(
+                    f'SELECT key, value, fetched_at FROM responses '
+                    f'WHERE namespace = ? AND key IN ({placeholders})',
+                    [namespace] + chunk
+                ).fetchall()
+                for key, value, fetched_at in rows:
+                    if self._is_fresh(fetched_at, max_age):
+                        found[key] = json.loads(value)
+        return found
+
+    def get(self, namespace: str, key: str, default: Any = None,
+            max_age: Optional[float] = None) -> Any:
+        """
+        Look up a single key.
+
+        Args:
+            namespace (str): Cache namespace
+            key (str): Key to look up
+            default (Any): Value returned on a miss
+            max_age (Optional[float]): Override the cache TTL for this lookup
+
+        Returns:
+            Any: Cached value, or `default` if missing or stale
+        """
+        return self.get_many(namespace, [key], max_age=max_age).get(key, default)
+
+    def __contains__(self, item) -> bool:
+        namespace, key = item
+        return bool(self.get_many(namespace, [key]))
+
+    def scan(self, namespace: str, max_age: Optional[float] = None) -> Iterator[Tuple[str, Any, float]]:
+        """
+        Iterate over every fresh entry of a namespace, without counting hits.
+
+        Args:
+            namespace (str): Cache namespace
+            max_age (Optional[float]): Override the cache TTL for this scan
+
+        Yields:
+            Tuple[str, Any, float]: Key, value and fetch time
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT key, value, fetched_at FROM responses WHERE namespace = ?', (namespace,)
+            ).fetchall()
+        for key, value, fetched_at in rows:
+            if self._is_fresh(fetched_at, max_age):
+                yield key, json.loads(value), fetched_at
+
+    def set_many(self, namespace: str, items: Dict[str, Any]):
+        """
+        Store several values at once.
+
+        Args:
+            namespace (str): Cache namespace
+            items (Dict[str, Any]): JSON-serializable values keyed by cache key
+        """
+        if not items:
+            return
+
+        now = time.time()
+        rows = [(namespace, key, json.dumps(value), now) for key, value in items.items()]
+
+        with self._lock:
+            connection = self._connect()
+            connection.executemany(
+                'INSERT OR REPLACE INTO responses (namespace, key, value, fetched_at) '
+                'VALUES (?, ?, ?, ?)', rows
+            )
+            connection.commit()
+
+    def set(self, namespace: str, key: str, value: Any):
+        """Store a single value."""
+        self.set_many(namespace, {key: value})
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+        }
+
+    def close(self):
+        """Close this process's connection."""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def __getstate__(self):
+        # Connections and locks cannot cross process boundaries; children reconnect
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        state['_pid'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class MemoryCache:
+    """
+    In-memory LRU cache with the same interface as ResponseCache.
+
+    Used by the keyword service to keep hot responses in process. An optional
+    persistent `backing` cache is read on misses and written through on sets,
+    so a restarted service warms up from disk instead of the network.
+    """
+
+    def __init__(self, max_entries: int = 100000, ttl: Optional[float] = DEFAULT_TTL,
+                 backing: Optional[ResponseCache] = None):
+        """
+        Initialize the memory cache.
+
+        Args:
+            max_entries (int): Entries kept before the least recently used are evicted
+            ttl (Optional[float]): Seconds before an entry is considered stale (None = never)
+            backing (Optional[ResponseCache]): Persistent cache behind this one
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backing = backing
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[Any, float]]' = OrderedDict()
+
+    def _is_fresh(self, fetched_at: float, max_age: Optional[float]) -> bool:
+        max_age = self.ttl if max_age is None else max_age
+        return max_age is None or time.time() - fetched_at <= max_age
+
+    def _store(self, namespace: str, items: Dict[str, Any], fetched_at: float):
+        """Insert entries and evict the least recently used ones (caller holds the lock)."""
+        for key, value in items.items():
+            self._entries[(namespace, key)] = (value, fetched_at)
+            self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, namespace: str, keys: Iterable[str],
+                 max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Look up several keys, falling back to the backing cache on misses."""
+        keys = list(keys)
+        found = {}
+        missing = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get((namespace, key))
+                if entry is not None and self._is_fresh(entry[1], max_age):
+                    self._entries.move_to_end((namespace, key))
+                    found[key] = entry[0]
+                else:
+                    missing.append(key)
+
+        if missing and self.backing is not None:
+            loaded = self.backing.get_many(namespace, missing, max_age=max_age)
+            if loaded:
+                # Promote disk hits; their in-memory age starts now
+                with self._lock:
+                    self._store(namespace, loaded, time.time())
+                found.update(loaded)
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        record_cache('memory', namespace, len(found), len(keys) - len(found))
+        return found
+
+    def peek_many(self, namespace: str, keys: Iterable[str],
+                  max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Like get_many, but without counting, promoting or reordering entries."""
+        keys = list(keys)
+        found = {}
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get((namespace, key))
+                if entry is not None and self._is_fresh(entry[1], max_age):
+                    found[key] = entry[0]
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.backing is not None:
+            found.update(self.backing.peek_many(namespace, missing, max_age=max_age))
+        return found
+
+    def get(self, namespace: str, key: str, default: Any = None,
+            max_age: Optional[float] = None) -> Any:
+        """Look up a single key."""
+        return self.get_many(namespace, [key], max_age=max_age).get(key, default)
+
+    def __contains__(self, item) -> bool:
+        namespace, key = item
+        return bool(self.get_many(namespace, [key]))
+
+    def set_many(self, namespace: str, items: Dict[str, Any]):
+        """Store several values, writing through to the backing cache."""
+        if not items:
+            return
+        with self._lock:
+            self._store(namespace, items, time.time())
+        if self.backing is not None:
+            self.backing.set_many(namespace, items)
+
+    def set(self, namespace: str, key: str, value: Any):
+        """Store a single value."""
+        self.set_many(namespace, {key: value})
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'entries': len(self._entries),
+        }
+
+    def close(self):
+        """Drop cached entries and close the backing cache."""
+        with self._lock:
+            self._entries.clear()
+        if self.backing is not None:
+            self.backing.close()
+
+
+class OfflineCache:
+    """
+    Read-only view of a response cache for --offline runs, with the same interface.
+
+    Entries never go stale, since refetching is impossible. Lookups the cache
+    cannot answer go to an optional `fallback` (any object with peek_many, e.g.
+    keyword_store.StoreResponses), and every key neither could answer is
+    recorded per namespace, so the run can report what it had no data for.
+    """
+
+    def __init__(self, backing: Optional[ResponseCache], fallback: Optional[Any] = None):
+        """
+        Initialize the offline cache.
+
+        Args:
+            backing (Optional[ResponseCache]): Cache of earlier online runs (None if
+                there is none, so only `fallback` answers)
+            fallback (Optional[Any]): Second source with peek_many(namespace, keys)
+        """
+        self.backing = backing
+        self.fallback = fallback
+        self.hits = 0
+        self.misses = 0
+        self.missed: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, namespace: str, keys: Iterable[str],
+                 max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Look up several keys (regardless of age), recording the misses."""
+        keys = list(keys)
+        found = self.peek_many(namespace, keys)
+        missing = [key for key in keys if key not in found]
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(missing)
+            if missing:
+                self.missed.setdefault(namespace, set()).update(missing)
+        record_cache('offline', namespace, len(found), len(missing))
+        return found
+
+    def peek_many(self, namespace: str, keys: Iterable[str],
+                  max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Like get_many, but without counting or recording misses."""
+        keys = list(keys)
+        found = {}
+        if self.backing is not None:
+            found = self.backing.peek_many(namespace, keys, max_age=float('inf'))
+        missing = [key for key in keys if key not in found]
+        if missing and self.fallback is not None:
+            found.update(self.fallback.peek_many(namespace, missing))
+        return found
+
+    def get(self, namespace: str, key: str, default: Any = None,
+            max_age: Optional[float] = None) -> Any:
+        """Look up a single key."""
+        return self.get_many(namespace, [key]).get(key, default)
+
+    def __contains__(self, item) -> bool:
+        namespace, key = item
+        return bool(self.get_many(namespace, [key]))
+
+    def scan(self, namespace: str, max_age: Optional[float] = None) -> Iterator[Tuple[str, Any, float]]:
+        """Every entry of a namespace in the backing cache, regardless of age."""
+        if self.backing is None:
+            return iter(())
+        return self.backing.scan(namespace, max_age=float('inf'))
+
+    def set_many(self, namespace: str, items: Dict[str, Any]):
+        """Ignored: nothing is fetched offline, and the backing cache is never written."""
+
+    def set(self, namespace: str, key: str, value: Any):
+        """Ignored, like set_many."""
+
+    def miss_counts(self) -> Dict[str, int]:
+        """Distinct keys missed per namespace."""
+        with self._lock:
+            return {namespace: len(keys) for namespace, keys in sorted(self.missed.items())}
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and distinct misses per namespace."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'missed': self.miss_counts(),
+        }
+
+    def close(self):
+        """Close the backing cache and fallback."""
+        if self.backing is not None:
+            self.backing.close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+
+# Cache used by the fetch functions of this process (None = caching disabled)
+_response_cache = None
+
+
+def install_response_cache(cache):
+    """
+    Enable (or with None, disable) response caching for this process.
+
+    Args:
+        cache (Optional[ResponseCache | MemoryCache]): Cache to use for subsequent requests
+    """
+    global _response_cache
+    _response_cache = cache
+
+
+def get_response_cache():
+    """Return the response cache installed in this process, if any."""
+    return _response_cache
@@ -0,0 +1,330 @@
+"""
+Run instrumentation: per-stage wall time, request latency histograms, sleeps,
+retries and cache hit rates. Exported as a JSON run summary or a Prometheus
+textfile for the node exporter's textfile collector.
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = 'keyword_tool'
+
+
+class StageTimer:
+    """Handle yielded by RunMetrics.stage(); set `items` to report throughput."""
+
+    def __init__(self):
+        self.items: Optional[int] = None
+
+
+class RunMetrics:
+    """Thread-safe collector for one run (or one service process)."""
+
+    def __init__(self, buckets: tuple = DEFAULT_LATENCY_BUCKETS):
+        """
+        Initialize the collector.
+
+        Args:
+            buckets (tuple): Latency histogram bucket upper bounds, in seconds
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.requests: Dict[str, Dict] = {}
+        self.sleep_seconds: Dict[str, float] = {}
+        self.retries: Dict[str, int] = {}
+        self.cache: Dict[str, Dict[str, int]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a pipeline stage.
+
+        Args:
+            name (str): Stage name (e.g. 'autocomplete', 'trends', 'export')
+
+        Yields:
+            StageTimer: Set `.items` to the number of keywords handled
+        """
+        timer = StageTimer()
+        started = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'items': 0})
+                stage['seconds'] += elapsed
+                stage['calls'] += 1
+                stage['items'] += timer.items or 0
+
+    def observe_request(self, endpoint: str, seconds: float, ok: bool = True):
+        """Record one outbound request and its latency."""
+        with self._lock:
+            record = self.requests.setdefault(endpoint, {
+                'count': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                'bucket_counts': [0] * (len(self.buckets) + 1),
+            })
+            record['count'] += 1
+            record['errors'] += 0 if ok else 1
+            record['seconds'] += seconds
+            record['max_seconds'] = max(record['max_seconds'], seconds)
+            record['bucket_counts'][bisect.bisect_left(self.buckets, seconds)] += 1
+
+    @contextmanager
+    def request(self, endpoint: str):
+        """Time an outbound request; an exception counts it as an error."""
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.observe_request(endpoint, time.perf_counter() - started, ok)
+
+    def record_sleep(self, reason: str, seconds: float):
+        """Record time spent waiting (rate limits, politeness delays)."""
+        if seconds <= 0:
+            return
+        with self._lock:
+            self.sleep_seconds[reason] = self.sleep_seconds.get(reason, 0.0) + seconds
+
+    def record_retry(self, endpoint: str):
+        """Record a retry or client re-initialization."""
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def record_cache(self, tier: str, namespace: str, hits: int, misses: int):
+        """Record a cache lookup outcome."""
+        with self._lock:
+            counts = self.cache.setdefault(f"{tier}:{namespace}", {'hits': 0, 'misses': 0})
+            counts['hits'] += hits
+            counts['misses'] += misses
+
+    def summary(self, **extra) -> Dict:
+        """
+        Build the JSON-serializable run summary.
+
+        Args:
+            **extra: Additional top-level fields (e.g. keyword counts, status)
+
+        Returns:
+            Dict: Run summary
+        """
+        with self._lock:
+            wall = time.time() - self.started_at
+            stages = {}
+            for name, stage in self.stages.items():
+                stages[name] = {
+                    'seconds': round(stage['seconds'], 4),
+                    'calls': stage['calls'],
+                    'items': stage['items'],
+                    'items_per_second': round(stage['items'] / stage['seconds'], 2)
+                    if stage['items'] and stage['seconds'] > 0 else None,
+                }
+
+            requests = {}
+            for endpoint, record in self.requests.items():
+                cumulative, histogram = 0, {}
+                for bound, count in zip(list(self.buckets) + ['+Inf'], record['bucket_counts']):
+                    cumulative += count
+                    histogram[str(bound)] = cumulative
+                requests[endpoint] = {
+                    'count': record['count'],
+                    'errors': record['errors'],
+                    'seconds': round(record['seconds'], 4),
+                    'mean_seconds': round(record['seconds'] / record['count'], 4),
+                    'max_seconds': round(record['max_seconds'], 4),
+                    'latency_buckets': histogram,
+                }
+
+            cache = {}
+            for name, counts in self.cache.items():
+                lookups = counts['hits'] + counts['misses']
+                cache[name] = dict(counts, hit_rate=round(counts['hits'] / lookups, 4)
+                                   if lookups else None)
+
+            summary = {
+                'started_at': self.started_at,
+                'wall_seconds': round(wall, 4),
+                'stages': stages,
+                'requests': requests,
+                'sleep_seconds': {k: round(v, 4) for k, v in self.sleep_seconds.items()},
+                'retries': dict(self.retries),
+                'cache': cache,
+            }
+
+        summary.update(extra)
+        keywords = extra.get('keywords')
+        if keywords and wall > 0:
+            summary['keywords_per_second'] = round(keywords / wall, 2)
+        return summary
+
+    def write_json(self, path: str, **extra):
+        """Write the run summary as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(**extra), f, indent=2)
+        logger.info(f"Run summary written to {path}")
+
+    def prometheus_text(self, **extra) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        summary = self.summary(**extra)
+        p = METRIC_PREFIX
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]):
+            if not samples:
+                return
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value, *suffix in samples:
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels.items())
+                series = f"{p}_{name}{suffix[0] if suffix else ''}"
+                lines.append(f"{series}{{{label_text}}} {value}" if label_text else f"{series} {value}")
+
+        metric('run_wall_seconds', 'gauge', 'Wall time of the run.',
+               [({}, summary['wall_seconds'])])
+        metric('last_run_timestamp_seconds', 'gauge', 'Unix time the run started.',
+               [({}, round(summary['started_at'], 3))])
+        metric('stage_seconds', 'gauge', 'Wall time spent per pipeline stage.',
+               [({'stage': n}, s['seconds']) for n, s in summary['stages'].items()])
+        metric('stage_items', 'gauge', 'Keywords handled per pipeline stage.',
+               [({'stage': n}, s['items']) for n, s in summary['stages'].items()])
+
+        request_samples, histogram_samples = [], []
+        for endpoint, record in summary['requests'].items():
+            request_samples.append(({'endpoint': endpoint, 'status': 'ok'},
+                                    record['count'] - record['errors']))
+            request_samples.append(({'endpoint': endpoint, 'status': 'error'}, record['errors']))
+            for bound, count in record['latency_buckets'].items():
+                histogram_samples.append(({'endpoint': endpoint, 'le': bound}, count, '_bucket'))
+            histogram_samples.append(({'endpoint': endpoint}, record['seconds'], '_sum'))
+            histogram_samples.append(({'endpoint': endpoint}, record['count'], '_count'))
+        metric('requests_total', 'counter', 'Outbound requests by endpoint and outcome.',
+               request_samples)
+        metric('request_duration_seconds', 'histogram', 'Outbound request latency.',
+               histogram_samples)
+
+        metric('sleep_seconds_total', 'counter', 'Time spent sleeping for rate limits.',
+               [({'reason': r}, s) for r, s in summary['sleep_seconds'].items()])
+        metric('retries_total', 'counter', 'Retries and client re-initializations.',
+               [({'endpoint': e}, c) for e, c in summary['retries'].items()])
+
+        cache_samples = []
+        for name, counts in summary['cache'].items():
+            tier, namespace = name.split(':', 1)
+            cache_samples.append(({'tier': tier, 'namespace': namespace, 'result': 'hit'},
+                                  counts['hits']))
+            cache_samples.append(({'tier': tier, 'namespace': namespace, 'result': 'miss'},
+                                  counts['misses']))
+        metric('cache_lookups_total', 'counter', 'Response cache lookups.', cache_samples)
+
+        if 'keywords' in summary:
+            metric('keywords', 'gauge', 'Keywords exported by the run.',
+                   [({}, summary['keywords'])])
+        if summary.get('keywords_per_second') is not None:
+            metric('keywords_per_second', 'gauge', 'Exported keywords per second of wall time.',
+                   [({}, summary['keywords_per_second'])])
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str, **extra):
+        """
+        Write a Prometheus textfile atomically (the collector may read at any time).
+
+        Args:
+            path (str): Output .prom file
+            **extra: Additional summary fields (e.g. keywords)
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.metrics_', suffix='.prom.tmp', dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text(**extra))
+        os.replace(tmp_path, path)
+        logger.info(f"Prometheus metrics written to {path}")
+
+
+# Collector used by this process
+_metrics = RunMetrics()
+
+
+def install_metrics(metrics: RunMetrics):
+    """
+    Replace the metrics collector used by this process.
+
+    Args:
+        metrics (RunMetrics): Collector for subsequent stages and requests
+    """
+    global _metrics
+    _metrics = metrics
+
+
+def get_metrics() -> RunMetrics:
+    """Return the metrics collector used by this process."""
+    return _metrics
+
+
+def stage(name: str):
+    """Time a stage on the installed collector (context manager)."""
+    return _metrics.stage(name)
+
+
+def timed_request(endpoint: str):
+    """Time an outbound request on the installed collector (context manager)."""
+    return _metrics.request(endpoint)
+
+
+def metered_sleep(reason: str, seconds: float):
+    """Sleep and record the time spent."""
+    if seconds > 0:
+        time.sleep(seconds)
+        _metrics.record_sleep(reason, seconds)
+
+
+def record_sleep(reason: str, seconds: float):
+    """Record a sleep that already happened."""
+    _metrics.record_sleep(reason, seconds)
+
+
+def record_retry(endpoint: str):
+    """Record a retry or client re-initialization."""
+    _metrics.record_retry(endpoint)
+
+
+def record_cache(tier: str, namespace: str, hits: int, misses: int):
+    """Record a cache lookup outcome."""
+    _metrics.record_cache(tier, namespace, hits, misses)
+
+
+def instrumented_stage(name: str):
+    """
+    Decorator timing a method as a pipeline stage.
+
+    The length of the return value (when it has one) is reported as the stage's items.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _metrics.stage(name) as timer:
+                result = func(*args, **kwargs)
+                if hasattr(result, '__len__'):
+                    timer.items = len(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,249 @@
+"""
+Vectorized seasonality analysis of monthly trend series.
+
+All keywords' series are stacked into one 2-D array and decomposed together
+into a linear trend, a seasonal component (the yearly cycle) and the
+remainder. From these come each keyword's trend slope, seasonality strength,
+peak month and volatility.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SEASONALITY_FIELDS = ['trend_slope', 'seasonality_strength', 'peak_month', 'volatility']
+SEASONAL_PERIODS = (12,)    # Cycle lengths in months; a year of data cannot support 6-month harmonics
+MIN_POINTS = 3              # Series shorter than this get no profile
+SEASONAL_MIN_POINTS = 12    # A full year is needed to tell a season from noise
+RIDGE = 1e-9                # Regularization of the batched least-squares fit
+
+
+class SeasonalityError(Exception):
+    """Custom exception for seasonality analysis errors."""
+    pass
+
+
+def stack_series(series: Sequence[Optional[Sequence[float]]]) -> np.ndarray:
+    """
+    Stack monthly series into one array.
+
+    Series end in the same (latest) month, so shorter ones are left-padded;
+    missing months and padding are NaN.
+
+    Args:
+        series (Sequence[Optional[Sequence[float]]]): Monthly values per keyword (None if unknown)
+
+    Returns:
+        np.ndarray: Array of shape (keywords, longest series)
+    """
+    width = max((len(values) for values in series if values), default=0)
+    matrix = np.full((len(series), width), np.nan)
+    for row, values in enumerate(series):
+        if values:
+            matrix[row, width - len(values):] = np.asarray(values, dtype=float)
+    return matrix
+
+
+def design(t: np.ndarray, width: int) -> np.ndarray:
+    """
+    Regressors at (possibly fractional or future) month positions.
+
+    Args:
+        t (np.ndarray): Month positions, 0 = first column of a `width`-month array
+        width (int): Number of columns the model was fitted on
+
+    Returns:
+        np.ndarray: t.shape + (terms,): level, linear trend, then a cosine and
+        sine per seasonal period
+    """
+    t = np.asarray(t, dtype=float)
+    columns = [np.ones_like(t), t - (width - 1) / 2]
+    for period in SEASONAL_PERIODS:
+        columns += [np.cos(2 * np.pi * t / period), np.sin(2 * np.pi * t / period)]
+    return np.stack(columns, axis=-1)
+
+
+def fit(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Fit trend + yearly cycle to every row of a stacked series array at once.
+
+    Missing months weigh nothing, and rows with fewer than SEASONAL_MIN_POINTS
+    months fit a trend line only (their seasonal coefficients are 0). The
+    normal equations of all rows are solved as one batch.
+
+    Args:
+        matrix (np.ndarray): Array from stack_series
+
+    Returns:
+        Dict[str, np.ndarray]: 'coefficients' (rows x terms, see design), the
+        'fitted' and 'seasonal' components and NaN-free 'values' (rows x months),
+        the 'valid' mask, month 'count', mean 'level' and 'full_year' mask
+    """
+    if matrix.ndim != 2:
+        raise SeasonalityError(f"Expected a 2-D series array, got {matrix.ndim} dimensions")
+    rows, width = matrix.shape
+
+    valid = ~np.isnan(matrix)
+    count = valid.sum(axis=1)
+    values = np.where(valid, matrix, 0.0)
+    level = values.sum(axis=1) / np.maximum(count, 1)
+    full_year = count >= SEASONAL_MIN_POINTS
+
+    regressors = design(np.arange(width), width)
+    weights = valid[:, :, None] * regressors[None, :, :]
+    weights[~full_year, :, 2:] = 0.0
+    normal = np.einsum('rti,rtj->rij', weights, weights)
+    normal += np.eye(regressors.shape[1]) * RIDGE  # Keeps unfitted (all-zero) terms solvable
+    target = np.einsum('rti,rt->ri', weights, values)
+    coefficients = np.linalg.solve(normal, target[:, :, None])[:, :, 0]
+
+    return {
+        'coefficients': coefficients,
+        'fitted': coefficients @ regressors.T,
+        'seasonal': coefficients[:, 2:] @ regressors[:, 2:].T,
+        'values': values,
+        'valid': valid,
+        'count': count,
+        'level': level,
+        'full_year': full_year,
+    }
+
+
+def decompose(matrix: np.ndarray, end_month: Optional[Union[int, np.ndarray]] = None,
+              model: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """
+    Seasonality profile of every row of a stacked series array.
+
+    Each row is split into trend + seasonal + remainder by one least-squares
+    fit of a line and the yearly cycle (fitting them jointly keeps
+    a season from reading as a trend within a single year). The normal
+    equations of all rows are solved as one batch. Per row, with NaN months
+    left out:
+
+    - trend_slope: fitted slope as a fraction of the mean level per month
+      (0.05 = growing by 5% of average interest each month)
+    - seasonality_strength: 1 - Var(remainder) / Var(seasonal + remainder), 0-1;
+      with one year of data, pure noise scores about 0.25
+    - peak_month: calendar month (1-12) where the seasonal component peaks
+    - volatility: standard deviation of the remainder as a fraction of the mean level
+
+    Rows with fewer than MIN_POINTS months or no interest get NaN throughout.
+    Seasonal cycles are only fitted with SEASONAL_MIN_POINTS months; other rows
+    get a trend line only and NaN seasonality_strength and peak_month.
+
+    Args:
+        matrix (np.ndarray): Array from stack_series
+        end_month (Optional[Union[int, np.ndarray]]): Calendar month of the last
+            column, or one per row (current month if None)
+        model (Optional[Dict[str, np.ndarray]]): fit(matrix), if already computed
+
+    Returns:
+        Dict[str, np.ndarray]: One array per SEASONALITY_FIELDS entry
+    """
+    end_month = datetime.now().month if end_month is None else end_month
+    model = model or fit(matrix)
+    rows, width = matrix.shape
+    coefficients, valid, values = model['coefficients'], model['valid'], model['values']
+    count, level, full_year = model['count'], model['level'], model['full_year']
+    safe_count = np.maximum(count, 1)
+
+    seasonal = model['seasonal']
+    remainder = np.where(valid, values - model['fitted'], 0.0)
+
+    # Strength from sums of squares around each row's mean over its valid months
+    seasonal_mean = seasonal.sum(axis=1) / safe_count
+    seasonal_var = (np.where(valid, seasonal - seasonal_mean[:, None], 0.0) ** 2).sum(axis=1)
+    remainder_var = (remainder ** 2).sum(axis=1)
+    combined = seasonal_var + remainder_var
+    # A series the trend line explains exactly has no season, only rounding noise
+    tolerance = 1e-9 * (values ** 2).sum(axis=1)
+    strength = np.divide(seasonal_var, combined, out=np.zeros(rows), where=combined > tolerance)
+    strength = np.where(full_year, strength, np.nan)
+
+    # Peak of the fitted cycle over one year of columns ending at the last column
+    if width >= 12:
+        year = design(np.arange(width - 12, width), width)[:, 2:]
+        peak_index = np.argmax(coefficients[:, 2:] @ year.T, axis=1) + width - 12
+        peak_month = (end_month - (width - 1 - peak_index) - 1) % 12 + 1.0
+        peak_month = np.where(full_year & (strength > 0), peak_month, np.nan)
+    else:
+        peak_month = np.full(rows, np.nan)
+
+    spread = np.sqrt(remainder_var / safe_count)
+    usable = (count >= MIN_POINTS) & (level > 0)
+    safe_level = np.where(usable, level, 1.0)
+    profile = {
+        'trend_slope': coefficients[:, 1] / safe_level,
+        'seasonality_strength': strength,
+        'peak_month': peak_month,
+        'volatility': spread / safe_level,
+    }
+    return {field: np.where(usable, column, np.nan) for field, column in profile.items()}
+
+
+def seasonality_profiles(series: Sequence[Optional[Sequence[float]]],
+                         end_month: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Seasonality profile per series, as plain Python values.
+
+    Args:
+        series (Sequence[Optional[Sequence[float]]]): Monthly values per keyword
+        end_month (Optional[int]): Calendar month of the latest value (current month if None)
+
+    Returns:
+        List[Dict[str, Any]]: SEASONALITY_FIELDS per series (None where unknown)
+    """
+    if not series:
+        return []
+    columns = decompose(stack_series(series), end_month)
+    return to_records({field: column.round(4) for field, column in columns.items()})
+
+
+def to_records(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """
+    Turn equal-length result columns into one dict per row.
+
+    NaN becomes None and peak_month an int.
+
+    Args:
+        columns (Dict[str, np.ndarray]): Result arrays by field name
+
+    Returns:
+        List[Dict[str, Any]]: Rows with the fields in column order
+    """
+    converted = []
+    for field, column in columns.items():
+        cast = int if field == 'peak_month' else float
+        # "+ 0" turns the -0.0 that rounding leaves into 0.0
+        converted.append([None if value != value else cast(value) + 0 for value in column.tolist()])
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*converted)]
+
+
+def apply_seasonality(metrics: Iterable[Any], end_month: Optional[int] = None) -> int:
+    """
+    Set the seasonality fields of keyword metrics from their seasonal_trend.
+
+    Args:
+        metrics (Iterable[KeywordMetrics]): Metrics to update in place
+        end_month (Optional[int]): Calendar month of the latest value (current month if None)
+
+    Returns:
+        int: Number of metrics that got a profile
+    """
+    metrics = list(metrics)
+    profiles = seasonality_profiles([metric.seasonal_trend for metric in metrics], end_month)
+    profiled = 0
+    for metric, profile in zip(metrics, profiles):
+        for field, value in profile.items():
+            setattr(metric, field, value)
+        if profile['trend_slope'] is not None:
+            profiled += 1
+    logger.debug(f"Computed seasonality profiles for {profiled}/{len(metrics)} keywords")
+    return profiled
@@ -0,0 +1,276 @@
+"""
+Streaming seed reader for very large seed files (e.g. Search Console query exports).
+Seeds are normalized and de-duplicated on the fly with bounded memory: a Bloom
+filter answers "definitely new" for most seeds and an on-disk set confirms the rest.
+"""
+
+import os
+import math
+import shutil
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import unicodedata
+from typing import FrozenSet, Iterator, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BLOOM_ERROR_RATE = 0.01
+MAX_BLOOM_BYTES = 64 * 1024 * 1024  # Above this the false-positive rate rises instead
+BYTES_PER_SEED_ESTIMATE = 20        # Used to size the filter from the file size
+DISK_BATCH_SIZE = 10000
+MEMORY_KEYS = 100000                # Distinct seeds de-duplicated exactly in memory before spilling
+
+
+class SeedReaderError(Exception):
+    """Custom exception for seed file errors."""
+    pass
+
+
+def normalize_seed(text: str) -> str:
+    """
+    Normalize a raw seed: Unicode NFKC, surrounding quotes removed, whitespace collapsed.
+
+    Args:
+        text (str): Raw seed text
+
+    Returns:
+        str: Normalized seed ('' if nothing is left)
+    """
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+    return ' '.join(text.strip().strip('"\'').split())
+
+
+def seed_key(seed: str) -> str:
+    """Dedup key of a normalized seed (case-insensitive)."""
+    return seed.casefold()
+
+
+def keyword_tokens(text: str, language: str = 'en') -> FrozenSet[str]:
+    """Order-independent token set of a keyword (see keyword_dedup.normalize_tokens)."""
+    # keyword_dedup pulls in NumPy, so it is only imported once tokens are needed
+    from keyword_dedup import normalize_tokens
+    return frozenset(normalize_tokens(text, language))
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives)."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE,
+                 max_bytes: int = MAX_BLOOM_BYTES):
+        """
+        Initialize the Bloom filter.
+
+        Args:
+            capacity (int): Expected number of items
+            error_rate (float): Target false-positive rate at capacity
+            max_bytes (int): Upper bound on the bit array size
+        """
+        capacity = max(capacity, 1)
+        bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.size = min(max(bits, 64), max_bytes * 8)
+        self.hashes = min(max(1, round(self.size / capacity * math.log(2))), 16)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> List[int]:
+        # Double hashing: two 64-bit halves of one digest give all k positions
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        return [(first + i * second) % size for i in range(self.hashes)]
+
+    def add(self, item: str) -> bool:
+        """
+        Add an item.
+
+        Args:
+            item (str): Item to add
+
+        Returns:
+            bool: True if the item may have been added before (all bits were already set)
+        """
+        bits = self._bits
+        seen = True
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                seen = False
+                bits[position >> 3] |= mask
+        return seen
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+class DiskSeenSet:
+    """Set of strings kept in a temporary SQLite file, written in batches."""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize the on-disk set.
+
+        Args:
+            directory (Optional[str]): Parent directory for the temporary database
+        """
+        self._directory = tempfile.mkdtemp(prefix='seed_dedup_', dir=directory)
+        self._connection = sqlite3.connect(os.path.join(self._directory, 'seen.sqlite'))
+        self._connection.execute('PRAGMA journal_mode=OFF')
+        self._connection.execute('PRAGMA synchronous=OFF')
+        self._connection.execute('CREATE TABLE seen (key TEXT PRIMARY KEY) WITHOUT ROWID')
+        self._pending = set()
+
+    def add(self, key: str):
+        self._pending.add(key)
+        if len(self._pending) >= DISK_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._connection.executemany('INSERT OR IGNORE INTO seen VALUES (?)',
+                                         ((key,) for key in self._pending))
+            self._connection.commit()
+            self._pending.clear()
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._pending:
+            return True
+        return self._connection.execute('SELECT 1 FROM seen WHERE key = ?', (key,)).fetchone() is not None
+
+    def close(self):
+        """Close and delete the database."""
+        self._connection.close()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+
+class SeedDeduplicator:
+    """
+    Memory-bounded exact dedup.
+
+    The first `memory_keys` distinct seeds are kept in an in-memory set, which
+    is all most files need. Past that, a Bloom filter in front of an on-disk set
+    takes over: seeds the filter has never seen are new without touching the
+    disk, and only filter hits (duplicates plus ~1% false positives) are
+    confirmed on disk. The in-memory set stays as an exact cache of early seeds.
+    """
+
+    def __init__(self, capacity: int, directory: Optional[str] = None,
+                 memory_keys: int = MEMORY_KEYS):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            capacity (int): Expected number of distinct seeds (sizes the Bloom filter)
+            directory (Optional[str]): Where the on-disk set is created
+            memory_keys (int): Distinct seeds kept in memory before spilling to disk
+        """
+        self.capacity = capacity
+        self.directory = directory
+        self.memory_keys = memory_keys
+        self.bloom: Optional[BloomFilter] = None
+        self.disk: Optional[DiskSeenSet] = None
+        self.disk_checks = 0
+        self._memory = set()
+
+    def _spill(self):
+        """Switch to the Bloom filter and on-disk set once memory is full."""
+        logger.info(f"More than {self.memory_keys} distinct keywords; de-duplicating on disk")
+        self.bloom = BloomFilter(max(self.capacity, self.memory_keys * 2))
+        self.disk = DiskSeenSet(self.directory)
+        for key in self._memory:
+            self.bloom.add(key)
+            self.disk.add(key)
+
+    def add(self, key: str) -> bool:
+        """
+        Record a key.
+
+        Args:
+            key (str): Dedup key
+
+        Returns:
+            bool: True if the key was not seen before
+        """
+        if key in self._memory:
+            return False
+        if self.disk is None:
+            if len(self._memory) < self.memory_keys:
+                self._memory.add(key)
+                return True
+            self._spill()
+
+        if self.bloom.add(key):
+            self.disk_checks += 1
+            if key in self.disk:
+                return False
+        self.disk.add(key)
+        return True
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+
+class SeedStream:
+    """
+    Lazily read, normalized and de-duplicated seeds from a file.
+
+    Iterating reads the file line by line (comma-separated seeds per line,
+    '#' comments and blank lines skipped), so the first seed is available
+    immediately and memory does not grow with the file. The stream can be
+    iterated again; each pass re-reads the file. Counters describe the last pass.
+    """
+
+    def __init__(self, path: str, dedup: bool = True, workdir: Optional[str] = None):
+        """
+        Initialize the seed stream.
+
+        Args:
+            path (str): Seeds file path
+            dedup (bool): Drop repeated seeds (case-insensitive)
+            workdir (Optional[str]): Directory for the temporary dedup database
+
+        Raises:
+            SeedReaderError: If the file does not exist
+        """
+        if not os.path.exists(path):
+            raise SeedReaderError(f"Seeds file not found: {path}")
+        self.path = path
+        self.dedup = dedup
+        self.workdir = workdir
+        self.count = 0
+        self.duplicates = 0
+        self.lines = 0
+
+    def __iter__(self) -> Iterator[str]:
+        self.count = self.duplicates = self.lines = 0
+        deduplicator = None
+        if self.dedup:
+            capacity = os.path.getsize(self.path) // BYTES_PER_SEED_ESTIMATE
+            deduplicator = SeedDeduplicator(capacity, self.workdir)
+
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    self.lines += 1
+                    line = line.strip()
+                    if not line or line.startswith('#'):  # Skip empty lines and comments
+                        continue
+                    for raw in line.split(','):
+                        seed = normalize_seed(raw)
+                        if not seed:
+                            continue
+                        if deduplicator is not None and not deduplicator.add(seed_key(seed)):
+                            self.duplicates += 1
+                            continue
+                        self.count += 1
+                        yield seed
+        finally:
+            if deduplicator is not None:
+                deduplicator.close()
+            logger.info(f"Read {self.count} seed keywords from {self.path} "
+                        f"({self.duplicates} duplicates skipped)")
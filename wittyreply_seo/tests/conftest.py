@@ -0,0 +1,6 @@
+"""Test setup: the tool's modules are imported flat, as main.py imports them."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,53 @@
+"""Tests for the disk-spilling crawl frontier."""
+
+import os
+import random
+from collections import deque
+
+from crawl_frontier import CrawlFrontier
+
+
+def test_frontier_keeps_fifo_order_across_spills(tmp_path):
+    rng = random.Random(7)
+    expected = deque()
+    popped, pushed = [], 0
+    with CrawlFrontier(memory_items=20, directory=str(tmp_path), capacity=5000) as frontier:
+        for step in range(5000):
+            if rng.random() < 0.6:
+                keyword = f"keyword {pushed}"
+                pushed += 1
+                assert frontier.push(keyword, step % 4)
+                expected.append((keyword, step % 4))
+            else:
+                item = frontier.pop()
+                assert item == (expected.popleft() if expected else None)
+            assert len(frontier) == len(expected)
+        while True:
+            item = frontier.pop()
+            if item is None:
+                break
+            popped.append(item)
+        spilled = frontier.spilled
+
+    assert popped == list(expected)
+    assert spilled > 0
+
+
+def test_frontier_admits_each_keyword_once_even_after_it_was_popped(tmp_path):
+    with CrawlFrontier(memory_items=10, directory=str(tmp_path)) as frontier:
+        assert [frontier.push(f"k{i % 30}", 0) for i in range(60)] == [True] * 30 + [False] * 30
+        while frontier.pop() is not None:
+            pass
+        assert not frontier.push('k3', 1)
+        assert frontier.queued == 30
+
+
+def test_closing_the_frontier_removes_its_temporary_files(tmp_path):
+    frontier = CrawlFrontier(memory_items=4, directory=str(tmp_path))
+    for i in range(100):
+        frontier.push(f"k{i}", 0)
+    assert os.listdir(tmp_path)
+
+    frontier.close()
+
+    assert os.listdir(tmp_path) == []
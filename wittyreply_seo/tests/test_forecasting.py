@@ -0,0 +1,51 @@
+"""Tests for batched interest forecasts and the series they read."""
+
+import pytest
+
+from forecasting import ForecastError, forecast_series, load_cached_series
+from keyword_store import KeywordStore
+from response_cache import ResponseCache
+
+STORED = [10.0 + month for month in range(12)]
+CACHED = [50.0] * 12
+
+
+def test_store_and_cache_yield_each_keyword_once_preferring_the_store(tmp_path):
+    store_path, cache_path = str(tmp_path / 'keywords.sqlite'), str(tmp_path / 'cache.sqlite')
+    with KeywordStore(store_path) as store:
+        run_id = store.start_run('test')
+        store.record_rows(run_id, [{'keyword': 'ski rental', 'seasonal_trend': STORED}], 'US')
+    cache = ResponseCache(cache_path)
+    cache.set_many('seasonal', {'US|ski rental': CACHED, 'FR|ski rental': CACHED, 'US|sled': CACHED})
+    cache.close()
+
+    entries = load_cached_series(store_path, cache_path)
+
+    series = {(entry['keyword'], entry['geo']): entry['points'] for entry in entries}
+    assert len(entries) == 3
+    assert series == {('ski rental', 'US'): STORED, ('ski rental', 'FR'): CACHED, ('sled', 'US'): CACHED}
+
+
+def test_a_source_is_required():
+    with pytest.raises(ForecastError):
+        load_cached_series()
+
+
+def test_linear_series_is_forecast_along_its_trend():
+    now = 1760000000.0
+    row = forecast_series([STORED], weeks=[4, 8], fetched_at=[now], now=now)[0]
+
+    assert row['forecast_4w'] > STORED[-1]
+    assert row['forecast_8w'] > row['forecast_4w']
+    assert row['forecast_change'] > 0
+
+
+def test_short_series_get_no_forecast():
+    row = forecast_series([[5.0, 6.0]], weeks=[4])[0]
+
+    assert row['forecast_4w'] is None and row['forecast_change'] is None
+
+
+def test_invalid_horizons_are_rejected():
+    with pytest.raises(ForecastError):
+        forecast_series([STORED], weeks=[0])
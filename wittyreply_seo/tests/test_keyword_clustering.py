@@ -0,0 +1,22 @@
+"""Tests for copying centroid results to cluster members."""
+
+from fetch_trends_api import KeywordAnalyzer, KeywordMetrics
+from keyword_clustering import KeywordCluster, propagate_metrics
+
+
+def test_members_share_fetched_metrics_but_are_scored_on_their_own_text():
+    analyzer = KeywordAnalyzer(None)
+    centroid = KeywordMetrics(keyword='whatsapp web pricing', search_volume=2000,
+                              competition='LOW', competition_score=0.2, cpc_low=0.5, cpc_high=1.5)
+    analyzer.rescore([centroid])
+    cluster = KeywordCluster(0, 'whatsapp web pricing', ['whatsapp web pricing', 'whatsapp web login'])
+
+    metrics = propagate_metrics([centroid], [cluster], analyzer)
+
+    assert [metric.keyword for metric in metrics] == ['whatsapp web pricing', 'whatsapp web login']
+    member = metrics[1]
+    assert member.propagated_from == 'whatsapp web pricing'
+    assert (member.search_volume, member.competition_score, member.cpc_high) == (2000, 0.2, 1.5)
+    assert 'commercial' in centroid.intents
+    assert 'commercial' not in member.intents
+    assert member.opportunity_score < centroid.opportunity_score
@@ -0,0 +1,72 @@
+"""Tests for MinHash/LSH near-duplicate detection."""
+
+import numpy as np
+import pytest
+
+from keyword_dedup import (
+    DedupError, NearDuplicateDetector, _optimal_bands, deduplicate_near_duplicates, normalize_tokens
+)
+
+
+def test_normalize_tokens_folds_case_accents_plurals_and_stopwords():
+    assert normalize_tokens("Tools for WhatsApp") == {'tool', 'whatsapp'}
+    assert normalize_tokens("Réponses automatiques", language='fr') == normalize_tokens("reponses automatique")
+
+
+def test_normalize_tokens_keeps_keywords_made_only_of_stopwords():
+    assert normalize_tokens("for the") == {"for", "the"}
+
+
+def test_optimal_bands_split_the_signature():
+    bands, rows = _optimal_bands(0.8, 64)
+    assert bands * rows == 64
+    assert abs((1.0 / bands) ** (1.0 / rows) - 0.8) < 0.1
+
+
+def test_word_order_and_plural_variants_collapse_to_one_cluster():
+    clusters = deduplicate_near_duplicates([
+        "whatsapp automation tool",
+        "whatsapp automation tools",
+        "tools whatsapp automation",
+        "crypto jobs remote",
+    ])
+
+    assert len(clusters) == 2
+    assert sorted(clusters["whatsapp automation tool"]) == [
+        "tools whatsapp automation", "whatsapp automation tool", "whatsapp automation tools"
+    ]
+    assert clusters["crypto jobs remote"] == ["crypto jobs remote"]
+
+
+def test_preferred_keywords_become_representatives():
+    clusters = deduplicate_near_duplicates(
+        ["whatsapp automation tool", "whatsapp automation tools"], prefer=["WhatsApp automation tools"]
+    )
+    assert list(clusters) == ["whatsapp automation tools"]
+
+
+def test_dissimilar_keywords_are_not_merged():
+    keywords = [f"keyword {i} topic {i * 7}" for i in range(200)]
+    clusters = NearDuplicateDetector(threshold=0.8, chunk_size=16).cluster(keywords)
+    assert len(clusters) == len(keywords)
+
+
+def test_blank_and_repeated_keywords_are_ignored():
+    assert deduplicate_near_duplicates(["", "  ", "bot", "bot"]) == {"bot": ["bot"]}
+
+
+def test_threshold_is_validated():
+    with pytest.raises(DedupError):
+        NearDuplicateDetector(threshold=0)
+
+
+def test_duplicates_behind_a_false_positive_bucket_leader_are_merged():
+    detector = NearDuplicateDetector(threshold=0.8)
+    # Every keyword lands in the same buckets, as if LSH collided on all of them
+    detector._signatures = lambda token_sets: np.zeros((len(token_sets), detector.num_perm), dtype=np.uint64)
+
+    clusters = detector.cluster(["crypto jobs remote", "whatsapp automation tool", "whatsapp automation tools"])
+
+    assert len(clusters) == 2
+    assert sorted(clusters["whatsapp automation tool"]) == ["whatsapp automation tool", "whatsapp automation tools"]
+    assert clusters["crypto jobs remote"] == ["crypto jobs remote"]
@@ -0,0 +1,54 @@
+"""Tests for diffing a run against its baseline."""
+
+import csv
+
+from fetch_trends_api import KeywordAnalyzer
+from keyword_diff import Baseline, diff_results, run_scores
+
+
+def write_baseline(path, opportunity_score):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['keyword', 'search_volume', 'competition', 'competition_score',
+                         'trend_score', 'opportunity_score', 'recommendation'])
+        writer.writerow(['whatsapp ai pricing', 5000, 'LOW', 0.2, 60, opportunity_score, 'stale'])
+
+
+def test_score_change_above_threshold_is_moved():
+    before = {'a': {'keyword': 'a', 'trend_score': 50.0, 'opportunity_score': 40.0}}
+    after = {'a': {'keyword': 'a', 'trend_score': 52.0, 'opportunity_score': 70.0}}
+
+    rows, counts = diff_results(before, after, threshold=5)
+
+    assert counts == {'added': 0, 'dropped': 0, 'moved': 1, 'kept': 1}
+    assert rows == [{'keyword': 'a', 'change': 'moved', 'field': 'opportunity_score',
+                     'before': 40.0, 'after': 70.0, 'delta': 30.0}]
+
+
+def test_carried_metrics_are_rescored_before_diffing(tmp_path):
+    path = tmp_path / 'baseline.csv'
+    write_baseline(path, opportunity_score=1.0)
+    baseline = Baseline.load(str(path))
+
+    metrics = KeywordAnalyzer(None).rescore(baseline.carried_metrics(['WhatsApp AI pricing']))
+    rows, counts = diff_results(baseline.scores(), run_scores({}, metrics))
+
+    assert metrics[0].recommendation != 'stale'
+    assert metrics[0].intent is not None
+    assert counts['moved'] == 1
+    assert rows[0]['field'] == 'opportunity_score'
+    assert rows[0]['after'] == metrics[0].opportunity_score
+
+
+def test_unchanged_scoring_reports_nothing_moved(tmp_path):
+    path = tmp_path / 'baseline.csv'
+    write_baseline(path, opportunity_score=1.0)
+    current = KeywordAnalyzer(None).rescore(Baseline.load(str(path)).carried_metrics(['whatsapp ai pricing']))
+    write_baseline(path, opportunity_score=current[0].opportunity_score)
+    baseline = Baseline.load(str(path))
+
+    metrics = KeywordAnalyzer(None).rescore(baseline.carried_metrics(['whatsapp ai pricing']))
+    rows, counts = diff_results(baseline.scores(), run_scores({}, metrics))
+
+    assert counts['moved'] == 0
+    assert rows == []
@@ -0,0 +1,91 @@
+"""Tests for the streaming exporter and its external merge sort."""
+
+import os
+
+import pytest
+
+from keyword_export import ExportError, StreamingExporter, _ParquetWriter, export_rows, read_rows
+
+COLUMNS = ['keyword', 'trend_score', 'cluster_id', 'error']
+
+
+def _rows(count):
+    # Scored rows first, as in an export sorted by trend_score; only the tail has errors
+    return [{'keyword': f'keyword {i}', 'trend_score': (count - i) / 2 if i < count - 3 else None,
+             'cluster_id': i % 7, 'error': 'timeout' if i >= count - 3 else None}
+            for i in range(count)]
+
+
+def test_parquet_row_groups_after_an_all_null_column_keep_their_values(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'out.parquet')
+    writer = _ParquetWriter(path, COLUMNS, row_group_size=4)
+    for row in _rows(10):
+        writer.write(row)
+    writer.close()
+
+    rows = list(read_rows(path))
+    assert [row['error'] for row in rows] == [None] * 7 + ['timeout'] * 3
+    assert rows[0]['trend_score'] == 5.0
+    assert rows[-1]['trend_score'] is None
+
+
+def test_sorted_parquet_export_with_an_error_column_null_in_the_first_row_group(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+    path = str(tmp_path / 'out.parquet')
+
+    summary = export_rows(reversed(_rows(70000)), path, COLUMNS, sort_by='trend_score')
+
+    assert summary['rows'] == 70000
+    schema = pq.read_schema(path)
+    assert schema.field('error').type == pa.string()
+    assert schema.field('trend_score').type == pa.float64()
+    assert schema.field('cluster_id').type == pa.int64()
+    assert pq.read_table(path, columns=['error']).column('error').null_count == 70000 - 3
+
+
+def test_empty_parquet_export_has_typed_columns(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+    path = str(tmp_path / 'empty.parquet')
+
+    export_rows([], path, COLUMNS)
+
+    assert pq.read_schema(path).field('trend_score').type == pa.float64()
+
+
+@pytest.mark.parametrize('extension', ['csv', 'jsonl'])
+def test_sorted_export_merges_spilled_runs(tmp_path, extension):
+    path = str(tmp_path / f'out.{extension}')
+    rows = _rows(50)
+
+    summary = export_rows(rows, path, COLUMNS, sort_by='trend_score', max_rows_in_memory=8)
+
+    back = list(read_rows(path))
+    scores = [row['trend_score'] for row in back]
+    assert summary['rows'] == 50
+    assert scores[:47] == sorted(scores[:47], reverse=True)
+    assert scores[47:] == [None] * 3
+    assert back[0]['keyword'] == 'keyword 0'
+    assert os.listdir(tmp_path) == [f'out.{extension}']
+
+
+def test_failed_export_leaves_the_previous_output(tmp_path):
+    path = tmp_path / 'out.csv'
+    path.write_text('previous\n')
+
+    def failing_rows():
+        yield _rows(1)[0]
+        raise RuntimeError('interrupted')
+
+    with pytest.raises(RuntimeError):
+        export_rows(failing_rows(), str(path), COLUMNS)
+
+    assert path.read_text() == 'previous\n'
+    assert os.listdir(tmp_path) == ['out.csv']
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ExportError):
+        StreamingExporter(str(tmp_path / 'out.txt'), COLUMNS, output_format='xlsx')
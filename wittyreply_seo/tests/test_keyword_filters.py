@@ -0,0 +1,112 @@
+"""Tests for keyword filters, their pushdown into discovery and the phrase trie."""
+
+from unittest import mock
+
+import fetch_autocomplete
+from keyword_filters import KeywordFilter, estimate_pushdown_savings
+
+
+def test_matches_applies_length_and_phrase():
+    keyword_filter = KeywordFilter(min_length=5, max_length=20, phrase_match='Bot')
+
+    assert keyword_filter.matches('whatsapp bot')
+    assert not keyword_filter.matches('bot')
+    assert not keyword_filter.matches('whatsapp')
+    assert not keyword_filter.matches('whatsapp bot for small business')
+
+
+def test_keyword_without_the_phrase_is_still_expanded():
+    keyword_filter = KeywordFilter(phrase_match='bot')
+
+    assert keyword_filter.can_expand('whatsapp')
+    assert keyword_filter.matches('whatsapp bot')
+
+
+def test_branches_too_long_to_gain_the_phrase_are_pruned():
+    keyword_filter = KeywordFilter(max_length=12, phrase_match='bot')
+
+    assert keyword_filter.can_expand('whatsapp')        # 'whatsapp bot' fits
+    assert not keyword_filter.can_expand('whatsapp ai')  # 'whatsapp ai bot' does not
+    assert keyword_filter.can_expand('whatsapp bo')     # one character completes it
+    assert not keyword_filter.can_expand('whatsapp bot')  # nothing longer fits
+
+
+def test_recursive_discovery_reaches_matching_descendants_of_a_seed_without_the_phrase():
+    tree = {
+        'whatsapp': ['whatsapp business', 'whatsapp web'],
+        'whatsapp business': ['whatsapp business bot', 'whatsapp business api'],
+        'whatsapp web': ['whatsapp web bot'],
+    }
+    with mock.patch.object(fetch_autocomplete, 'fetch_google_autocomplete',
+                           side_effect=lambda keyword, *args: tree.get(keyword, [])):
+        keywords = fetch_autocomplete.fetch_autocomplete_recursive(
+            ['whatsapp'], max_depth=3, keyword_filter=KeywordFilter(phrase_match='bot')
+        )
+
+    assert keywords == {'whatsapp business bot', 'whatsapp web bot'}
+
+
+def test_variation_queries_of_a_seed_without_the_phrase_are_sent():
+    with mock.patch.object(fetch_autocomplete, 'fetch_google_autocomplete', return_value=[]) as fetch:
+        fetch_autocomplete.fetch_autocomplete_variations(
+            'whatsapp', prefixes=['best'], suffixes=['for business'],
+            keyword_filter=KeywordFilter(phrase_match='bot')
+        )
+
+    queries = [call.args[0] for call in fetch.call_args_list]
+    assert queries == ['whatsapp', 'best whatsapp', 'whatsapp for business']
+
+
+def test_pushdown_estimate_prunes_no_branch_for_a_phrase_alone():
+    estimate = estimate_pushdown_savings(['whatsapp', 'telegram'], KeywordFilter(phrase_match='bot'),
+                                         recursive=True, max_depth=2, fanout=5)
+
+    assert estimate['autocomplete_requests_after'] == estimate['autocomplete_requests_before']
+    assert estimate['keywords_after'] == estimate['keywords_before'] - 2  # the seeds themselves
+
+
+def test_pushdown_estimate_counts_branches_pruned_by_length():
+    estimate = estimate_pushdown_savings(['whatsapp automation'], KeywordFilter(max_length=10),
+                                         recursive=True, max_depth=2, fanout=5)
+
+    assert estimate['autocomplete_requests_before'] == 6
+    assert estimate['autocomplete_requests_after'] == 1
+    assert estimate['keywords_after'] == 0
+
+
+def test_keyword_without_an_include_phrase_is_still_expanded():
+    keyword_filter = KeywordFilter(include_phrases=['crm'])
+
+    assert keyword_filter.can_expand('whatsapp')
+    assert keyword_filter.matches('whatsapp crm')
+    assert not keyword_filter.matches('whatsapp crms')
+
+
+def test_branches_too_long_to_gain_an_include_phrase_are_pruned():
+    any_filter = KeywordFilter(max_length=14, include_phrases=['crm', 'chatbot'])
+    all_filter = KeywordFilter(max_length=14, include_phrases=['crm', 'chatbot'], match_mode='all')
+
+    assert any_filter.can_expand('whatsapp')        # 'whatsapp crm' fits
+    assert not any_filter.can_expand('whatsapp web')
+    assert not all_filter.can_expand('whatsapp')    # 'chatbot' alone no longer fits
+    assert all_filter.can_expand('crm')
+
+
+def test_branches_with_an_excluded_phrase_in_their_final_words_are_pruned():
+    keyword_filter = KeywordFilter(exclude_phrases=['telegram'])
+
+    assert not keyword_filter.can_expand('telegram bot')
+    assert keyword_filter.can_expand('telegram')  # the last word may still change ('telegraph')
+    assert not keyword_filter.matches('telegram')
+
+
+def test_phrase_matcher_matches_whole_words_and_overlapping_phrases():
+    from keyword_filters import PhraseMatcher
+
+    matcher = PhraseMatcher(['ai', 'ai chatbot', 'chatbot builder', 'c++'])
+
+    assert not matcher.search('email marketing')
+    assert matcher.search('learn c++ fast')
+    assert matcher.found('best ai chatbot builder') == {'ai', 'ai chatbot', 'chatbot builder'}
+    assert PhraseMatcher(['ai', 'bot']).contains_all('ai bot')
+    assert not PhraseMatcher(['ai', 'bot']).contains_all('ai chatbot')
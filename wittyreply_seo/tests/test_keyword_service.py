@@ -0,0 +1,61 @@
+"""Tests for the keyword service's request handling (no network, no server)."""
+
+import threading
+
+import pytest
+
+from keyword_service import KeywordService, ServiceError, _keyword_filter
+
+
+class FakeTool:
+    def collect_autocomplete_keywords(self, seeds, **kwargs):
+        return {f"{seed} bot" for seed in seeds}
+
+    def collect_trends_data(self, keywords, geos=None):
+        return {keyword: {'keyword': keyword, 'trend_score': 50.0} for keyword in keywords}
+
+    def deduplicate_keywords(self, keyword_data):
+        return keyword_data
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = KeywordService()
+    tool = (FakeTool(), threading.Lock())
+    monkeypatch.setattr(service, '_get_tool', lambda payload: tool)
+    return service
+
+
+def test_each_request_is_counted_once(service):
+    service.autocomplete({'seeds': ['whatsapp']})
+    service.analyze({'seeds': ['whatsapp']})
+    service.trends({'keywords': ['whatsapp bot']})
+
+    assert service.requests_served == 3
+
+
+def test_analyze_returns_trends_for_expanded_keywords(service):
+    result = service.analyze({'seeds': 'whatsapp, telegram', 'max_length': '20'})
+
+    assert result['seeds'] == ['whatsapp', 'telegram']
+    assert sorted(row['keyword'] for row in result['keywords']) == ['telegram bot', 'whatsapp bot']
+
+
+@pytest.mark.parametrize('payload', [
+    {'seeds': ['whatsapp'], 'max_length': 'sixty'},
+    {'seeds': ['whatsapp'], 'min_length': -1},
+    {'seeds': ['whatsapp'], 'max_depth': [2]},
+    {'seeds': ['whatsapp'], 'max_length': True},
+    {'seeds': ['whatsapp'], 'near_dedup': True, 'dedup_threshold': 'high'},
+    {'seeds': []},
+])
+def test_invalid_fields_are_request_errors(service, payload):
+    with pytest.raises(ServiceError):
+        service.analyze(payload)
+
+
+def test_filter_fields_build_a_keyword_filter():
+    keyword_filter = _keyword_filter({'max_length': 12, 'include_phrases': 'bot,crm'})
+
+    assert keyword_filter.matches('whatsapp bot')
+    assert not keyword_filter.matches('whatsapp web')
@@ -0,0 +1,26 @@
+"""Tests for re-scoring stored metrics without requests."""
+
+import csv
+
+from rescoring import score_main
+
+COLUMNS = ['keyword', 'search_volume', 'competition', 'competition_score', 'trend_score',
+           'peak_month', 'opportunity_score', 'difficulty_score', 'recommendation']
+
+
+def test_score_round_trip_keeps_integer_columns(tmp_path):
+    path = str(tmp_path / 'enhanced.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerow(['whatsapp ai pricing', 1200, 'LOW', 0.2, 60, 3, 1.0, 1.0, 'stale'])
+
+    assert score_main(['-i', path, '-o', path, '--workers', '1']) == 0
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 1
+    assert rows[0]['search_volume'] == '1200'
+    assert rows[0]['peak_month'] == '3'
+    assert rows[0]['competition_score'] == '0.2'
+    assert rows[0]['recommendation'] != 'stale'
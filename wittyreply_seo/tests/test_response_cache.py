@@ -0,0 +1,57 @@
+"""Tests for the response cache and its offline view."""
+
+import os
+
+from keyword_store import KeywordStore
+from main import open_offline_cache
+from response_cache import OfflineCache, ResponseCache
+
+
+class Fallback:
+    def peek_many(self, namespace, keys):
+        return {key: [1.0] for key in keys if key.endswith('stored')}
+
+
+def test_offline_cache_serves_stale_entries_then_the_fallback_and_records_misses(tmp_path):
+    backing = ResponseCache(str(tmp_path / 'cache.sqlite'), ttl=0)
+    backing.set('trends', 'US|cached', 42.0)
+    offline = OfflineCache(backing, fallback=Fallback())
+
+    found = offline.get_many('trends', ['US|cached', 'US|stored', 'US|missing'])
+
+    assert found == {'US|cached': 42.0, 'US|stored': [1.0]}
+    assert offline.miss_counts() == {'trends': 1}
+    backing.close()
+
+
+def test_offline_cache_never_writes_to_the_backing_cache(tmp_path):
+    backing = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    offline = OfflineCache(backing)
+
+    offline.set('trends', 'US|new', 1.0)
+    offline.set_many('trends', {'US|other': 2.0})
+
+    assert backing.peek_many('trends', ['US|new', 'US|other']) == {}
+    backing.close()
+
+
+def test_offline_cache_without_a_backing_cache_uses_only_the_fallback():
+    offline = OfflineCache(None, fallback=Fallback())
+
+    found = offline.get_many('trends', ['US|stored', 'US|missing'])
+
+    assert found == {'US|stored': [1.0]}
+    assert list(offline.scan('trends')) == []
+    assert offline.miss_counts() == {'trends': 1}
+
+
+def test_offline_run_with_only_a_store_creates_no_cache_file(tmp_path):
+    cache_path = str(tmp_path / 'cache.sqlite')
+    store_path = str(tmp_path / 'store.sqlite')
+    KeywordStore(store_path).close()
+
+    offline = open_offline_cache(cache_path, store_path)
+    offline.close()
+
+    assert offline.backing is None
+    assert not os.path.exists(cache_path)
@@ -0,0 +1,91 @@
+"""Tests for the vectorized seasonality decomposition and the monthly series it reads."""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fetch_trends_api import GoogleTrendsAPI, monthly_means
+from seasonality import SeasonalityError, decompose, seasonality_profiles, stack_series
+
+
+def _weekly_interest(start='2025-01-05', weeks=52, peak_month=12):
+    dates = pd.date_range(start, periods=weeks, freq='W')
+    values = [50 + 40 * math.cos(2 * math.pi * (date.month - peak_month) / 12) for date in dates]
+    return pd.Series(values, index=dates)
+
+
+def test_monthly_means_average_each_calendar_month():
+    interest = pd.Series([10.0, 20.0, 30.0, 60.0],
+                         index=pd.to_datetime(['2025-01-05', '2025-01-26', '2025-02-02', '2025-02-23']))
+
+    assert monthly_means(interest) == [15.0, 45.0]
+
+
+def test_seasonal_trends_are_read_from_weekly_interest_over_time():
+    class FakePytrends:
+        def build_payload(self, keywords, timeframe, geo):
+            self.keyword = keywords[0]
+
+        def interest_over_time(self):
+            return pd.DataFrame({self.keyword: _weekly_interest()})
+
+    api = GoogleTrendsAPI()
+    api._pytrends, api._pytrends_ready = FakePytrends(), True
+
+    series = api.get_seasonal_trends('ski rental')
+
+    assert len(series) == 12
+    assert series.index(max(series)) == 11  # December
+
+
+def test_weekly_interest_to_profile_finds_the_seasonal_peak():
+    series = monthly_means(_weekly_interest(peak_month=7))
+
+    profile = seasonality_profiles([series], end_month=12)[0]
+
+    assert profile['peak_month'] == 7
+    assert profile['seasonality_strength'] > 0.9
+    assert abs(profile['trend_slope']) < 0.01
+
+
+def test_linear_growth_is_a_trend_without_season():
+    profile = seasonality_profiles([[10.0 + 2 * month for month in range(12)]], end_month=12)[0]
+
+    assert profile['trend_slope'] == pytest.approx(2 / 21, abs=1e-3)  # slope / mean level
+    assert profile['seasonality_strength'] == 0.0
+    assert profile['peak_month'] is None
+    assert profile['volatility'] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_short_flat_and_missing_series_get_no_profile_fields():
+    profiles = seasonality_profiles([[5.0, 6.0], [0.0] * 12, None, [1.0, 2.0, 3.0, 4.0]], end_month=6)
+
+    assert all(value is None for value in profiles[0].values())
+    assert all(value is None for value in profiles[1].values())
+    assert all(value is None for value in profiles[2].values())
+    assert profiles[3]['trend_slope'] is not None
+    assert profiles[3]['seasonality_strength'] is None  # less than a year of data
+
+
+def test_batched_decomposition_matches_one_series_at_a_time():
+    rng = np.random.RandomState(3)
+    series = [list(rng.uniform(0, 100, size=rng.randint(3, 13))) for _ in range(20)]
+
+    together = seasonality_profiles(series, end_month=3)
+    alone = [seasonality_profiles([values], end_month=3)[0] for values in series]
+
+    assert together == alone
+
+
+def test_stack_series_left_pads_shorter_series():
+    matrix = stack_series([[1.0, 2.0, 3.0], [4.0]])
+
+    assert np.isnan(matrix[1, :2]).all()
+    assert matrix[1, 2] == 4.0
+
+
+def test_decompose_rejects_a_flat_array():
+    with pytest.raises(SeasonalityError):
+        decompose(np.zeros(12))
@@ -0,0 +1,61 @@
+"""Tests for streamed seed files and memory-bounded dedup."""
+
+import pytest
+
+from keyword_dedup import deduplicate_near_duplicates
+from seed_reader import BloomFilter, SeedDeduplicator, SeedReaderError, SeedStream, normalize_seed
+
+
+def test_normalize_seed_strips_quotes_and_collapses_whitespace():
+    assert normalize_seed('  "whatsapp   automation" ') == 'whatsapp automation'
+    assert normalize_seed('ｗｈａｔｓａｐｐ') == 'whatsapp'
+    assert normalize_seed(' "" ') == ''
+
+
+def test_seed_stream_skips_comments_blanks_and_case_insensitive_duplicates(tmp_path):
+    path = tmp_path / 'seeds.txt'
+    path.write_text('# seeds\nwhatsapp bot, CRM\n\ncrm,  whatsapp   bot\ntelegram\n', encoding='utf-8')
+
+    stream = SeedStream(str(path))
+
+    assert list(stream) == ['whatsapp bot', 'CRM', 'telegram']
+    assert (stream.count, stream.duplicates) == (3, 2)
+    assert list(stream) == ['whatsapp bot', 'CRM', 'telegram']  # re-iterable
+
+
+def test_missing_seed_file_is_an_error(tmp_path):
+    with pytest.raises(SeedReaderError):
+        SeedStream(str(tmp_path / 'missing.txt'))
+
+
+def test_deduplicator_stays_exact_after_spilling_to_disk(tmp_path):
+    deduplicator = SeedDeduplicator(capacity=1000, directory=str(tmp_path), memory_keys=10)
+    try:
+        first = [deduplicator.add(f"seed {i}") for i in range(500)]
+        again = [deduplicator.add(f"seed {i}") for i in range(0, 500, 7)]
+    finally:
+        deduplicator.close()
+
+    assert all(first)
+    assert not any(again)
+    assert deduplicator.disk is not None
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000)
+    for i in range(1000):
+        bloom.add(f"key {i}")
+
+    assert all(f"key {i}" in bloom for i in range(1000))
+    assert sum(f"other {i}" in bloom for i in range(1000)) < 50
+
+
+def test_seed_stream_can_be_the_near_dedup_preference(tmp_path):
+    path = tmp_path / 'seeds.txt'
+    path.write_text('\n'.join(['whatsapp automation tools'] + [f'seed {i}' for i in range(1000)]),
+                    encoding='utf-8')
+
+    clusters = deduplicate_near_duplicates(['whatsapp automation tool', 'whatsapp automation tools'],
+                                           prefer=SeedStream(str(path)))
+
+    assert list(clusters) == ['whatsapp automation tools']
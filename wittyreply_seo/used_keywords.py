@@ -0,0 +1,223 @@
+"""
+Membership index of keywords and titles that were already used (published),
+so matching keywords can be dropped during discovery before any request is spent.
+Lookups match exact normalized phrases, reordered or pluralized token sets and,
+above a Jaccard threshold, near matches.
+"""
+
+import os
+import json
+import math
+import logging
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from seed_reader import keyword_tokens, normalize_seed, seed_key
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.8
+
+
+class UsedKeywordsError(Exception):
+    """Custom exception for used keyword source errors."""
+    pass
+
+
+def load_used_entries(path: str) -> List[str]:
+    """
+    Read used keywords or titles from a file.
+
+    Args:
+        path (str): JSON list of strings (e.g. data/used-keywords.json,
+            data/used-titles.json) or a text file with one entry per line
+
+    Returns:
+        List[str]: Entries in file order
+
+    Raises:
+        UsedKeywordsError: If the file is missing or malformed
+    """
+    if not os.path.exists(path):
+        raise UsedKeywordsError(f"Used keywords file not found: {path}")
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.lower().endswith('.json'):
+                entries = json.load(f)
+            else:
+                entries = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    except (OSError, ValueError) as e:
+        raise UsedKeywordsError(f"Could not read used keywords from {path}: {e}")
+
+    if not isinstance(entries, list) or not all(isinstance(e, str) for e in entries):
+        raise UsedKeywordsError(f"{path} must contain a list of strings")
+    return entries
+
+
+class UsedKeywordIndex:
+    """
+    Normalized and fuzzy membership test against used keywords and titles.
+
+    Exact phrases and token sets are plain hash lookups. Near matches use
+    prefix filtering: with tokens in a global rare-first order, two sets with
+    Jaccard similarity >= t must share a token among the first
+    n - ceil(t * n) + 1 tokens of each, so only entries sharing a rare token
+    are compared instead of the whole list.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, language: str = 'en'):
+        """
+        Initialize the index.
+
+        Args:
+            threshold (float): Token-set Jaccard similarity (0-1] counted as a match;
+                1.0 only matches reordered or pluralized phrases
+            language (str): Language code used to pick the stopword list
+        """
+        if not 0 < threshold <= 1:
+            raise UsedKeywordsError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.language = language
+        self.sources: List[str] = []
+        self._phrases: Dict[str, str] = {}
+        self._token_sets: Dict[FrozenSet[str], str] = {}
+        self._entries: List[FrozenSet[str]] = []
+        self._texts: List[str] = []
+        self._rank: Optional[Dict[str, int]] = None
+        self._postings: Dict[str, List[int]] = {}
+        self._memo: Dict[str, Optional[str]] = {}
+
+    def add(self, text: str):
+        """Add one used keyword or title."""
+        text = normalize_seed(text)
+        if not text:
+            return
+        self._phrases.setdefault(seed_key(text), text)
+        tokens = keyword_tokens(text, self.language)
+        if tokens and tokens not in self._token_sets:
+            self._token_sets[tokens] = text
+            self._entries.append(tokens)
+            self._texts.append(text)
+            self._rank = None
+            self._memo.clear()
+
+    def add_many(self, texts: Iterable[str]) -> int:
+        """
+        Add several entries.
+
+        Args:
+            texts (Iterable[str]): Used keywords or titles
+
+        Returns:
+            int: Number of entries processed
+        """
+        count = 0
+        for text in texts:
+            self.add(text)
+            count += 1
+        return count
+
+    def load(self, path: str) -> int:
+        """
+        Add every entry of a used keywords/titles file.
+
+        Args:
+            path (str): File accepted by load_used_entries
+
+        Returns:
+            int: Number of entries read
+        """
+        count = self.add_many(load_used_entries(path))
+        self.sources.append(path)
+        logger.info(f"Loaded {count} used entries from {path}")
+        return count
+
+    def _prefix_length(self, size: int) -> int:
+        return size - math.ceil(self.threshold * size - 1e-9) + 1
+
+    def _build(self):
+        """Rank tokens rarest first and index each entry under its prefix tokens."""
+        frequency = Counter(token for tokens in self._entries for token in tokens)
+        self._rank = {token: rank for rank, (token, _) in
+                      enumerate(sorted(frequency.items(), key=lambda item: (item[1], item[0])))}
+        self._postings = {}
+        for index, tokens in enumerate(self._entries):
+            ordered = sorted(tokens, key=self._rank.__getitem__)
+            for token in ordered[:self._prefix_length(len(ordered))]:
+                self._postings.setdefault(token, []).append(index)
+
+    def match(self, keyword: str) -> Optional[str]:
+        """
+        Find the used entry a keyword matches.
+
+        Args:
+            keyword (str): Keyword to test
+
+        Returns:
+            Optional[str]: The matching used keyword or title, or None
+        """
+        if keyword in self._memo:
+            return self._memo[keyword]
+
+        found = self._phrases.get(seed_key(normalize_seed(keyword)))
+        tokens = keyword_tokens(keyword, self.language) if found is None else None
+        if found is None and tokens:
+            found = self._token_sets.get(tokens)
+            if found is None and self.threshold < 1:
+                found = self._fuzzy_match(tokens)
+
+        self._memo[keyword] = found
+        return found
+
+    def _fuzzy_match(self, tokens: FrozenSet[str]) -> Optional[str]:
+        if self._rank is None:
+            self._build()
+        # Tokens no entry contains rank first; they have no postings to probe
+        ordered = sorted(tokens, key=lambda token: (token in self._rank, self._rank.get(token, 0), token))
+        size = len(tokens)
+        checked = set()
+        for token in ordered[:self._prefix_length(size)]:
+            for index in self._postings.get(token, ()):
+                if index in checked:
+                    continue
+                checked.add(index)
+                entry = self._entries[index]
+                # Size filter: Jaccard >= t needs t*|a| <= |b| <= |a|/t
+                if not self.threshold * len(entry) <= size <= len(entry) / self.threshold:
+                    continue
+                if len(tokens & entry) / len(tokens | entry) >= self.threshold:
+                    return self._texts[index]
+        return None
+
+    def __contains__(self, keyword: str) -> bool:
+        return self.match(keyword) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def excluded(self) -> int:
+        """Distinct keywords looked up so far that matched a used entry."""
+        return sum(1 for found in self._memo.values() if found is not None)
+
+
+def build_used_index(paths: Iterable[str], threshold: float = DEFAULT_THRESHOLD,
+                     language: str = 'en') -> UsedKeywordIndex:
+    """
+    Build an index from several used keyword/title files.
+
+    Args:
+        paths (Iterable[str]): Files such as data/used-keywords.json and data/used-titles.json
+        threshold (float): Jaccard similarity counted as a match
+        language (str): Language code used to pick the stopword list
+
+    Returns:
+        UsedKeywordIndex: Loaded index
+    """
+    index = UsedKeywordIndex(threshold=threshold, language=language)
+    for path in paths:
+        index.load(path)
+    return index